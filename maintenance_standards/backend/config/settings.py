@@ -28,6 +28,14 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = Field(default=10 * 1024 * 1024)  # 10MB
     ALLOWED_EXTENSIONS: List[str] = Field(default=[".docx"])
     UPLOAD_FOLDER: str = Field(default="./uploads")
+    MAX_UNCOMPRESSED_SIZE: int = Field(default=200 * 1024 * 1024)  # 解压后总大小上限 200MB
+    MAX_ZIP_ENTRIES: int = Field(default=5000)  # 包内部件数量上限
+    MAX_COMPRESSION_RATIO: int = Field(default=100)  # 单个部件最大压缩比
+    BATCH_MAX_WORKERS: int = Field(default=0)  # 批量上传进程数，0 表示使用 CPU 核心数
+    DOCUMENT_TIME_BUDGET: int = Field(default=120)  # 单个文档处理时间目标（秒）
+    PROFILE_MEMORY: bool = Field(default=False)  # 是否统计各阶段内存峰值；tracemalloc 会拖慢所有内存分配且为进程级统计，默认关闭，排查内存问题时开启
+    CLEANING_CACHE_SIZE: int = Field(default=1024 * 1024 * 1024)  # 清洗结果缓存总大小上限 1GB（不含与文档共用的产物），0 表示不缓存
+    PARSE_CACHE_SIZE: int = Field(default=256 * 1024 * 1024)  # 解析结果缓存总大小上限 256MB，0 表示不缓存
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,283 @@
+"""
+清洗产物模块
+主要功能：以紧凑的版本化格式保存清洗后的正文段落、表格和样式，解析和知识抽取
+直接读取，无需加载 python-docx 对象模型；清洗后的 .docx 只在预览或下载时按需生成
+"""
+import gzip
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from docx.styles import BabelFish
+from lxml import etree
+
+from .ooxml import (
+    DOCUMENT_PART, STYLES_PART, W_BODY, W_NS, W_P, W_TBL, W_TC, paragraph_text
+)
+from ...utils.error_handler import DocumentError
+
+# 产物格式版本，格式变化时递增；读取时版本不一致视为无效产物
+ARTIFACT_VERSION = 3
+ARTIFACT_SUFFIX = ".json.gz"
+
+# 产物中使用的 WordprocessingML 元素和属性
+W_PPR = f"{{{W_NS}}}pPr"
+W_PSTYLE = f"{{{W_NS}}}pStyle"
+W_TR = f"{{{W_NS}}}tr"
+W_TRPR = f"{{{W_NS}}}trPr"
+W_TCPR = f"{{{W_NS}}}tcPr"
+W_TBLGRID = f"{{{W_NS}}}tblGrid"
+W_GRIDCOL = f"{{{W_NS}}}gridCol"
+W_GRIDBEFORE = f"{{{W_NS}}}gridBefore"
+W_GRIDSPAN = f"{{{W_NS}}}gridSpan"
+W_VMERGE = f"{{{W_NS}}}vMerge"
+W_STYLE = f"{{{W_NS}}}style"
+W_NAME = f"{{{W_NS}}}name"
+W_VAL = f"{{{W_NS}}}val"
+W_STYLE_ID = f"{{{W_NS}}}styleId"
+W_STYLE_TYPE = f"{{{W_NS}}}type"
+W_DEFAULT = f"{{{W_NS}}}default"
+A_BLIP = "{http://schemas.openxmlformats.org/drawingml/2006/main}blip"
+V_IMAGEDATA = "{urn:schemas-microsoft-com:vml}imagedata"
+R_EMBED = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed"
+R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+# 正文块类型
+PARAGRAPH_BLOCK = "paragraph"
+TABLE_BLOCK = "table"
+
+
+class CleanedDocument:
+    """清洗后的文档内容
+
+    按文档顺序保存正文层级的块：
+        {"type": "paragraph", "text": 段落文本, "style": 样式ID或None,
+         "images": [图片在包内的相对路径, ...]}    （没有图片时不含 images）
+        {"type": "table", "cells": [[行号, 列号, 单元格文本, 跨行数, 跨列数], ...],
+         "num_rows": 行数, "num_cols": 列数}
+
+    表格的每个逻辑单元格只出现一次：行号和列号为合并区域左上角在布局网格中的
+    位置，横向合并（gridSpan）和纵向合并（vMerge）分别记为跨列数和跨行数。
+    styles 为段落样式ID到样式名称（python-docx 的界面名称，如 "Heading 1"）的映射。
+    """
+
+    def __init__(self, blocks: Optional[List[Dict]] = None, styles: Optional[Dict[str, str]] = None,
+                 default_style: Optional[str] = None):
+        self.blocks = blocks or []
+        self.styles = styles or {}
+        self.default_style = default_style
+
+    @classmethod
+    def from_tree(cls, root: etree._Element, styles_root: Optional[etree._Element] = None,
+                  relationships: Optional[Dict[str, str]] = None) -> "CleanedDocument":
+        """单遍遍历 word/document.xml 的元素树生成
+
+        同样适用于未清洗的文档：DocumentParser 直接用 python-docx 已加载的元素树
+        生成正文块，不再为每个段落和表格创建 python-docx 代理对象。
+
+        Args:
+            root: word/document.xml 的根元素
+            styles_root: word/styles.xml 的根元素，文档没有样式部件时为 None
+            relationships: 主文档部件的关系ID到目标路径的映射，用于解析图片；
+                为 None 时不记录图片
+
+        Returns:
+            清洗后的文档内容
+        """
+        styles, default_style = _read_paragraph_styles(styles_root)
+        body = root.find(W_BODY)
+        blocks = [
+            block for block in map(lambda child: _body_block(child, relationships),
+                                   body if body is not None else ())
+            if block is not None
+        ]
+        return cls(blocks, styles, default_style)
+
+    def style_name(self, style_id: Optional[str]) -> Optional[str]:
+        """获取段落样式名称，样式不存在时与 python-docx 一样使用默认段落样式"""
+        if style_id in self.styles:
+            return self.styles[style_id]
+        return self.styles.get(self.default_style)
+
+    def paragraphs(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """按顺序遍历正文层级段落的 (文本, 样式名称)，与 python-docx 的 Document.paragraphs 对应"""
+        for block in self.blocks:
+            if block["type"] == PARAGRAPH_BLOCK:
+                yield block["text"], self.style_name(block["style"])
+
+    def to_bytes(self) -> bytes:
+        """序列化为 gzip 压缩的 JSON"""
+        payload = {
+            "version": ARTIFACT_VERSION,
+            "styles": self.styles,
+            "default_style": self.default_style,
+            "blocks": self.blocks,
+        }
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # 固定 mtime，相同内容生成相同的字节
+        return gzip.compress(data, mtime=0)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CleanedDocument":
+        """从 to_bytes 的结果读取
+
+        Raises:
+            DocumentError: 数据无法解析或格式版本不一致
+        """
+        try:
+            payload = json.loads(gzip.decompress(data))
+        except (OSError, EOFError, ValueError) as e:
+            raise DocumentError(f"清洗产物无法解析: {str(e)}")
+        if payload.get("version") != ARTIFACT_VERSION:
+            raise DocumentError(f"不支持的清洗产物版本: {payload.get('version')}")
+        return cls(payload["blocks"], payload["styles"], payload["default_style"])
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CleanedDocument":
+        """从文件读取"""
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+def iter_body_blocks(package: zipfile.ZipFile,
+                     relationships: Optional[Dict[str, str]] = None) -> Iterator[Dict]:
+    """流式遍历 word/document.xml 的正文块，块的格式与 CleanedDocument.blocks 相同
+
+    使用 iterparse 直接从 zip 中解压并解析，每个正文层级的段落或表格处理完后
+    立即清除，内存占用只与单个块的大小有关，与文档大小无关。
+
+    Args:
+        package: 已打开的 OOXML 包
+        relationships: 主文档部件的关系ID到目标路径的映射，为 None 时不记录图片
+
+    Yields:
+        正文块
+    """
+    with package.open(DOCUMENT_PART) as stream:
+        for _, elem in etree.iterparse(stream, events=("end",), tag=(W_P, W_TBL)):
+            parent = elem.getparent()
+            # 表格中的段落和嵌套表格随所在的正文层级表格一起处理
+            if parent is None or parent.tag != W_BODY:
+                continue
+            block = _body_block(elem, relationships)
+            if block is not None:
+                yield block
+            # 释放已处理的元素及其之前的兄弟节点
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def read_package_styles(package: zipfile.ZipFile) -> Tuple[Dict[str, str], Optional[str]]:
+    """读取包中段落样式ID到样式名称的映射和默认段落样式ID"""
+    if STYLES_PART not in package.NameToInfo:
+        return {}, None
+    with package.open(STYLES_PART) as stream:
+        return _read_paragraph_styles(etree.parse(stream).getroot())
+
+
+def is_artifact_path(path: Union[str, Path]) -> bool:
+    """判断路径是否指向清洗产物"""
+    return str(path).endswith(ARTIFACT_SUFFIX)
+
+
+def _body_block(child: etree._Element, relationships: Optional[Dict[str, str]]) -> Optional[Dict]:
+    """把正文层级的 w:p 或 w:tbl 转换为正文块，其他元素返回 None"""
+    if child.tag == W_P:
+        block = {
+            "type": PARAGRAPH_BLOCK,
+            "text": paragraph_text(child),
+            "style": _paragraph_style_id(child),
+        }
+        if relationships:
+            images = _paragraph_images(child, relationships)
+            if images:
+                block["images"] = images
+        return block
+    if child.tag == W_TBL:
+        cells, num_rows = _table_cells(child)
+        return {
+            "type": TABLE_BLOCK,
+            "cells": cells,
+            "num_rows": num_rows,
+            "num_cols": len(child.findall(f"{W_TBLGRID}/{W_GRIDCOL}")),
+        }
+    return None
+
+
+def _paragraph_style_id(para: etree._Element) -> Optional[str]:
+    style = para.find(f"{W_PPR}/{W_PSTYLE}")
+    return style.get(W_VAL) if style is not None else None
+
+
+def _read_paragraph_styles(styles_root: Optional[etree._Element]) -> Tuple[Dict[str, str], Optional[str]]:
+    """读取段落样式ID到界面名称的映射和默认段落样式ID"""
+    styles = {}
+    default_style = None
+    if styles_root is None:
+        return styles, default_style
+    for style in styles_root.iterchildren(W_STYLE):
+        if style.get(W_STYLE_TYPE, "paragraph") != "paragraph":
+            continue
+        style_id = style.get(W_STYLE_ID)
+        if style_id is None:
+            continue
+        name = style.find(W_NAME)
+        styles[style_id] = BabelFish.internal2ui(name.get(W_VAL)) if name is not None else None
+        # 与 python-docx 一致，有多个默认样式时使用最后一个
+        if style.get(W_DEFAULT) in ("1", "true", "on"):
+            default_style = style_id
+    return styles, default_style
+
+
+def _paragraph_images(para: etree._Element, relationships: Dict[str, str]) -> List[str]:
+    """段落中引用的图片路径（DrawingML 和 VML），按出现顺序去重"""
+    images = []
+    for node in para.iter(A_BLIP, V_IMAGEDATA):
+        target = relationships.get(node.get(R_EMBED if node.tag == A_BLIP else R_ID))
+        # 兼容内容（mc:AlternateContent）中同一图片会出现两次
+        if target and target not in images:
+            images.append(target)
+    return images
+
+
+def _cell_text(tc: etree._Element) -> str:
+    """单元格文本，与 python-docx 的 _Cell.text 一致"""
+    return "\n".join(paragraph_text(para) for para in tc.iterchildren(W_P))
+
+
+def _table_cells(tbl: etree._Element) -> Tuple[List[List], int]:
+    """单遍读取表格的逻辑单元格
+
+    直接遍历 w:tr/w:tc，按 w:gridBefore 和 w:gridSpan 计算单元格在布局网格中的列号，
+    w:vMerge 的后续单元格并入上一行同一位置、同样跨列的单元格并增加其跨行数，
+    耗时与单元格数成正比。
+
+    Returns:
+        ([[行号, 列号, 文本, 跨行数, 跨列数], ...], 行数)
+    """
+    cells = []
+    # 上一行中可以继续纵向合并的单元格：起始列号 -> 单元格
+    open_cells: Dict[int, List] = {}
+    num_rows = 0
+    for row, tr in enumerate(tbl.iterchildren(W_TR)):
+        num_rows += 1
+        grid_before = tr.find(f"{W_TRPR}/{W_GRIDBEFORE}")
+        col = int(grid_before.get(W_VAL, 0)) if grid_before is not None else 0
+        row_cells: Dict[int, List] = {}
+        for tc in tr.iterchildren(W_TC):
+            span_element = tc.find(f"{W_TCPR}/{W_GRIDSPAN}")
+            span = int(span_element.get(W_VAL, 1)) if span_element is not None else 1
+            v_merge = tc.find(f"{W_TCPR}/{W_VMERGE}")
+            above = open_cells.get(col)
+            if (v_merge is not None and v_merge.get(W_VAL, "continue") == "continue"
+                    and above is not None and above[4] == span):
+                above[3] += 1
+                row_cells[col] = above
+            else:
+                cell = [row, col, _cell_text(tc), 1, span]
+                cells.append(cell)
+                if v_merge is not None:
+                    row_cells[col] = cell
+            col += span
+        open_cells = row_cells
+    return cells, num_rows
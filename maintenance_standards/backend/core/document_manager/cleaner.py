@@ -1,13 +1,34 @@
+import os
+import copy
+import hashlib
+import tempfile
+import zipfile
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
 from loguru import logger
+from lxml import etree
+
+from .context import DocumentContext, DocumentSource, load_docx
+from .ooxml import (
+    DOCUMENT_PART, STYLES_PART, W_BODY, W_FTR, W_HDR, W_P, W_TC, W_TXBX_CONTENT, PackageSource, copy_part,
+    has_embedded_content, header_footer_parts, open_package, paragraph_text, read_relationships, set_paragraph_text
+)
+from .artifact import ARTIFACT_VERSION, CleanedDocument
+from .cleaning_rules import CleaningRule, CleaningRuleRegistry, TextNormalizer
+
+# 内置清洗逻辑的版本，修改内置规则的行为时递增，使已缓存的清洗结果失效
+CLEANER_VERSION = "3"
 
 class DocumentCleaner:
-    """文档清洗器，用于清洗和标准化文档内容"""
+    """文档清洗器，用于清洗和标准化文档内容
     
-    def __init__(self):
+    内置规则通过 rules 开关控制；自定义规则（字符映射、正则、函数）注册到
+    plugins 中，与内置规则一起编译为一个执行计划，见 TextNormalizer。
+    """
+    
+    def __init__(self, plugins: Optional[Iterable[CleaningRule]] = None):
         # 清洗规则配置
         self.rules = {
             "remove_extra_spaces": True,  # 移除多余空格
@@ -15,6 +36,38 @@ class DocumentCleaner:
             "fix_line_breaks": True,      # 修复换行
             "remove_empty_paragraphs": True,  # 移除空段落
         }
+        # 自定义清洗规则
+        self.plugins = CleaningRuleRegistry(plugins or ())
+        self._normalizer_key = None
+        self._compiled_normalizer: Optional[TextNormalizer] = None
+    
+    def register_rule(self, rule: CleaningRule, replace: bool = False) -> CleaningRule:
+        """注册自定义清洗规则，见 CleaningRuleRegistry.register"""
+        return self.plugins.register(rule, replace)
+    
+    def fingerprint(self) -> str:
+        """当前清洗规则的指纹
+        
+        由内置清洗逻辑版本、清洗产物格式版本、内置规则开关和已启用自定义规则的签名计算，
+        规则集变化时指纹随之变化，用作清洗结果缓存键的一部分
+        
+        Returns:
+            SHA-256 十六进制字符串
+        """
+        signature = (
+            CLEANER_VERSION,
+            ARTIFACT_VERSION,
+            tuple(sorted(self.rules.items())),
+            tuple(rule.signature() for rule in self.plugins.enabled_rules()),
+        )
+        return hashlib.sha256(repr(signature).encode("utf-8")).hexdigest()
+    
+    def __getstate__(self) -> dict:
+        # 编译结果不随清洗器一起传给批量上传的工作进程，在工作进程中重新编译
+        state = self.__dict__.copy()
+        state["_normalizer_key"] = None
+        state["_compiled_normalizer"] = None
+        return state
     
     def clean_text(self, text: str) -> str:
         """清洗文本内容
@@ -27,55 +80,46 @@ class DocumentCleaner:
         """
         if not text:
             return text
-            
-        # 移除多余空格
-        if self.rules["remove_extra_spaces"]:
-            text = re.sub(r'\s+', ' ', text)
-            text = text.strip()
+        return self._normalizer()(text)
+    
+    def clean_texts(self, texts: Iterable[str]) -> List[str]:
+        """批量清洗文本
         
-        # 标准化标点符号
-        if self.rules["normalize_punctuation"]:
-            text = self._normalize_punctuation(text)
+        整批文本一起处理，每条规则只扫描一遍，大量短段落时明显快于逐段调用 clean_text
         
-        return text
+        Args:
+            texts: 待清洗的文本序列
+            
+        Returns:
+            清洗后的文本列表，顺序与输入一致
+        """
+        return self._normalizer().normalize_many(list(texts))
     
-    def clean_document(self, doc_path: str) -> Tuple[Document, Dict]:
+    def clean_document(self, doc_path: DocumentSource) -> Tuple[Document, Dict]:
         """清洗文档内容
         
+        清洗正文、表格单元格、文本框以及页眉页脚中的全部段落，规则见 _clean_trees
+        
         Args:
-            doc_path: 文档路径
+            doc_path: 文档路径、文档对象或文档处理上下文。传入上下文时
+                直接在其共享的文档树上清洗，不再重新加载文件
             
         Returns:
             清洗后的文档对象和清洗统计信息
         """
         try:
             # 打开文档
-            doc = Document(doc_path)
-            stats = {
-                "total_paragraphs": len(doc.paragraphs),
-                "cleaned_paragraphs": 0,
-                "removed_paragraphs": 0
-            }
-            
-            # 清洗段落
-            paragraphs_to_remove = []
-            for i, para in enumerate(doc.paragraphs):
-                if not para.text.strip() and self.rules["remove_empty_paragraphs"]:
-                    paragraphs_to_remove.append(i)
-                    stats["removed_paragraphs"] += 1
-                    continue
-                
-                # 清洗文本
-                original_text = para.text
-                cleaned_text = self.clean_text(original_text)
-                
-                if cleaned_text != original_text:
-                    para.text = cleaned_text
-                    stats["cleaned_paragraphs"] += 1
+            doc = load_docx(doc_path)
+            # python-docx 的部件元素就是 lxml 元素，与 clean_package 共用同一遍遍历
+            roots = [doc.element] + [
+                rel.target_part.element for rel in doc.part.rels.values()
+                if rel.reltype in (RT.HEADER, RT.FOOTER) and not rel.is_external
+            ]
+            stats, _ = self._clean_trees(roots)
             
-            # 移除空段落（从后向前移除，避免索引变化）
-            for i in reversed(paragraphs_to_remove):
-                doc._body._body.remove(doc._body._body[i])
+            # 文档树已变化，之前缓存的结构不再有效
+            if isinstance(doc_path, DocumentContext):
+                doc_path.invalidate_structure()
             
             logger.info(f"Document cleaned: {stats}")
             return doc, stats
@@ -84,42 +128,183 @@ class DocumentCleaner:
             logger.error(f"Error cleaning document: {str(e)}")
             raise
     
-    def _normalize_punctuation(self, text: str) -> str:
-        """标准化标点符号
+    def clean_package(self, source: Union[DocumentContext, PackageSource],
+                      output_path: Union[str, Path]) -> Dict:
+        """在 XML 层清洗文档并写出清洗后的 .docx
+        
+        直接用 lxml 从 zip 包中解析 word/document.xml 和页眉页脚部件，只修改
+        文本发生变化的段落中的文本节点，不加载 python-docx 对象模型。其余部件
+        （图片等）和没有变化的 XML 部件按原来的压缩方式分块复制，不需要
+        序列化。清洗规则与 clean_document 相同。
         
         Args:
-            text: 待处理的文本
+            source: 文档处理上下文、文件路径或文件内容
+            output_path: 清洗后文档的保存路径
             
         Returns:
-            处理后的文本
+            清洗统计信息
         """
-        # 中文标点符号标准化
-        punctuation_map = {
-            '，': ',',  # 全角逗号转半角
-            '。': '.',  # 句号转点号
-            '：': ':',  # 全角冒号转半角
-            '；': ';',  # 全角分号转半角
-            '"': '"',   # 全角引号转半角
-            '"': '"',   # 全角引号转半角
-            ''': "'",   # 全角单引号转半角
-            ''': "'",   # 全角单引号转半角
-            '！': '!',  # 全角感叹号转半角
-            '？': '?',  # 全角问号转半角
-            '（': '(',  # 全角括号转半角
-            '）': ')',  # 全角括号转半角
-            '【': '[',  # 全角方括号转半角
-            '】': ']',  # 全角方括号转半角
-            '《': '<',  # 全角尖括号转半角
-            '》': '>',  # 全角尖括号转半角
-        }
+        package = source.package if isinstance(source, DocumentContext) else open_package(source)
+        try:
+            part_names, trees = self._parse_parts(source, package)
+            stats, changed = self._clean_trees([tree.getroot() for tree in trees])
+            
+            replacements = {
+                part_name: etree.tostring(tree, xml_declaration=True, encoding="UTF-8",
+                                          standalone=True)
+                for part_name, tree, part_changed in zip(part_names, trees, changed)
+                if part_changed
+            }
+            self._write_package(package, output_path, replacements)
+            
+            logger.info(f"Document cleaned: {stats}")
+            return stats
+            
+        except Exception as e:
+            logger.error(f"Error cleaning document: {str(e)}")
+            raise
+        finally:
+            if not isinstance(source, DocumentContext):
+                package.close()
+    
+    def clean_artifact(self, source: Union[DocumentContext, PackageSource]) -> Tuple[CleanedDocument, Dict]:
+        """清洗文档并生成紧凑的清洗产物
+        
+        清洗过程与 clean_package 相同，但不写出 .docx，只保留正文段落、表格和
+        段落样式，供解析和知识抽取直接使用
+        
+        Args:
+            source: 文档处理上下文、文件路径或文件内容
+            
+        Returns:
+            清洗产物和清洗统计信息
+        """
+        package = source.package if isinstance(source, DocumentContext) else open_package(source)
+        try:
+            _, trees = self._parse_parts(source, package)
+            stats, _ = self._clean_trees([tree.getroot() for tree in trees])
+            
+            styles_root = None
+            if STYLES_PART in package.NameToInfo:
+                with package.open(STYLES_PART) as stream:
+                    styles_root = etree.parse(stream).getroot()
+            cleaned = CleanedDocument.from_tree(trees[0].getroot(), styles_root,
+                                                read_relationships(package, DOCUMENT_PART))
+            
+            logger.info(f"Document cleaned: {stats}")
+            return cleaned, stats
+            
+        except Exception as e:
+            logger.error(f"Error cleaning document: {str(e)}")
+            raise
+        finally:
+            if not isinstance(source, DocumentContext):
+                package.close()
+    
+    def _parse_parts(self, source: Union[DocumentContext, PackageSource],
+                     package: zipfile.ZipFile) -> Tuple[List[str], List[etree._ElementTree]]:
+        """解析需要清洗的部件：word/document.xml 以及全部页眉页脚
         
-        for old, new in punctuation_map.items():
-            text = text.replace(old, new)
+        source 为上下文时取走其中验证阶段已解析的 word/document.xml 元素树，不再重复解析。
+        """
+        part_names = [DOCUMENT_PART] + header_footer_parts(package)
+        trees = []
+        for part_name in part_names:
+            if part_name == DOCUMENT_PART and isinstance(source, DocumentContext):
+                trees.append(source.take_document_tree())
+                continue
+            with package.open(part_name) as stream:
+                trees.append(etree.parse(stream))
+        return part_names, trees
+    
+    def _clean_trees(self, roots: List[etree._Element]) -> Tuple[Dict, List[bool]]:
+        """清洗主文档及页眉页脚的元素树
         
-        # 处理重复的标点符号
-        text = re.sub(r'([,.!?;])\1+', r'\1', text)
+        每棵树按文档顺序只遍历一遍，收集正文、表格单元格、文本框和页眉页脚中的
+        全部段落，所有段落文本一次批量清洗。只删除正文层级的空段落：单元格、
+        文本框和页眉页脚至少需要保留一个段落，其中的空段落保持不变；
+        包含图片、文本框或嵌入对象的段落不视为空段落。
         
-        # 确保标点符号后有空格
-        text = re.sub(r'([,.!?;:])([^\s])', r'\1 \2', text)
+        Args:
+            roots: 元素树的根元素，第一个为 word/document.xml
+            
+        Returns:
+            清洗统计信息，以及每棵树是否发生了变化
+        """
+        paragraphs = []
+        owners = []
+        stats = {
+            "total_paragraphs": 0,
+            "cleaned_paragraphs": 0,
+            "removed_paragraphs": 0,
+            "table_paragraphs": 0,
+            "text_box_paragraphs": 0,
+            "header_footer_paragraphs": 0,
+        }
+        for index, root in enumerate(roots):
+            header_footer = root.tag in (W_HDR, W_FTR)
+            for para in root.iter(W_P):
+                parent_tag = para.getparent().tag
+                if parent_tag == W_BODY:
+                    stats["total_paragraphs"] += 1
+                elif parent_tag == W_TC:
+                    stats["table_paragraphs"] += 1
+                elif parent_tag == W_TXBX_CONTENT:
+                    stats["text_box_paragraphs"] += 1
+                if header_footer:
+                    stats["header_footer_paragraphs"] += 1
+                paragraphs.append(para)
+                owners.append(index)
         
-        return text
\ No newline at end of file
+        texts = [paragraph_text(para) for para in paragraphs]
+        changed = [False] * len(roots)
+        for para, owner, original_text, cleaned_text in zip(
+                paragraphs, owners, texts, self.clean_texts(texts)):
+            parent = para.getparent()
+            if not original_text.strip():
+                if (parent.tag == W_BODY and self.rules["remove_empty_paragraphs"]
+                        and not has_embedded_content(para)):
+                    # 移除空段落
+                    parent.remove(para)
+                    stats["removed_paragraphs"] += 1
+                    changed[owner] = True
+            elif cleaned_text != original_text:
+                set_paragraph_text(para, cleaned_text)
+                stats["cleaned_paragraphs"] += 1
+                changed[owner] = True
+        return stats, changed
+    
+    def _write_package(self, package: zipfile.ZipFile, output_path: Union[str, Path],
+                       replacements: Dict[str, bytes]) -> None:
+        """写出清洗后的包：replacements 中的部件使用新内容，其余部件原样复制"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写入同目录下的临时文件，完成后再重命名
+        fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=".tmp_", suffix=".docx")
+        try:
+            with os.fdopen(fd, "wb") as output, zipfile.ZipFile(output, "w") as target:
+                for info in package.infolist():
+                    if info.filename in replacements:
+                        # 复制部件信息，避免修改源包中的记录
+                        target.writestr(copy.copy(info), replacements[info.filename],
+                                        compress_type=zipfile.ZIP_DEFLATED)
+                    else:
+                        copy_part(package, target, info)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    
+    def _normalizer(self) -> TextNormalizer:
+        """获取当前规则对应的文本规范化器
+        
+        内置规则开关或自定义规则变化时重新编译，同一规则集只编译一次
+        """
+        plugins = self.plugins.enabled_rules()
+        key = (self.rules["remove_extra_spaces"], self.rules["normalize_punctuation"],
+               tuple(map(id, plugins)))
+        if self._compiled_normalizer is None or self._normalizer_key != key:
+            self._compiled_normalizer = TextNormalizer(key[0], key[1], plugins)
+            self._normalizer_key = key
+        return self._compiled_normalizer
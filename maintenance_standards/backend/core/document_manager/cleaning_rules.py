@@ -0,0 +1,393 @@
+"""
+文档清洗规则模块
+主要功能：定义可插拔的文本清洗规则，并把启用的规则编译为尽量少的文本扫描
+"""
+import re
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Match, Optional, Pattern, Tuple, Union
+
+# 中文标点符号到半角标点的映射
+PUNCTUATION_MAP = {
+    '，': ',',  # 全角逗号转半角
+    '。': '.',  # 句号转点号
+    '：': ':',  # 全角冒号转半角
+    '；': ';',  # 全角分号转半角
+    '“': '"',  # 左双引号转半角
+    '”': '"',  # 右双引号转半角
+    '‘': "'",  # 左单引号转半角
+    '’': "'",  # 右单引号转半角
+    '！': '!',  # 全角感叹号转半角
+    '？': '?',  # 全角问号转半角
+    '（': '(',  # 全角括号转半角
+    '）': ')',  # 全角括号转半角
+    '【': '[',  # 全角方括号转半角
+    '】': ']',  # 全角方括号转半角
+    '《': '<',  # 全角尖括号转半角
+    '》': '>',  # 全角尖括号转半角
+}
+
+# 重复时合并为一个的标点
+COLLAPSIBLE_PUNCTUATION = ",.!?;"
+# 后面紧跟非空白字符时补一个空格的标点
+SPACED_PUNCTUATION = ",.!?;:"
+
+# 正则替换内容：模板字符串或接收匹配对象的函数
+Replacement = Union[str, Callable[[Match], str]]
+
+# 可以写成作用域内联标志 (?flags:...) 的正则标志
+_SCOPED_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x", re.ASCII: "a"}
+_FUSABLE_FLAGS = sum(_SCOPED_FLAGS) | re.UNICODE
+# 无法安全合并到同一个正则中的写法：反向引用、命名组、全局内联标志
+_UNFUSABLE_SYNTAX = re.compile(r"\\[1-9]|\\g<|\(\?P[<=]|\(\?\(|^\(\?[aiLmsux]+\)")
+# 映射条目不超过该数量时逐个 str.replace，否则使用 str.translate
+_MAX_REPLACE_CHAIN = 32
+
+
+class RuleKind(str, Enum):
+    """清洗规则类型"""
+    CHAR_MAP = "char_map"  # 字符映射
+    REGEX = "regex"        # 正则替换
+    CALLABLE = "callable"  # 自定义函数
+
+
+class CleaningRule:
+    """文本清洗规则
+
+    用 char_map、regex、callable 三个类方法创建。同类规则在执行时合并：
+    所有字符映射合并为一张映射表，所有正则合并为一个多选正则，
+    增加规则不会增加对文本的完整扫描次数。
+    """
+
+    def __init__(self, name: str, kind: RuleKind, mapping: Optional[Dict[str, str]] = None,
+                 pattern: Optional[str] = None, flags: int = 0,
+                 replacement: Optional[Replacement] = None,
+                 func: Optional[Callable[[str], str]] = None,
+                 description: str = "", version: str = "1", enabled: bool = True):
+        self.name = name
+        self.kind = RuleKind(kind)
+        self.mapping = mapping
+        self.pattern = pattern
+        self.flags = flags
+        self.replacement = replacement
+        self.func = func
+        self.description = description
+        self.version = version
+        self.enabled = enabled
+
+    @classmethod
+    def char_map(cls, name: str, mapping: Dict[str, str], **kwargs) -> "CleaningRule":
+        """字符映射规则
+
+        Args:
+            name: 规则名称
+            mapping: 单个字符到替换文本的映射
+        """
+        invalid = [key for key in mapping if len(key) != 1]
+        if invalid:
+            raise ValueError(f"字符映射的键必须是单个字符: {invalid}")
+        return cls(name, RuleKind.CHAR_MAP, mapping=dict(mapping), **kwargs)
+
+    @classmethod
+    def regex(cls, name: str, pattern: str, replacement: Replacement, flags: int = 0,
+              **kwargs) -> "CleaningRule":
+        """正则替换规则
+
+        Args:
+            name: 规则名称
+            pattern: 正则表达式
+            replacement: 替换模板（支持 \\1 等分组引用）或接收匹配对象的函数
+            flags: 正则标志
+        """
+        re.compile(pattern, flags)
+        return cls(name, RuleKind.REGEX, pattern=pattern, flags=flags,
+                   replacement=replacement, **kwargs)
+
+    @classmethod
+    def callable(cls, name: str, func: Callable[[str], str], **kwargs) -> "CleaningRule":
+        """自定义函数规则，逐段调用 func(text) -> text
+
+        批量上传在多进程中执行，func 需要是可以被 pickle 的模块级函数。
+        修改函数实现后应同时修改 version。
+        """
+        return cls(name, RuleKind.CALLABLE, func=func, **kwargs)
+
+    def signature(self) -> Tuple:
+        """规则的签名，用于计算清洗规则指纹
+
+        包含名称、类型、版本和规则数据；替换函数和自定义函数无法比较内容，
+        修改其实现时需要同时修改 version。
+        """
+        replacement = self.replacement if isinstance(self.replacement, str) else None
+        mapping = tuple(sorted(self.mapping.items())) if self.mapping else None
+        return (self.name, self.kind.value, self.version, mapping, self.pattern, self.flags,
+                replacement)
+
+    def __repr__(self) -> str:
+        return f"CleaningRule(name={self.name!r}, kind={self.kind.value!r}, enabled={self.enabled})"
+
+
+class CleaningRuleRegistry:
+    """清洗规则注册表，按注册顺序保存规则"""
+
+    def __init__(self, rules: Iterable[CleaningRule] = ()):
+        self._rules: Dict[str, CleaningRule] = {}
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule: CleaningRule, replace: bool = False) -> CleaningRule:
+        """注册规则
+
+        Args:
+            rule: 清洗规则
+            replace: 同名规则已存在时是否替换
+
+        Raises:
+            ValueError: 同名规则已存在且 replace 为 False 时
+        """
+        if rule.name in self._rules and not replace:
+            raise ValueError(f"清洗规则已存在: {rule.name}")
+        self._rules[rule.name] = rule
+        return rule
+
+    def unregister(self, name: str) -> None:
+        """移除规则"""
+        self._rules.pop(name, None)
+
+    def get(self, name: str) -> Optional[CleaningRule]:
+        return self._rules.get(name)
+
+    def enable(self, name: str) -> None:
+        self._rules[name].enabled = True
+
+    def disable(self, name: str) -> None:
+        self._rules[name].enabled = False
+
+    def enabled_rules(self) -> List[CleaningRule]:
+        """按注册顺序返回启用的规则"""
+        return [rule for rule in self._rules.values() if rule.enabled]
+
+    def __iter__(self) -> Iterator[CleaningRule]:
+        return iter(list(self._rules.values()))
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rules
+
+
+class TextNormalizer:
+    """编译后的文本清洗执行计划
+
+    按以下阶段执行，每个阶段对文本只扫描一遍：
+
+    1. 连续空白合并为一个空格并去除首尾空白（remove_extra_spaces）
+    2. 字符映射：内置中文标点映射（normalize_punctuation）与所有字符映射规则
+       合并为一张映射表，同一字符以后注册的规则为准
+    3. 内置标点规则：重复的 ,.!?; 合并为一个；,.!?;: 后紧跟非空白字符时补一个
+       空格。补空格的正则是成对消耗字符的，相邻的不同标点如 ".,x" 得到 ". ,x"
+    4. 正则规则合并为一个多选正则，从左到右扫描，同一位置按注册顺序优先匹配；
+       各规则看到的都是本阶段之前的文本。含反向引用、命名组或全局内联标志的
+       正则无法合并，单独执行
+    5. 自定义函数规则按注册顺序逐段调用
+
+    阶段 1-3 批量处理时把整批文本用分隔符拼接成一个字符串，在 C 层完成：
+
+    - 空白规则使用 str.split / str.join
+    - 字符映射较少时逐个使用 str.replace（非 ASCII 文本上 str.translate
+      逐字符查表，映射较少时反而更慢），较多时使用 str.translate
+    - 补空格先用 str.replace 在每个标点后插入标记字符，再用以标记字符
+      开头的正则（可快速定位）删除后面是空白或段落结尾的标记
+    - 只有两个以上相邻标点（较少见）需要按原规则逐段处理，由一个正则
+      回调完成，处理后的标点暂时替换为占位字符，不参与补空格
+
+    文本中含有分隔符、标记或占位字符（XML 中不允许出现的控制字符，
+    文档文本中不会出现）时，该批改用逐段正则处理。
+    """
+
+    # 批处理使用的控制字符
+    _SEPARATOR = "\x00"
+    _MARKER = "\x01"
+    _PLACEHOLDERS = "\x02\x03\x04\x05\x06\x07"
+    _RESERVED = _MARKER + _PLACEHOLDERS
+    # 相邻标点处理结果的缓存条目上限
+    _RUN_CACHE_SIZE = 4096
+
+    def __init__(self, remove_extra_spaces: bool = True, normalize_punctuation: bool = True,
+                 rules: Iterable[CleaningRule] = ()):
+        self.remove_extra_spaces = remove_extra_spaces
+        self.normalize_punctuation = normalize_punctuation
+        rules = [rule for rule in rules if rule.enabled]
+
+        char_map = dict(PUNCTUATION_MAP) if normalize_punctuation else {}
+        for rule in rules:
+            if rule.kind == RuleKind.CHAR_MAP:
+                char_map.update(rule.mapping)
+        self._char_map = char_map
+        self._table = str.maketrans(char_map)
+        # 映射结果中含有其他映射的键时，逐个替换会产生连锁替换，只能使用 str.translate
+        self._replace_chain = len(char_map) <= _MAX_REPLACE_CHAIN and not any(
+            key in value for value in char_map.values() for key in char_map
+        )
+
+        self._to_placeholder = str.maketrans(SPACED_PUNCTUATION, self._PLACEHOLDERS)
+        self._run_cache: Dict[str, str] = {}
+        punctuation = re.escape(SPACED_PUNCTUATION)
+        self._run_pattern = re.compile(f"[{punctuation}]{{2,}}")
+        self._marker_pattern = re.compile(f"{self._MARKER}(?=[\\s{self._SEPARATOR}]|\\Z)")
+        # 逐段处理：合并重复标点和补空格合并为一个正则，紧跟的字符本身是可合并的
+        # 标点时同样先合并，保证与逐条执行两条规则的结果一致
+        self._fallback_pattern = re.compile(
+            r"(?:(?P<p>[,.!?;])(?P=p)*|:)(?:(?P<q>[,.!?;])(?P=q)*|(?P<c>\S))?"
+        )
+
+        self._fused_pattern, self._fused_rules, self._separate_patterns = _compile_regex_rules(
+            [rule for rule in rules if rule.kind == RuleKind.REGEX]
+        )
+        self._functions = [rule.func for rule in rules if rule.kind == RuleKind.CALLABLE]
+
+    def __call__(self, text: str) -> str:
+        """规范化单个文本"""
+        return self.normalize_many([text])[0]
+
+    def normalize_many(self, texts: List[str]) -> List[str]:
+        """批量规范化文本
+
+        Args:
+            texts: 待处理的文本列表
+
+        Returns:
+            处理后的文本列表，顺序与输入一致
+        """
+        if not texts:
+            return []
+        joined = self._SEPARATOR.join(texts)
+        if (joined.count(self._SEPARATOR) != len(texts) - 1
+                or any(char in joined for char in self._RESERVED)):
+            results = [self._normalize_builtin_fallback(text) for text in texts]
+        else:
+            results = self._normalize_builtin_batch(joined)
+
+        if self._fused_pattern is not None or self._separate_patterns or self._functions:
+            results = [self._apply_custom(text) for text in results]
+        return results
+
+    def _normalize_builtin_batch(self, joined: str) -> List[str]:
+        """在拼接后的整批文本上执行阶段 1-3"""
+        if self.remove_extra_spaces:
+            joined = " ".join(joined.split())
+        if self._char_map:
+            if self._replace_chain:
+                for old, new in self._char_map.items():
+                    if old in joined:
+                        joined = joined.replace(old, new)
+            else:
+                joined = joined.translate(self._table)
+        if self.normalize_punctuation:
+            joined = self._run_pattern.sub(self._replace_run, joined)
+            for char in SPACED_PUNCTUATION:
+                joined = joined.replace(char, char + self._MARKER)
+            joined = self._marker_pattern.sub("", joined).replace(self._MARKER, " ")
+            for placeholder, char in zip(self._PLACEHOLDERS, SPACED_PUNCTUATION):
+                if placeholder in joined:
+                    joined = joined.replace(placeholder, char)
+
+        results = joined.split(self._SEPARATOR)
+        if self.remove_extra_spaces:
+            results = [text.strip() for text in results]
+        return results
+
+    def _replace_run(self, match: Match) -> str:
+        """按原规则处理相邻标点：先合并重复标点，再从左到右两两补空格
+
+        成对的标点替换为占位字符；剩余的最后一个标点保持原样，
+        由后续的补空格步骤根据其后的字符处理
+        """
+        text = match.group(0)
+        cached = self._run_cache.get(text)
+        if cached is not None:
+            return cached
+        run = []
+        for char in text:
+            if not (run and char == run[-1] and char in COLLAPSIBLE_PUNCTUATION):
+                run.append(char)
+        paired = len(run) - len(run) % 2
+        parts = [f"{run[i]} {run[i + 1]}".translate(self._to_placeholder) for i in range(0, paired, 2)]
+        if paired < len(run):
+            parts.append(run[-1])
+        result = "".join(parts)
+        if len(self._run_cache) < self._RUN_CACHE_SIZE:
+            self._run_cache[text] = result
+        return result
+
+    def _normalize_builtin_fallback(self, text: str) -> str:
+        """逐段执行阶段 1-3，用于含有保留控制字符的文本"""
+        if self.remove_extra_spaces:
+            text = " ".join(text.split())
+        if self._char_map:
+            text = text.translate(self._table)
+        if self.normalize_punctuation:
+            text = self._fallback_pattern.sub(_punctuation_replacement, text)
+        return text
+
+    def _apply_custom(self, text: str) -> str:
+        """逐段执行正则规则和自定义函数规则"""
+        if self._fused_pattern is not None:
+            text = self._fused_pattern.sub(self._dispatch, text)
+        for pattern, replacement in self._separate_patterns:
+            text = pattern.sub(replacement, text)
+        for func in self._functions:
+            text = func(text)
+        return text
+
+    def _dispatch(self, match: Match) -> str:
+        """找到合并正则命中的规则并计算替换内容"""
+        for pattern, replacement in self._fused_rules:
+            # 用规则自身的正则在同一位置重新匹配，分组编号与规则定义一致
+            own_match = pattern.match(match.string, match.start())
+            if own_match is not None:
+                break
+        if isinstance(replacement, str) and "\\" not in replacement:
+            return replacement
+        if callable(replacement):
+            return replacement(own_match)
+        return own_match.expand(replacement)
+
+
+def _punctuation_replacement(match: Match) -> str:
+    """逐段处理正则的替换函数"""
+    text = match.group(0)
+    following = match.group("q") or match.group("c")
+    return f"{text[0]} {following}" if following else text[0]
+
+
+def _compile_regex_rules(
+    rules: List[CleaningRule]
+) -> Tuple[Optional[Pattern], List[Tuple[Pattern, Replacement]], List[Tuple[Pattern, Replacement]]]:
+    """把正则规则合并为一个多选正则
+
+    各规则只用非捕获组包裹，不增加捕获组，re 模块仍能从各规则的首字符
+    提取前缀快速定位候选位置（加捕获组后逐位置尝试每个分支，规则较多时
+    慢上千倍）。匹配后按注册顺序在同一位置尝试各规则自身的正则，第一个
+    匹配的就是多选正则命中的分支。
+
+    Returns:
+        合并后的正则（没有可合并的规则时为 None）、按顺序排列的可合并规则正则
+        和替换内容、需要单独执行的正则及其替换内容
+    """
+    alternatives = []
+    fused = []
+    separate = []
+    for rule in rules:
+        pattern = re.compile(rule.pattern, rule.flags)
+        if _UNFUSABLE_SYNTAX.search(rule.pattern) or rule.flags & ~_FUSABLE_FLAGS:
+            separate.append((pattern, rule.replacement))
+            continue
+        scoped_flags = "".join(flag for value, flag in _SCOPED_FLAGS.items() if rule.flags & value)
+        # 换行结束 VERBOSE 模式下可能存在的行尾注释
+        end = "\n)" if rule.flags & re.VERBOSE else ")"
+        alternatives.append(f"(?{scoped_flags}:{rule.pattern}{end}")
+        fused.append((pattern, rule.replacement))
+    if not alternatives:
+        return None, [], separate
+    return re.compile("|".join(alternatives)), fused, separate
@@ -0,0 +1,201 @@
+import io
+import os
+import hashlib
+import zipfile
+from pathlib import Path
+from typing import Optional, Union
+from docx import Document as DocxDocument
+from docx.document import Document as _Document
+from lxml import etree
+
+from .artifact import CleanedDocument, is_artifact_path
+from .ooxml import DOCUMENT_PART, open_package
+from ...models.document_structure import DocumentStructure
+
+class DocumentContext:
+    """文档处理上下文
+
+    在上传流水线的各个阶段（验证、清洗、内容检查、解析）之间共享同一份
+    文档数据：原始字节、内容哈希、word/document.xml 的元素树、python-docx 文档树
+    以及解析后的文档结构。
+    所有派生数据均在首次访问时计算并缓存，保证每个文件只解析一次。
+    
+    原始内容可以保存在内存中（file_content），也可以只引用磁盘上的文件
+    （source_path），后者不会把整个文件读入内存。
+    """
+
+    # 分块读取文件时的块大小
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, file_content: Optional[Union[bytes, memoryview]], filename: str,
+                 file_path: Optional[str] = None, source_path: Optional[str] = None,
+                 content_hash: Optional[str] = None):
+        if file_content is None and source_path is None:
+            raise ValueError("file_content 和 source_path 至少需要提供一个")
+        self.file_content = file_content
+        self.filename = filename
+        self.file_path = file_path
+        self.source_path = source_path
+        self._content_hash: Optional[str] = content_hash
+        self._package: Optional[zipfile.ZipFile] = None
+        self._document_tree: Optional[etree._ElementTree] = None
+        self.cleaned: Optional[CleanedDocument] = None
+        self.cleaning_fingerprint: Optional[str] = None
+        self._docx: Optional[_Document] = None
+        self._structure: Optional[DocumentStructure] = None
+
+    def __str__(self) -> str:
+        return self.file_path or self.filename
+
+    @classmethod
+    def from_path(cls, file_path: Union[str, Path], filename: Optional[str] = None,
+                  content_hash: Optional[str] = None) -> "DocumentContext":
+        """从磁盘文件创建上下文，文件内容不读入内存"""
+        path = Path(file_path)
+        return cls(None, filename or path.name, file_path=str(path),
+                   source_path=str(path), content_hash=content_hash)
+
+    @property
+    def content_hash(self) -> str:
+        """文件内容的 SHA-256 哈希值"""
+        if self._content_hash is None:
+            if self.file_content is not None:
+                self._content_hash = hashlib.sha256(self.file_content).hexdigest()
+            else:
+                hasher = hashlib.sha256()
+                with open(self.source_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+                self._content_hash = hasher.hexdigest()
+        return self._content_hash
+
+    @property
+    def file_size(self) -> int:
+        """文件大小（字节）"""
+        if self.file_content is not None:
+            return memoryview(self.file_content).nbytes
+        return os.path.getsize(self.source_path)
+
+    def head(self, size: int) -> bytes:
+        """读取文件开头的若干字节"""
+        if self.file_content is not None:
+            return bytes(memoryview(self.file_content)[:size])
+        with open(self.source_path, "rb") as f:
+            return f.read(size)
+
+    @property
+    def package(self) -> zipfile.ZipFile:
+        """zip 包对象（只读取中央目录）"""
+        if self._package is None:
+            source = self.file_content if self.file_content is not None else self.source_path
+            self._package = open_package(source)
+        return self._package
+
+    @property
+    def document_tree(self) -> etree._ElementTree:
+        """原始文件 word/document.xml 的元素树（仅解析一次）"""
+        if self._document_tree is None:
+            with self.package.open(DOCUMENT_PART) as stream:
+                self._document_tree = etree.parse(stream)
+        return self._document_tree
+
+    def take_document_tree(self) -> etree._ElementTree:
+        """取走 word/document.xml 的元素树
+
+        清洗会直接修改元素树，取走后上下文不再保留，之后再次访问时重新解析原始文件。
+        """
+        tree = self.document_tree
+        self._document_tree = None
+        return tree
+
+    @property
+    def docx(self) -> _Document:
+        """原始文件的 python-docx 文档对象（仅加载一次）"""
+        if self._docx is None:
+            if self.file_content is not None:
+                # 直接从内存缓冲区加载，不经过临时文件
+                self._docx = DocxDocument(io.BytesIO(self.file_content))
+            else:
+                self._docx = DocxDocument(self.source_path)
+        return self._docx
+
+    @property
+    def structure(self) -> DocumentStructure:
+        """解析后的文档结构（仅解析一次）"""
+        if self._structure is None:
+            from .parser import DocumentParser
+            self._structure = DocumentParser().parse_document(self)
+        return self._structure
+
+    @structure.setter
+    def structure(self, value: DocumentStructure) -> None:
+        self._structure = value
+
+    def use_cleaned(self, cleaned: CleanedDocument, path: Union[str, Path],
+                    fingerprint: Optional[str] = None) -> None:
+        """后续阶段（解析、知识抽取）改用清洗产物
+        
+        丢弃已缓存的结构，之后从清洗产物重新解析，不再加载 python-docx 文档树。
+        原始内容、内容哈希和 zip 包仍指向原始文件。
+        
+        Args:
+            cleaned: 清洗产物
+            path: 清洗产物的保存路径
+            fingerprint: 生成清洗产物的清洗规则指纹，未知时为 None
+        """
+        self.cleaned = cleaned
+        self.cleaning_fingerprint = fingerprint
+        self.file_path = str(path)
+        self._structure = None
+
+    def invalidate_structure(self) -> None:
+        """文档树被修改后（例如清洗之后）丢弃已缓存的结构"""
+        self._structure = None
+
+    def close(self) -> None:
+        """关闭打开的 zip 包文件句柄
+        
+        已解析的元素树和文档结构仍然保留：流式上传把文件移动到存储之前会关闭句柄，
+        之后的清洗继续使用验证阶段解析的元素树，需要读取其他部件时再从 source_path
+        重新打开 zip 包。
+        """
+        if self._package is not None:
+            self._package.close()
+            self._package = None
+
+
+DocumentSource = Union[str, Path, _Document, CleanedDocument, DocumentContext]
+
+
+def load_docx(source: DocumentSource) -> _Document:
+    """获取 python-docx 文档对象
+
+    Args:
+        source: 文档路径、已加载的文档对象或文档处理上下文
+
+    Returns:
+        python-docx 文档对象；对于上下文会复用其中已加载的文档树
+    """
+    if isinstance(source, DocumentContext):
+        return source.docx
+    if isinstance(source, _Document):
+        return source
+    return DocxDocument(str(source))
+
+
+def load_cleaned(source: DocumentSource) -> Optional[CleanedDocument]:
+    """获取清洗产物
+
+    Args:
+        source: 清洗产物、清洗产物路径、文档处理上下文或其他文档来源
+
+    Returns:
+        清洗产物；上下文尚未清洗或来源不是清洗产物时返回 None
+    """
+    if isinstance(source, CleanedDocument):
+        return source
+    if isinstance(source, DocumentContext):
+        return source.cleaned
+    if isinstance(source, (str, Path)) and is_artifact_path(source):
+        return CleanedDocument.load(source)
+    return None
@@ -0,0 +1,343 @@
+"""
+OOXML 包读取工具
+主要功能：直接读取 .docx 的 zip 包内容，无需加载 python-docx 对象模型
+"""
+import io
+import re
+import copy
+import shutil
+import posixpath
+import zipfile
+from pathlib import Path
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+from xml.etree import ElementTree
+from lxml import etree
+
+# 包内部件名称
+CONTENT_TYPES_PART = "[Content_Types].xml"
+DOCUMENT_PART = "word/document.xml"
+STYLES_PART = "word/styles.xml"
+CORE_PROPERTIES_PART = "docProps/core.xml"
+APP_PROPERTIES_PART = "docProps/app.xml"
+
+# 命名空间
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+CP_NS = "http://schemas.openxmlformats.org/package/2006/metadata/core-properties"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+DCTERMS_NS = "http://purl.org/dc/terms/"
+EP_NS = "http://schemas.openxmlformats.org/officeDocument/2006/extended-properties"
+
+# 文档属性元素到属性名的映射
+CORE_PROPERTIES = {
+    f"{{{DC_NS}}}title": "title",
+    f"{{{DC_NS}}}subject": "subject",
+    f"{{{DC_NS}}}creator": "author",
+    f"{{{DC_NS}}}description": "description",
+    f"{{{CP_NS}}}keywords": "keywords",
+    f"{{{CP_NS}}}category": "category",
+    f"{{{CP_NS}}}lastModifiedBy": "last_modified_by",
+    f"{{{CP_NS}}}revision": "revision",
+    f"{{{CP_NS}}}version": "version",
+    f"{{{DCTERMS_NS}}}created": "created",
+    f"{{{DCTERMS_NS}}}modified": "modified",
+}
+APP_PROPERTIES = {
+    f"{{{EP_NS}}}Company": "company",
+    f"{{{EP_NS}}}Manager": "manager",
+    f"{{{EP_NS}}}Template": "template",
+    f"{{{EP_NS}}}Pages": "pages",
+    f"{{{EP_NS}}}Words": "words",
+    f"{{{EP_NS}}}AppVersion": "app_version",
+}
+
+# 属性部件大小上限，超过时视为异常不读取
+MAX_PROPERTIES_PART_SIZE = 1024 * 1024
+
+# 复制部件时每次读写的字节数
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Word 主文档部件允许的内容类型
+WORD_MAIN_CONTENT_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml",
+    "application/vnd.ms-word.document.macroEnabled.main+xml",
+    "application/vnd.ms-word.template.macroEnabledTemplate.main+xml",
+}
+
+# 页眉、页脚部件的内容类型
+HEADER_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"
+FOOTER_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml"
+
+# WordprocessingML 元素标签
+W_DOCUMENT = f"{{{W_NS}}}document"
+W_BODY = f"{{{W_NS}}}body"
+W_P = f"{{{W_NS}}}p"
+W_R = f"{{{W_NS}}}r"
+W_T = f"{{{W_NS}}}t"
+W_TBL = f"{{{W_NS}}}tbl"
+W_TC = f"{{{W_NS}}}tc"
+W_TXBX_CONTENT = f"{{{W_NS}}}txbxContent"
+W_HDR = f"{{{W_NS}}}hdr"
+W_FTR = f"{{{W_NS}}}ftr"
+W_HYPERLINK = f"{{{W_NS}}}hyperlink"
+W_TAB = f"{{{W_NS}}}tab"
+W_PTAB = f"{{{W_NS}}}ptab"
+W_BR = f"{{{W_NS}}}br"
+W_CR = f"{{{W_NS}}}cr"
+W_NO_BREAK_HYPHEN = f"{{{W_NS}}}noBreakHyphen"
+W_TYPE = f"{{{W_NS}}}type"
+W_RPR = f"{{{W_NS}}}rPr"
+W_DRAWING = f"{{{W_NS}}}drawing"
+W_PICT = f"{{{W_NS}}}pict"
+W_OBJECT = f"{{{W_NS}}}object"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+# 产生段落文本的 w:r 子元素
+TEXT_RUN_CHILDREN = (W_T, W_TAB, W_PTAB, W_BR, W_CR, W_NO_BREAK_HYPHEN)
+
+# zip 本地文件头魔数
+ZIP_MAGIC = b"PK\x03\x04"
+
+PackageSource = Union[bytes, memoryview, str, Path, BinaryIO]
+
+
+def open_package(source: PackageSource) -> zipfile.ZipFile:
+    """打开 OOXML 包
+
+    只读取 zip 中央目录，不解压任何部件。
+
+    Args:
+        source: 文件内容、文件路径或二进制文件对象
+
+    Returns:
+        zip 包对象
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif isinstance(source, Path):
+        source = str(source)
+    return zipfile.ZipFile(source)
+
+
+def read_content_types(package: zipfile.ZipFile) -> dict:
+    """读取 [Content_Types].xml 中针对具体部件的内容类型声明
+
+    Returns:
+        部件名（不含前导斜杠）到内容类型的映射
+    """
+    root = ElementTree.fromstring(package.read(CONTENT_TYPES_PART))
+    overrides = {}
+    for override in root.iter(f"{{{CONTENT_TYPES_NS}}}Override"):
+        part_name = override.get("PartName", "").lstrip("/")
+        overrides[part_name] = override.get("ContentType", "")
+    return overrides
+
+
+def read_document_properties(package: zipfile.ZipFile) -> Dict[str, str]:
+    """读取 docProps/core.xml 和 docProps/app.xml 中的文档属性
+
+    只解压这两个很小的部件，不加载文档正文。
+
+    Args:
+        package: 已打开的 OOXML 包
+
+    Returns:
+        属性名到文本值的映射，只包含文档中存在且非空的属性
+    """
+    properties = {}
+    for part_name, mapping in ((CORE_PROPERTIES_PART, CORE_PROPERTIES),
+                               (APP_PROPERTIES_PART, APP_PROPERTIES)):
+        try:
+            info = package.getinfo(part_name)
+        except KeyError:
+            continue
+        if info.file_size > MAX_PROPERTIES_PART_SIZE:
+            continue
+        root = ElementTree.fromstring(package.read(info))
+        for child in root:
+            name = mapping.get(child.tag)
+            value = (child.text or "").strip()
+            if name and value:
+                properties[name] = value
+    return properties
+
+
+def read_relationships(package: zipfile.ZipFile, part_name: str) -> Dict[str, str]:
+    """读取部件的内部关系
+
+    Args:
+        package: 已打开的 OOXML 包
+        part_name: 部件名称，例如 word/document.xml
+
+    Returns:
+        关系ID到目标路径（相对于部件所在目录，与 python-docx 的 target_ref 一致）的映射，
+        部件没有关系时为空
+    """
+    directory, _, name = part_name.rpartition("/")
+    rels_name = f"{directory}/_rels/{name}.rels" if directory else f"_rels/{name}.rels"
+    if rels_name not in package.NameToInfo:
+        return {}
+    root = ElementTree.fromstring(package.read(rels_name))
+    return {
+        rel.get("Id"): rel.get("Target")
+        for rel in root.iter(f"{{{RELATIONSHIPS_NS}}}Relationship")
+        if rel.get("TargetMode") != "External"
+    }
+
+
+def resolve_part_name(part_name: str, target: str) -> str:
+    """把关系目标路径解析为包内的部件名称
+
+    Args:
+        part_name: 关系所属的部件名称，例如 word/document.xml
+        target: 关系目标，相对于部件所在目录（如 media/image1.png）或以 / 开头的包内绝对路径
+
+    Returns:
+        部件名称，例如 word/media/image1.png
+    """
+    if target.startswith("/"):
+        return posixpath.normpath(target).lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part_name), target))
+
+
+def header_footer_parts(package: zipfile.ZipFile) -> List[str]:
+    """按 [Content_Types].xml 的声明获取包中全部页眉、页脚部件的名称"""
+    return [
+        part_name for part_name, content_type in read_content_types(package).items()
+        if content_type in (HEADER_CONTENT_TYPE, FOOTER_CONTENT_TYPE) and part_name in package.NameToInfo
+    ]
+
+
+def parse_w3cdtf(value: Optional[str]) -> Optional[datetime]:
+    """解析文档属性中的 W3CDTF 日期时间，无法解析时返回 None"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def run_text(run: etree._Element) -> str:
+    """获取 w:r 元素的文本，与 python-docx 的 Run.text 规则一致"""
+    parts = []
+    for node in run.iterchildren(*TEXT_RUN_CHILDREN):
+        tag = node.tag
+        if tag == W_T:
+            parts.append(node.text or "")
+        elif tag in (W_TAB, W_PTAB):
+            parts.append("\t")
+        elif tag == W_CR:
+            parts.append("\n")
+        elif tag == W_BR:
+            if node.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(para: etree._Element) -> str:
+    """获取 w:p 元素的文本，与 python-docx 的 Paragraph.text 规则一致"""
+    parts = []
+    for child in para.iterchildren(W_R, W_HYPERLINK):
+        if child.tag == W_R:
+            parts.append(run_text(child))
+        else:
+            parts.extend(run_text(run) for run in child.iterchildren(W_R))
+    return "".join(parts)
+
+
+def iter_body_paragraph_texts(package: zipfile.ZipFile) -> Iterator[str]:
+    """流式遍历正文层级段落的文本
+
+    使用 iterparse 直接从 zip 中解压并解析 word/document.xml，处理完的元素
+    立即清除，内存占用与文档大小无关。只返回 w:body 的直接子段落，
+    与 python-docx 的 Document.paragraphs 一致（不含表格内的段落）。
+
+    Args:
+        package: 已打开的 OOXML 包
+
+    Yields:
+        段落文本
+    """
+    with package.open(DOCUMENT_PART) as stream:
+        for _, elem in etree.iterparse(stream, events=("end",), tag=(W_P, W_TBL)):
+            parent = elem.getparent()
+            if parent is None or parent.tag != W_BODY:
+                continue
+            if elem.tag == W_P:
+                yield paragraph_text(elem)
+            # 释放已处理的元素及其之前的兄弟节点
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def has_embedded_content(para: etree._Element) -> bool:
+    """段落中是否包含图片、文本框或嵌入对象"""
+    return next(para.iter(W_DRAWING, W_PICT, W_OBJECT), None) is not None
+
+
+def paragraph_runs(para: etree._Element) -> Iterator[etree._Element]:
+    """按顺序遍历段落中参与 paragraph_text 的 w:r 元素（包括超链接中的）"""
+    for child in para.iterchildren(W_R, W_HYPERLINK):
+        if child.tag == W_R:
+            yield child
+        else:
+            yield from child.iterchildren(W_R)
+
+
+def set_paragraph_text(para: etree._Element, text: str) -> None:
+    """修改 w:p 元素的文本，之后 paragraph_text 返回 text
+
+    与 python-docx 的 Paragraph.text 赋值不同，不会删除整个段落的内容：
+    文本写入段落中第一个 w:t 所在的 run（保留其格式），其余 run 只删除
+    产生文本的子元素，图片、域代码等其他内容保持不变。\t 和 \n 分别写为
+    w:tab 和 w:br，与 python-docx 一致。
+    """
+    text_nodes = [
+        node for run in paragraph_runs(para) for node in run.iterchildren(*TEXT_RUN_CHILDREN)
+        if node.tag != W_BR or node.get(W_TYPE, "textWrapping") == "textWrapping"
+    ]
+    anchor = next((node for node in text_nodes if node.tag == W_T), None)
+    if anchor is None:
+        run = etree.SubElement(para, W_R)
+        anchor = etree.SubElement(run, W_T)
+        text_nodes.append(anchor)
+
+    # 在第一个 w:t 的位置依次写入文本片段、w:tab 和 w:br
+    position = anchor
+    for index, piece in enumerate(re.split(r"([\t\n])", text)):
+        if index % 2:
+            node = etree.Element(W_TAB if piece == "\t" else W_BR)
+        elif piece or index == 0:
+            node = etree.Element(W_T)
+            node.text = piece
+            if piece != piece.strip():
+                node.set(XML_SPACE, "preserve")
+        else:
+            continue
+        position.addnext(node)
+        position = node
+    for node in text_nodes:
+        node.getparent().remove(node)
+
+
+def copy_part(source: zipfile.ZipFile, target: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+    """把部件复制到另一个 zip 包，文件名、时间戳和压缩方式保持不变
+
+    只使用 ZipFile 的公开接口：按块解压源部件并以原来的压缩方式写入目标包，
+    不会把整个部件读入内存。
+
+    Args:
+        source: 源 zip 包
+        target: 以写模式打开的目标 zip 包
+        info: 源包中的部件信息
+    """
+    # 复制部件信息，避免修改源包中的记录
+    with source.open(info) as src, target.open(copy.copy(info), "w") as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
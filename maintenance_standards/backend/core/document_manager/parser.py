@@ -1,22 +1,31 @@
 import re
-from typing import List, Tuple, Dict, Optional
-from docx import Document
-from docx.document import Document as _Document
-from docx.text.paragraph import Paragraph as DocxParagraph
-from docx.table import Table as DocxTable
+import hashlib
+import zipfile
 from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
 from loguru import logger
 
+from .artifact import TABLE_BLOCK, CleanedDocument, iter_body_blocks, read_package_styles
+from .context import DocumentContext, DocumentSource, load_cleaned, load_docx
+from .ooxml import DOCUMENT_PART, open_package, read_relationships
 from ...models.document_structure import (
     DocumentStructure,
     Section,
     Paragraph,
+    ParagraphRecord,
     Table,
-    TableCell,
     Image,
     ParagraphType
 )
 
+# 解析器版本，解析结果或 dump_structure 的格式变化时递增，使解析缓存失效
+PARSER_VERSION = "2"
+
+# 章标题及其中的中文数字
+CHAPTER_PATTERN = re.compile(r'^第([一二三四五六七八九十]+)章')
+CHINESE_NUMERALS = {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
+                    '六': 6, '七': 7, '八': 8, '九': 9, '十': 10}
+
 class DocumentParser:
     """文档解析器，用于解析文档结构和内容"""
     
@@ -35,34 +44,38 @@ class DocumentParser:
             r"^\(?[0-9a-zA-Z]\)?[\s.、].*$",  # (1) 或 1. 或 1、
             r"^[-—]\s+.*$",  # 短横线
         ]
+        
+        # 合并编译后的分类正则，见 _classifier
+        self._classifier_key = None
+        self._compiled_classifier: Optional[Pattern] = None
+        self._title_levels: List[int] = []
     
-    def parse_document(self, doc_path: str) -> DocumentStructure:
+    def parse_document(self, doc_path: DocumentSource) -> DocumentStructure:
         """解析文档
         
         Args:
-            doc_path: 文档路径
+            doc_path: 文档路径、清洗产物（或其路径）、文档对象或文档处理上下文。
+                传入上下文时优先使用其中的清洗产物，否则复用已加载的文档树，
+                并把解析结果缓存到上下文中
             
         Returns:
             解析后的文档结构
         """
+        if isinstance(doc_path, DocumentContext) and doc_path._structure is not None:
+            return doc_path._structure
+        
         try:
-            # 打开文档
-            doc = Document(doc_path)
-            
             # 初始化文档结构
             structure = DocumentStructure()
             
-            # 解析段落
-            self._parse_paragraphs(doc, structure)
+            # 单遍解析正文中的段落、表格和图片
+            self._parse_blocks(self._load_content(doc_path), structure)
             
             # 解析文档结构（章节）
             self._parse_sections(structure)
             
-            # 解析表格
-            self._parse_tables(doc, structure)
-            
-            # 解析图片
-            self._parse_images(doc, structure)
+            if isinstance(doc_path, DocumentContext):
+                doc_path.structure = structure
             
             logger.info(f"Document parsed successfully: {doc_path}")
             return structure
@@ -71,56 +84,321 @@ class DocumentParser:
             logger.error(f"Error parsing document: {str(e)}")
             raise
     
-    def _parse_paragraphs(self, doc: _Document, structure: DocumentStructure):
-        """解析段落"""
-        for idx, para in enumerate(doc.paragraphs):
-            # 跳过空段落
-            if not para.text.strip():
+    def _load_content(self, doc_path: DocumentSource) -> CleanedDocument:
+        """获取正文块序列
+        
+        清洗产物中已有正文块，无需加载 python-docx；其他来源直接遍历
+        python-docx 已加载的元素树生成正文块，不创建段落和表格代理对象
+        """
+        cleaned = load_cleaned(doc_path)
+        if cleaned is not None:
+            return cleaned
+        doc = load_docx(doc_path)
+        relationships = {
+            rel_id: rel.target_ref for rel_id, rel in doc.part.rels.items() if not rel.is_external
+        }
+        return CleanedDocument.from_tree(doc.element, doc.styles.element, relationships)
+    
+    def fingerprint(self, source_fingerprint: str = "") -> str:
+        """解析结果的指纹，用作解析缓存的键
+        
+        Args:
+            source_fingerprint: 输入内容的指纹，例如清洗规则指纹
+            
+        Returns:
+            解析器版本、标题和列表项模式以及输入指纹的 SHA-256
+        """
+        key = (PARSER_VERSION, tuple(self.title_patterns.items()), tuple(self.list_patterns),
+               source_fingerprint)
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+    
+    def dump_structure(self, structure: DocumentStructure) -> Dict:
+        """把文档结构转换为只含内置容器和标量的紧凑数据
+        
+        只保存段落序列，表格保存为逻辑单元格；章节以及表格、图片列表由段落
+        序列重新生成，不重复保存。
+        """
+        store = structure.paragraphs
+        paragraphs = []
+        for position, text in enumerate(store.texts):
+            table = store.tables.get(position)
+            if table is not None:
+                table = (table.num_rows, table.num_cols, table.caption, table.spans)
+            image = store.images.get(position)
+            if image is not None:
+                image = (image.path, image.caption, image.width, image.height)
+            paragraphs.append((text, store.type_at(position).value, store.levels[position],
+                               store.indices[position], store.styles[position], table, image))
+        return {
+            "version": PARSER_VERSION,
+            "title": structure.title,
+            "metadata": structure.metadata,
+            "paragraphs": paragraphs,
+        }
+    
+    def load_structure(self, payload: Dict) -> DocumentStructure:
+        """由 dump_structure 的结果还原文档结构
+        
+        Raises:
+            ValueError: 数据版本与当前解析器不一致
+        """
+        if payload.get("version") != PARSER_VERSION:
+            raise ValueError(f"不支持的解析结果版本: {payload.get('version')}")
+        structure = DocumentStructure(title=payload["title"], metadata=payload["metadata"])
+        for text, para_type, level, index, style, table, image in payload["paragraphs"]:
+            if table is not None:
+                table = Table.from_spans(table[3], table[0], table[1], table[2])
+                structure.tables.append(table)
+            if image is not None:
+                image = Image(path=image[0], caption=image[1], width=image[2], height=image[3])
+                structure.images.append(image)
+            structure.paragraphs.append(Paragraph(
+                text=text,
+                type=ParagraphType(para_type),
+                level=level,
+                index=index,
+                style=style,
+                table=table,
+                image=image
+            ))
+        self._parse_sections(structure)
+        return structure
+    
+    def iter_events(self, doc_path: DocumentSource) -> Iterator[Paragraph]:
+        """流式解析文档，按文档顺序逐个产生段落事件
+        
+        事件与 parse_document 结果中的 paragraphs 一一对应：正文段落、标题（TITLE）、
+        表格（TABLE，table 字段为表格数据）和图片（IMAGE，image 字段为图片数据）。
+        
+        对于 .docx 路径，使用 iterparse 直接从 zip 包中流式读取 word/document.xml，
+        已处理的元素立即释放，内存占用与文档大小无关；上下文优先使用其中的清洗产物，
+        否则流式读取原始文件。紧跟在无标题表格之后的 Caption 段落需要看到下一个
+        正文块才能确定归属，此时表格事件最多延迟两个正文块产生。
+        
+        Args:
+            doc_path: 文档路径、清洗产物（或其路径）、文档对象或文档处理上下文
+            
+        Yields:
+            段落事件
+        """
+        for record in self._iter_records(doc_path):
+            yield record.to_paragraph()
+    
+    def iter_sections(self, doc_path: DocumentSource, level: int = 1) -> Iterator[Section]:
+        """流式按章节切分文档，用于分块知识抽取等逐章节处理的场景
+        
+        在层级不超过 level 的标题处切分，每次只在内存中保留一个章节。产生的章节
+        不含子章节：更深层的标题和其内容一起按顺序放在 paragraphs 中。第一个标题
+        之前的内容作为没有标题、层级为 0 的章节产生。Title 样式的段落与 parse_document
+        一样不作为章节标题。
+        
+        Args:
+            doc_path: 文档来源，同 iter_events
+            level: 切分的最大标题层级
+            
+        Yields:
+            章节，start_index 和 end_index 为事件在文档中的序号
+        """
+        section = None
+        for idx, event in enumerate(self.iter_events(doc_path)):
+            if (event.type == ParagraphType.TITLE and event.style != 'Title'
+                    and event.level <= level):
+                if section is not None:
+                    yield section
+                section = Section(title=event, level=max(1, event.level),
+                                  start_index=idx, end_index=idx)
+                continue
+            if section is None:
+                section = Section(level=0, start_index=idx, end_index=idx)
+            section.paragraphs.append(event)
+            section.end_index = idx
+        if section is not None:
+            yield section
+    
+    def _iter_records(self, doc_path: DocumentSource) -> Iterator[ParagraphRecord]:
+        """按 iter_events 的规则选择正文块来源，产生段落记录"""
+        cleaned = load_cleaned(doc_path)
+        if cleaned is not None:
+            yield from self._iter_block_records(cleaned.blocks, cleaned.style_name)
+            return
+        if isinstance(doc_path, DocumentContext):
+            yield from self._iter_package_records(doc_path.package)
+            return
+        if isinstance(doc_path, (str, Path)):
+            with open_package(doc_path) as package:
+                yield from self._iter_package_records(package)
+            return
+        content = self._load_content(doc_path)
+        yield from self._iter_block_records(content.blocks, content.style_name)
+    
+    def _iter_package_records(self, package: zipfile.ZipFile) -> Iterator[ParagraphRecord]:
+        """流式解析已打开的 OOXML 包"""
+        styles, default_style = read_package_styles(package)
+        content = CleanedDocument(styles=styles, default_style=default_style)
+        blocks = iter_body_blocks(package, read_relationships(package, DOCUMENT_PART))
+        yield from self._iter_block_records(blocks, content.style_name)
+    
+    def _parse_blocks(self, content: CleanedDocument, structure: DocumentStructure):
+        """按文档顺序单遍解析正文块
+        
+        文本段落、表格和图片按文档中的顺序加入 structure.paragraphs（表格和图片
+        分别为 TABLE、IMAGE 类型的段落），同时加入 structure.tables 和 structure.images。
+        """
+        # 段落记录直接写入按列保存的段落序列，不创建 Paragraph
+        paragraphs = structure.paragraphs
+        for record in self._iter_block_records(content.blocks, content.style_name):
+            paragraphs.append_record(record)
+            if record.type == ParagraphType.TABLE:
+                structure.tables.append(record.table)
+            elif record.type == ParagraphType.IMAGE:
+                structure.images.append(record.image)
+            elif (record.index == 0 and record.type == ParagraphType.TITLE
+                    and structure.title is None):
+                # 如果是第一个标题，可能是文档标题
+                structure.title = record.text
+    
+    def _iter_block_records(self, blocks: Iterable[Dict],
+                            style_name: Callable[[Optional[str]], Optional[str]]
+                            ) -> Iterator[ParagraphRecord]:
+        """按文档顺序单遍把正文块转换为段落记录
+        
+        表格标题：Caption 样式的段落作为其后第一个表格的标题；紧跟在没有标题的
+        表格之后、且后面不是表格的 Caption 段落作为前一个表格的标题。以“图”开头
+        的段落是图片标题，作为其后第一张图片的标题。
+        
+        Args:
+            blocks: 正文块
+            style_name: 样式ID到样式名称的转换函数
+        """
+        # 段落和表格分别按各自在正文中的顺序编号，表格不占用段落的索引
+        para_index = -1
+        table_index = -1
+        # 待使用的表格标题，以及可能使用该标题的前一个表格
+        table_caption = None
+        captionless_table = None
+        trailing_table = None
+        # 表格标题归属确定之前暂缓产生的事件
+        pending: List[ParagraphRecord] = []
+        # 图片编号和待使用的图片标题
+        figure_counter = 1
+        current_chapter = 1
+        image_caption = None
+        # 样式ID -> 样式决定的段落类型和标题层级
+        style_rules: Dict[Optional[str], Optional[Tuple[ParagraphType, Optional[int]]]] = {}
+        
+        for block in blocks:
+            if block["type"] == TABLE_BLOCK:
+                # 暂缓的 Caption 段落（如果有）已作为本表格的标题
+                yield from pending
+                pending = []
+                table_index += 1
+                table = self._build_table(block["cells"], block["num_rows"], block["num_cols"],
+                                          table_caption)
+                event = ParagraphRecord(
+                    text=self._table_text(table),
+                    type=ParagraphType.TABLE,
+                    level=0,
+                    index=table_index,
+                    table=table
+                )
+                captionless_table = table if table_caption is None else None
+                table_caption = None
+                trailing_table = None
+                # 没有标题的表格可能使用其后的 Caption 段落，暂缓产生
+                if captionless_table is not None:
+                    pending.append(event)
+                else:
+                    yield event
                 continue
             
-            # 判断段落类型
-            para_type = self._determine_paragraph_type(para)
-            level = 0
+            para_index += 1
+            text = block["text"]
+            style = style_name(block["style"])
+            stripped = text.strip()
+            events = []
             
-            if para_type == ParagraphType.TITLE:
-                level = self._get_title_level(para)
+            # 前一个段落是紧跟在表格之后的标题，且当前不是表格：标题属于前一个表格
+            if trailing_table is not None:
+                trailing_table.caption = table_caption
+                table_caption = None
+                trailing_table = None
             
-            # 创建段落对象
-            paragraph = Paragraph(
-                text=para.text,
-                type=para_type,
-                level=level,
-                index=idx,
-                style=para.style.name if para.style else None
-            )
+            if stripped:
+                # 判断段落类型和标题层级，样式决定的部分按样式ID缓存
+                style_id = block["style"]
+                if style_id not in style_rules:
+                    style_rules[style_id] = self._style_rule(style)
+                para_type, level = self._classify_text(text, style_rules[style_id])
+                
+                events.append(ParagraphRecord(
+                    text=text,
+                    type=para_type,
+                    level=level,
+                    index=para_index,
+                    style=style
+                ))
+                
+                # 检查是否是新章节，从文本中提取章节编号
+                if style and style.startswith('Heading 1'):
+                    match = CHAPTER_PATTERN.match(text)
+                    if match:
+                        current_chapter = CHINESE_NUMERALS.get(match.group(1), current_chapter)
+                        figure_counter = 1  # 重置图片计数器
+                
+                if stripped.startswith('图'):
+                    image_caption = stripped
+                elif style == 'Caption':
+                    table_caption = stripped
+                    trailing_table = captionless_table
+            captionless_table = None
             
-            # 添加到文档结构
-            structure.paragraphs.append(paragraph)
+            for target in block.get("images", ()):
+                # 如果没有明确的标题，生成默认标题
+                image = Image(
+                    path=target,
+                    caption=image_caption or f"图{current_chapter}-{figure_counter}"
+                )
+                figure_counter += 1
+                image_caption = None
+                events.append(ParagraphRecord(
+                    text="",
+                    type=ParagraphType.IMAGE,
+                    level=0,
+                    index=para_index,
+                    image=image
+                ))
             
-            # 如果是第一个标题，可能是文档标题
-            if idx == 0 and para_type == ParagraphType.TITLE:
-                structure.title = para.text
+            if trailing_table is not None:
+                pending.extend(events)
+            else:
+                yield from pending
+                yield from events
+                pending = []
+        
+        if trailing_table is not None:
+            trailing_table.caption = table_caption
+        yield from pending
     
     def _parse_sections(self, structure: DocumentStructure):
-        """解析文档章节结构"""
+        """解析文档章节结构
+        
+        章节只记录标题和索引范围，通过 Section.paragraphs 引用文档的段落序列，
+        不复制段落。非标题段落属于其前最近的章节；Title 样式的段落不属于任何章节。
+        """
+        paragraphs = structure.paragraphs
         current_sections = []  # [(level, section), ...]
         
-        for idx, para in enumerate(structure.paragraphs):
-            if para.type != ParagraphType.TITLE:
-                # 将非标题段落添加到当前最深层的章节
-                if current_sections:
-                    current_sections[-1][1].paragraphs.append(para)
+        for idx in range(len(paragraphs)):
+            # 忽略非标题段落和文档标题样式的段落
+            if (paragraphs.type_at(idx) != ParagraphType.TITLE
+                    or paragraphs.styles[idx] == 'Title'):
                 continue
             
-            # 忽略文档标题样式的段落
-            if para.style == 'Title':
-                continue
-                
-            level = para.level
+            level = paragraphs.levels[idx]
             
             # 创建新的章节（确保level至少为1）
             new_section = Section(
-                title=para,
+                title=paragraphs[idx],
                 level=max(1, level),  # 确保章节层级从1开始
                 start_index=idx,
                 end_index=idx  # 暂时设置为当前索引，后续会更新
@@ -139,195 +417,93 @@ class DocumentParser:
                 structure.sections.append(new_section)
             
             current_sections.append((level, new_section))
-    
-    def _parse_tables(self, doc: _Document, structure: DocumentStructure):
-        """解析表格"""
-        table_caption = None
-        table_pending = False
         
-        # 遍历所有段落，提取表格标题和表格内容
-        for element in doc._body._element:
-            if element.tag.endswith('p'):
-                # 处理段落，查找表格标题
-                para = DocxParagraph(element, doc._parent)
-                try:
-                    if para.style and para.style.name == 'Caption':
-                        table_caption = para.text.strip()
-                        table_pending = True
-                except AttributeError:
-                    # 如果获取样式失败，尝试通过其他方式判断是否是标题
-                    if para.text.strip().startswith('表'):
-                        table_caption = para.text.strip()
-                        table_pending = True
-            elif element.tag.endswith('tbl'):
-                # 处理表格
-                table = DocxTable(element, doc._parent)
-                parsed_table = self._parse_table(table, table_caption)
-                if table_caption:
-                    parsed_table.caption = table_caption
-                structure.tables.append(parsed_table)
-                # 重置标题状态
-                table_caption = None
-                table_pending = False
+        # 文档末尾仍未结束的章节延续到最后一个段落
+        for _, section in current_sections:
+            section.end_index = len(paragraphs) - 1
+        structure.link_sections()
     
-    def _parse_table(self, table: DocxTable, caption: Optional[str] = None) -> Table:
-        """解析单个表格
+    def _build_table(self, cells: List[List], num_rows: int, num_cols: int,
+                     caption: Optional[str] = None) -> Table:
+        """由逻辑单元格 [行号, 列号, 文本, 跨行数, 跨列数] 构建表格对象
         
-        Args:
-            table: 要解析的表格对象
-            caption: 可选的表格标题
-            
-        Returns:
-            解析后的表格对象
+        表格以列式数据保存，TableCell 在访问 Table.cells 时才创建
         """
-        cells = []
-        num_rows = len(table.rows)
-        num_cols = len(table.columns)
-        
-        for i, row in enumerate(table.rows):
-            for j, cell in enumerate(row.cells):
-                cell_obj = TableCell(
-                    text=cell.text.strip(),
-                    row=i,
-                    col=j,
-                    is_header=(i == 0),  # 假设第一行是表头
-                )
-                cells.append(cell_obj)
+        spans = [[row, col, text.strip(), rowspan, colspan]
+                 for row, col, text, rowspan, colspan in cells]
+        return Table.from_spans(spans, num_rows, num_cols, caption)
+    
+    def _table_text(self, table: Table) -> str:
+        """表格的文本表示：每行一行，单元格之间用“ | ”分隔
         
-        return Table(
-            cells=cells,
-            num_rows=num_rows,
-            num_cols=num_cols,
-            caption=caption
-        )
+        合并单元格只在其起始行和起始列出现一次
+        """
+        rows: List[List[str]] = [[] for _ in range(table.num_rows)]
+        for row, _, text, _, _ in table.spans:
+            rows[row].append(text)
+        return "\n".join(" | ".join(row) for row in rows)
     
-    def _parse_images(self, doc: _Document, structure: DocumentStructure):
-        """解析图片"""
-        try:
-            # 获取文档目录
-            doc_dir = Path(doc._path).parent if hasattr(doc, '_path') else None
-            
-            # 存储图片序号计数
-            figure_counter = 1
-            # 存储当前章节编号
-            current_chapter = 1
-            # 存储待处理的图片标题
-            image_caption = None
-            image_pending = False
-            
-            # 遍历文档中的所有元素
-            for element in doc._body._element:
-                if element.tag.endswith('p'):
-                    # 处理段落，查找图片标题
-                    para = DocxParagraph(element, doc._parent)
-                    try:
-                        # 检查是否是新章节
-                        if para.style and para.style.name.startswith('Heading 1'):
-                            # 从文本中提取章节编号
-                            match = re.match(r'^第([一二三四五六七八九十]+)章', para.text)
-                            if match:
-                                # 将中文数字转换为阿拉伯数字
-                                chinese_nums = {'一':1, '二':2, '三':3, '四':4, '五':5,
-                                              '六':6, '七':7, '八':8, '九':9, '十':10}
-                                current_chapter = chinese_nums.get(match.group(1), current_chapter)
-                                figure_counter = 1  # 重置图片计数器
-                                
-                        # 检查是否是图片标题
-                        if (para.style and para.style.name == 'Caption' and 
-                            para.text.strip().startswith('图')):
-                            image_caption = para.text.strip()
-                            image_pending = True
-                        elif para.text.strip().startswith('图'):  # 备选方案
-                            image_caption = para.text.strip()
-                            image_pending = True
-                    except AttributeError:
-                        pass
-                        
-                elif element.tag.endswith(('drawing', 'pict')):
-                    # 处理图片元素
-                    for rel in doc.part.rels.values():
-                        if "image" in rel.reltype:
-                            # 构建图片路径
-                            image_path = (doc_dir / rel._target) if doc_dir else rel._target
-                            
-                            if doc_dir is None or image_path.exists():
-                                # 如果没有明确的标题，生成默认标题
-                                if not image_caption:
-                                    image_caption = f"图{current_chapter}-{figure_counter}"
-                                
-                                # 创建图片对象
-                                image = Image(
-                                    path=str(image_path),
-                                    caption=image_caption,
-                                    figure_number=f"{current_chapter}-{figure_counter}"
-                                )
-                                
-                                # 更新计数器
-                                figure_counter += 1
-                                
-                                # 添加到文档结构
-                                structure.images.append(image)
-                                
-                                # 重置标题状态
-                                image_caption = None
-                                image_pending = False
-                        
-        except Exception as e:
-            logger.warning(f"Error parsing images: {str(e)}")
-            # 继续处理，不中断文档解析
+    def _style_rule(self, style_name: Optional[str]) -> Optional[Tuple[ParagraphType, Optional[int]]]:
+        """样式名称决定的段落类型和标题层级
+        
+        Returns:
+            (段落类型, 标题层级)，层级为 None 时从文本判断；样式不决定段落类型时返回 None
+        """
+        if not style_name:
+            return None
+        # Title样式是最高级别
+        if style_name == 'Title':
+            return ParagraphType.TITLE, 0
+        # 从Word标题样式中获取层级
+        if style_name.startswith('Heading'):
+            try:
+                return ParagraphType.TITLE, int(style_name.replace('Heading ', ''))
+            except ValueError:
+                return ParagraphType.TITLE, None
+        if style_name == 'Caption':
+            return ParagraphType.CONTENT, 0  # 表格标题作为特殊内容处理
+        return None
     
-    def _determine_paragraph_type(self, para: DocxParagraph) -> ParagraphType:
-        """判断段落类型"""
-        text = para.text.strip()
+    def _classify_text(self, text: str, style_rule: Optional[Tuple[ParagraphType, Optional[int]]]
+                       ) -> Tuple[ParagraphType, int]:
+        """在样式规则的基础上根据文本判断段落类型和标题层级"""
+        if style_rule is not None and style_rule[1] is not None:
+            return style_rule
         
-        # 安全地检查段落样式
-        try:
-            if para.style:
-                style_name = para.style.name
-                if style_name == 'Title' or style_name.startswith('Heading'):
-                    return ParagraphType.TITLE
-                elif style_name == 'Caption':
-                    return ParagraphType.CONTENT  # 表格标题作为特殊内容处理
-        except AttributeError:
-            # 如果获取样式失败，继续使用其他方法判断
-            pass
+        text = text.strip()
+        # 标题和列表项模式合并为一个正则，一次匹配同时得到类型和层级
+        match = self._classifier().match(text)
+        kind = match.lastgroup if match else None
         
-        # 检查是否是标题
-        if any(re.match(pattern, text) for pattern in self.title_patterns.keys()):
-            return ParagraphType.TITLE
+        if style_rule is not None:
+            # 标题样式但无法从样式名称获取层级：从文本内容判断层级
+            level = self._title_levels[int(kind[1:])] if kind and kind[0] == "t" else 0
+            return style_rule[0], level
         
-        # 检查是否是列表项
-        if any(re.match(pattern, text) for pattern in self.list_patterns):
-            return ParagraphType.LIST_ITEM
+        if kind:
+            if kind[0] == "t":
+                return ParagraphType.TITLE, self._title_levels[int(kind[1:])]
+            return ParagraphType.LIST_ITEM, 0
         
         # 检查是否是引用
         if text.startswith('"') and text.endswith('"'):
-            return ParagraphType.REFERENCE
+            return ParagraphType.REFERENCE, 0
         
         # 默认为正文
-        return ParagraphType.CONTENT
+        return ParagraphType.CONTENT, 0
     
-    def _get_title_level(self, para: DocxParagraph) -> int:
-        """获取标题层级"""
-        try:
-            if para.style:
-                style_name = para.style.name
-                # Title样式是最高级别
-                if style_name == 'Title':
-                    return 0
-                # 从Word标题样式中获取层级
-                if style_name.startswith('Heading'):
-                    try:
-                        return int(style_name.replace('Heading ', ''))
-                    except ValueError:
-                        pass
-        except AttributeError:
-            # 如果获取样式失败，继续使用其他方法判断
-            pass
-                
-        # 从文本内容判断层级
-        text = para.text.strip()
-        for pattern, level in self.title_patterns.items():
-            if re.match(pattern, text):
-                return level
-        return 0
\ No newline at end of file
+    def _classifier(self) -> Pattern:
+        """获取由标题模式和列表项模式合并编译的正则
+        
+        每个模式是一个命名分组：标题模式为 t<序号>，列表项模式为 l<序号>。
+        多选分支按顺序尝试，与依次匹配各个模式的结果一致（标题模式优先）。
+        title_patterns 或 list_patterns 修改后重新编译。
+        """
+        key = (tuple(self.title_patterns.items()), tuple(self.list_patterns))
+        if self._classifier_key != key:
+            branches = [f"(?P<t{i}>{pattern})" for i, pattern in enumerate(self.title_patterns)]
+            branches += [f"(?P<l{i}>{pattern})" for i, pattern in enumerate(self.list_patterns)]
+            self._compiled_classifier = re.compile("|".join(branches))
+            self._title_levels = list(self.title_patterns.values())
+            self._classifier_key = key
+        return self._compiled_classifier
@@ -0,0 +1,313 @@
+"""
+文档注册表模块
+主要功能：在 SQLite 中持久化文档记录及处理状态，支持列表、筛选、搜索和统计
+"""
+import sqlite3
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+from loguru import logger
+
+from ...config import settings
+from ...models.document import Document
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    file_path TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    upload_time TEXT NOT NULL,
+    updated_time TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status, upload_time);
+CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents(filename);
+CREATE INDEX IF NOT EXISTS idx_documents_upload_time ON documents(upload_time);
+"""
+
+# 标题全文索引（trigram 分词支持中文子串搜索，需要 SQLite 3.34 及以上）
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, filename, content='documents', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, filename) VALUES (new.rowid, new.title, new.filename);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, filename)
+    VALUES ('delete', old.rowid, old.title, old.filename);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE OF title, filename ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, filename)
+    VALUES ('delete', old.rowid, old.title, old.filename);
+    INSERT INTO documents_fts(rowid, title, filename) VALUES (new.rowid, new.title, new.filename);
+END;
+"""
+
+_DROP_FTS_TRIGGERS = """
+DROP TRIGGER IF EXISTS documents_ai;
+DROP TRIGGER IF EXISTS documents_ad;
+DROP TRIGGER IF EXISTS documents_au;
+"""
+
+# 后续版本新增的列：列名 -> 列定义
+_ADDED_COLUMNS = {
+    "author": "TEXT",
+    "version": "TEXT",
+    "revision": "INTEGER",
+    "last_modified": "TEXT",
+}
+
+_ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_documents_title ON documents(title, last_modified);
+"""
+
+# trigram 分词器只能索引不少于 3 个字符的查询
+_MIN_FTS_QUERY_LENGTH = 3
+
+@lru_cache(maxsize=None)
+def _trigram_supported() -> bool:
+    """当前 SQLite 是否支持 FTS5 的 trigram 分词器"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+class DocumentRegistry:
+    """文档注册表
+
+    文档记录以 JSON 形式完整保存，常用查询字段（内容哈希、状态、文件名、
+    上传时间）单独成列并建立索引，标题建立全文索引。SQLite 不支持 trigram
+    分词器时不建立全文索引，搜索全部使用 LIKE 扫描。
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        self.db_path = str(db_path or Path(settings.UPLOAD_FOLDER) / "registry.db")
+        self.full_text_search = _trigram_supported()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+            self._create_fts(conn)
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """为旧版本创建的数据库补充新增的列和索引"""
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(documents)")}
+        for column, definition in _ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE documents ADD COLUMN {column} {definition}")
+        conn.executescript(_ADDED_INDEXES)
+
+    def _create_fts(self, conn: sqlite3.Connection) -> None:
+        """创建标题全文索引及维护索引的触发器
+
+        不支持 trigram 分词器时删除已有的触发器（数据库可能由支持全文索引的环境创建），
+        否则写入时会因找不到分词器而失败；之后在支持的环境中重新打开时重建索引。
+        """
+        if not self.full_text_search:
+            logger.warning("当前 SQLite 不支持 FTS5 trigram 分词器，文档搜索改用 LIKE 扫描")
+            conn.executescript(_DROP_FTS_TRIGGERS)
+            return
+        rebuild = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'documents_ai'"
+        ).fetchone() is None
+        conn.executescript(_FTS_SCHEMA)
+        if rebuild:
+            conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开数据库连接，每次操作独立连接，可在多线程和多进程中使用"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def register(self, document: Document) -> None:
+        """新增或更新文档记录"""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO documents (id, filename, title, file_path, file_size, content_hash,
+                                       status, upload_time, updated_time, data,
+                                       author, version, revision, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    filename = excluded.filename,
+                    title = excluded.title,
+                    file_path = excluded.file_path,
+                    file_size = excluded.file_size,
+                    status = excluded.status,
+                    updated_time = excluded.updated_time,
+                    data = excluded.data,
+                    author = excluded.author,
+                    version = excluded.version,
+                    revision = excluded.revision,
+                    last_modified = excluded.last_modified
+                """,
+                self._to_row(document)
+            )
+
+    def update_status(self, doc_id: str, status: str) -> None:
+        """更新文档处理状态"""
+        document = self.get(doc_id)
+        if document is None:
+            logger.warning(f"文档不存在: {doc_id}")
+            return
+        document.status = status
+        self.register(document)
+
+    def delete(self, doc_id: str) -> bool:
+        """删除文档记录
+
+        Returns:
+            bool: 是否删除了记录
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            return cursor.rowcount > 0
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        """按文档ID获取记录"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return Document.model_validate_json(row["data"]) if row else None
+
+    def get_by_hash(self, content_hash: str) -> Optional[Document]:
+        """按内容哈希获取记录"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM documents WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        return Document.model_validate_json(row["data"]) if row else None
+
+    def list_documents(self, status: Optional[str] = None, limit: int = 50,
+                       offset: int = 0) -> List[Document]:
+        """按上传时间倒序列出文档
+
+        Args:
+            status: 按处理状态筛选
+            limit: 返回数量
+            offset: 偏移量
+
+        Returns:
+            文档列表
+        """
+        sql = "SELECT data FROM documents"
+        params: list = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY upload_time DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [Document.model_validate_json(row["data"]) for row in rows]
+
+    def search(self, query: str, status: Optional[str] = None, limit: int = 50) -> List[Document]:
+        """按文档标题或文件名搜索
+
+        Args:
+            query: 搜索关键词（子串匹配）。不少于 3 个字符时使用全文索引，
+                较短的关键词或不支持全文索引时使用 LIKE 扫描
+            status: 按处理状态筛选
+            limit: 返回数量
+
+        Returns:
+            匹配的文档列表，按上传时间倒序
+        """
+        query = query.strip()
+        if not query:
+            return self.list_documents(status=status, limit=limit)
+
+        if self.full_text_search and len(query) >= _MIN_FTS_QUERY_LENGTH:
+            # 以短语形式查询，避免用户输入被解析为 FTS 语法
+            condition = "rowid IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)"
+            params: list = ['"' + query.replace('"', '""') + '"']
+        else:
+            # 按上传时间索引顺序扫描，取够数量即停止
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            condition = "(title LIKE ? ESCAPE '\\' OR filename LIKE ? ESCAPE '\\')"
+            params = [f"%{escaped}%", f"%{escaped}%"]
+
+        sql = f"SELECT data FROM documents WHERE {condition}"
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        sql += " ORDER BY upload_time DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [Document.model_validate_json(row["data"]) for row in rows]
+
+    def find_revisions(self, title: str) -> List[Document]:
+        """查找同一标题的所有文档，用于识别标准的不同修订版本
+
+        Args:
+            title: 文档标题（来自文档属性）
+
+        Returns:
+            标题相同的文档列表，按最后修改时间倒序
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM documents WHERE title = ? ORDER BY last_modified DESC",
+                (title,)
+            ).fetchall()
+        return [Document.model_validate_json(row["data"]) for row in rows]
+
+    def statistics(self, recent: int = 5) -> Dict:
+        """统计文档数量
+
+        Args:
+            recent: 返回最近上传的文档数量
+
+        Returns:
+            包含总文档数、各状态文档数和最近上传文档的统计信息
+        """
+        with self._connect() as conn:
+            by_status = {
+                row["status"]: row["count"]
+                for row in conn.execute(
+                    "SELECT status, COUNT(*) AS count FROM documents GROUP BY status"
+                )
+            }
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "recent": self.list_documents(limit=recent),
+        }
+
+    def _to_row(self, document: Document) -> tuple:
+        """将文档记录转换为数据库行"""
+        metadata = document.metadata
+        return (
+            document.id,
+            document.filename,
+            document.metadata.title,
+            document.file_path,
+            document.file_size,
+            document.content_hash,
+            document.status,
+            document.upload_time.isoformat(),
+            datetime.now().isoformat(),
+            document.model_dump_json(),
+            metadata.author,
+            metadata.version,
+            metadata.revision,
+            metadata.last_modified.isoformat() if metadata.last_modified else None,
+        )
@@ -0,0 +1,455 @@
+import os
+import re
+import json
+import mmap
+import pickle
+import hashlib
+import zipfile
+import posixpath
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from loguru import logger
+
+from ...config import settings
+from ...models.document import Document
+from .artifact import ARTIFACT_SUFFIX
+from .ooxml import DOCUMENT_PART, resolve_part_name
+
+_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+# 图片扩展名只保留字母和数字，避免异常的部件名称影响存储路径
+_SUFFIX_PATTERN = re.compile(r"^\.[0-9A-Za-z]{1,10}$")
+
+class DocumentStore:
+    """内容寻址的文档存储
+
+    以文件内容的 SHA-256 作为键，相同内容只保存一份。每个内容对应一个目录：
+
+        UPLOAD_FOLDER/objects/<hash[:2]>/<hash>/
+            original.docx   原始文件
+            cleaned.json.gz 清洗产物（正文段落、表格和样式，见 CleanedDocument）
+            cleaned.docx    清洗后的文件，仅在预览或下载时按需生成
+            document.json   文档记录
+            cleaning/       清洗结果缓存，见 CleaningCache
+            parsing/        解析结果缓存，见 ParseCache
+
+    文档中的图片按图片内容单独存储，见 ImageStore。
+    """
+
+    ORIGINAL_NAME = "original.docx"
+    CLEANED_NAME = "cleaned.docx"
+    ARTIFACT_NAME = "cleaned" + ARTIFACT_SUFFIX
+    RECORD_NAME = "document.json"
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        self.root = Path(root or settings.UPLOAD_FOLDER) / "objects"
+        self.cleaning_cache = CleaningCache(self)
+        self.parse_cache = ParseCache(self)
+        self.images = ImageStore(self.root.parent / "images")
+
+    def object_dir(self, content_hash: str) -> Path:
+        """获取内容对应的存储目录"""
+        if not _HASH_PATTERN.match(content_hash):
+            raise ValueError(f"无效的内容哈希: {content_hash}")
+        return self.root / content_hash[:2] / content_hash
+
+    def path_for(self, content_hash: str, name: str) -> Path:
+        """获取内容目录下指定文件的路径"""
+        return self.object_dir(content_hash) / name
+
+    def contains(self, content_hash: str) -> bool:
+        """检查内容是否已经存储"""
+        return self.path_for(content_hash, self.ORIGINAL_NAME).exists()
+
+    def put(self, content_hash: str, file_content: bytes) -> str:
+        """保存原始文件，内容已存在时不重复写入
+
+        Args:
+            content_hash: 文件内容的 SHA-256
+            file_content: 文件内容
+
+        Returns:
+            原始文件路径
+        """
+        path = self.path_for(content_hash, self.ORIGINAL_NAME)
+        if not path.exists():
+            self.write_atomic(path, file_content)
+        return str(path)
+
+    def put_file(self, content_hash: str, source_path: Union[str, Path], move: bool = False) -> str:
+        """从磁盘文件保存原始文件，内容已存在时不重复写入
+
+        Args:
+            content_hash: 文件内容的 SHA-256
+            source_path: 源文件路径
+            move: 是否直接移动源文件（源文件须位于存储所在的文件系统，
+                例如 incoming_file 创建的临时文件）；否则复制
+
+        Returns:
+            原始文件路径
+        """
+        path = self.path_for(content_hash, self.ORIGINAL_NAME)
+        if path.exists():
+            if move:
+                os.unlink(source_path)
+            return str(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            os.replace(source_path, path)
+        else:
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=".tmp_", delete=False) as tmp_file:
+                with open(source_path, "rb") as source:
+                    shutil.copyfileobj(source, tmp_file)
+            os.replace(tmp_file.name, path)
+        return str(path)
+
+    def incoming_file(self) -> BinaryIO:
+        """创建接收上传内容的临时文件
+
+        临时文件与存储位于同一目录树下，确认内容后可以直接移动到最终位置，
+        无需再次复制。调用方负责关闭并在未移动时删除该文件。
+        """
+        incoming_dir = self.root / ".incoming"
+        incoming_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=incoming_dir, suffix=".docx", delete=False)
+
+    def get_document(self, content_hash: str) -> Optional[Document]:
+        """读取内容对应的文档记录
+
+        Returns:
+            文档记录，不存在或无法读取时返回 None
+        """
+        path = self.path_for(content_hash, self.RECORD_NAME)
+        if not path.exists():
+            return None
+        try:
+            return Document.model_validate_json(path.read_bytes())
+        except Exception as e:
+            logger.warning(f"文档记录读取失败 {path}: {str(e)}")
+            return None
+
+    def save_document(self, document: Document) -> None:
+        """保存文档记录"""
+        path = self.path_for(document.content_hash, self.RECORD_NAME)
+        self.write_atomic(path, document.model_dump_json().encode("utf-8"))
+
+    def link_atomic(self, source_path: Path, path: Path) -> None:
+        """把文件以硬链接方式放到 path（不支持硬链接时复制），替换已有文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+        os.close(fd)
+        try:
+            os.unlink(tmp_path)
+            try:
+                os.link(source_path, tmp_path)
+            except OSError:
+                shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def write_atomic(self, path: Path, data: bytes) -> None:
+        """先写入同目录下的临时文件再重命名，避免并发写入时读到不完整的文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=".tmp_", delete=False) as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_file.name, path)
+
+
+class DiskCache:
+    """内容目录下的 LRU 磁盘缓存基类
+
+    每个条目由若干文件组成，第一个文件最后写入，存在即表示条目完整，其修改时间
+    即最近使用时间。缓存总大小超过上限（0 表示不缓存）时按最近使用时间淘汰
+    最久未用的条目，直到总大小不超过上限的 EVICT_RATIO，避免缓存写满后每次写入
+    都重新扫描全部条目。扫描时只统计缓存独占的文件：与缓存外的文件共用的硬链接
+    （链接数大于 1）淘汰后不能释放空间，不计入大小。写入时新条目按完整大小计入，
+    总大小的估计值只会偏大，外部文件删除后释放给缓存的空间最迟在下次扫描时计入。
+    子类设置 DIR_NAME 并实现 _entry_files。
+    """
+
+    DIR_NAME = ""
+    # 淘汰后的目标大小占上限的比例
+    EVICT_RATIO = 0.8
+
+    def __init__(self, store: DocumentStore, max_size: int):
+        self.store = store
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # 当前缓存总大小，首次写入时扫描得到；多进程写入时只是估计值，淘汰时重新统计
+        self._size: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def cache_dir(self, content_hash: str) -> Path:
+        """获取内容对应的缓存目录"""
+        return self.store.object_dir(content_hash) / self.DIR_NAME
+
+    def _entry_files(self) -> Iterator[Tuple[Path, ...]]:
+        """遍历全部条目的文件，第一个为标记条目完整并记录最近使用时间的文件"""
+        raise NotImplementedError
+
+    def _added(self, size: int) -> None:
+        """记录新写入的条目大小，超过上限时淘汰旧条目"""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry[1] for entry in self._entries())
+            else:
+                self._size += size
+            if self._size > self.max_size:
+                self._evict()
+
+    @staticmethod
+    def _owned_size(path: Path) -> int:
+        """文件占用的缓存大小，与缓存外的文件共用的硬链接记为 0"""
+        stat = path.stat()
+        return stat.st_size if stat.st_nlink <= 1 else 0
+
+    def _entries(self) -> List[Tuple[float, int, Tuple[Path, ...]]]:
+        """扫描全部缓存条目：(最近使用时间, 大小, 文件路径)"""
+        entries = []
+        for paths in self._entry_files():
+            try:
+                stat = paths[0].stat()
+                size = sum(self._owned_size(path) for path in paths)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, size, paths))
+        return entries
+
+    def _evict(self) -> None:
+        """按最近使用时间从旧到新删除条目，直到总大小不超过上限的 EVICT_RATIO"""
+        entries = sorted(self._entries(), key=lambda entry: entry[:2])
+        total = sum(entry[1] for entry in entries)
+        if total <= self.max_size:
+            self._size = total
+            return
+        target = int(self.max_size * self.EVICT_RATIO)
+        for _, size, paths in entries:
+            if total <= target:
+                break
+            # 先删除第一个文件，条目随即视为不存在
+            for path in paths:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+        self._size = total
+
+
+class CleaningCache(DiskCache):
+    """清洗结果缓存
+
+    以 (内容哈希, 清洗规则指纹) 为键保存清洗产物和统计信息，放在内容目录下：
+
+        UPLOAD_FOLDER/objects/<hash[:2]>/<hash>/cleaning/
+            <fingerprint>.json.gz   清洗产物
+            <fingerprint>.json      清洗统计信息，最后写入，存在即表示条目完整
+
+    重试或重启后再次处理同一文件时直接复用结果；清洗规则变化后指纹随之变化，
+    只有尚未按新规则清洗过的文档需要重新清洗。缓存总大小超过上限
+    （CLEANING_CACHE_SIZE，0 表示不缓存）时按最近使用时间淘汰最久未用的条目。
+
+    清洗产物以硬链接方式与内容目录下的 cleaned.json.gz 共用，淘汰这样的条目
+    不能释放磁盘空间，因此只有不再被文档使用的产物（例如规则变化前的结果）
+    计入缓存大小，上限限制的是缓存额外占用的空间。
+    """
+
+    DIR_NAME = "cleaning"
+
+    def __init__(self, store: DocumentStore, max_size: Optional[int] = None):
+        super().__init__(store, settings.CLEANING_CACHE_SIZE if max_size is None else max_size)
+
+    def entry_paths(self, content_hash: str, fingerprint: str) -> Tuple[Path, Path]:
+        """获取缓存条目的文件路径和统计信息路径"""
+        if not _HASH_PATTERN.match(fingerprint):
+            raise ValueError(f"无效的规则指纹: {fingerprint}")
+        cache_dir = self.cache_dir(content_hash)
+        return cache_dir / f"{fingerprint}{ARTIFACT_SUFFIX}", cache_dir / f"{fingerprint}.json"
+
+    def get(self, content_hash: str, fingerprint: str, output_path: Union[str, Path]) -> Optional[Dict]:
+        """读取缓存的清洗结果，命中时把清洗产物放到 output_path
+
+        Args:
+            content_hash: 原始文件内容的 SHA-256
+            fingerprint: 清洗规则指纹
+            output_path: 清洗产物的目标路径
+
+        Returns:
+            清洗统计信息，未命中时返回 None
+        """
+        if not self.enabled:
+            return None
+        file_path, stats_path = self.entry_paths(content_hash, fingerprint)
+        try:
+            stats = json.loads(stats_path.read_bytes())
+            self.store.link_atomic(file_path, Path(output_path))
+            # 更新最近使用时间
+            os.utime(stats_path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"清洗缓存读取失败 {stats_path}: {str(e)}")
+            return None
+        return stats
+
+    def put(self, content_hash: str, fingerprint: str, cleaned_path: Union[str, Path],
+            stats: Dict) -> None:
+        """保存清洗结果，之后按需淘汰旧条目
+
+        Args:
+            content_hash: 原始文件内容的 SHA-256
+            fingerprint: 清洗规则指纹
+            cleaned_path: 清洗产物文件
+            stats: 清洗统计信息
+        """
+        if not self.enabled:
+            return
+        file_path, stats_path = self.entry_paths(content_hash, fingerprint)
+        try:
+            self.store.link_atomic(Path(cleaned_path), file_path)
+            self.store.write_atomic(stats_path, json.dumps(stats).encode("utf-8"))
+            size = file_path.stat().st_size + stats_path.stat().st_size
+        except OSError as e:
+            logger.warning(f"清洗缓存写入失败 {file_path}: {str(e)}")
+            return
+        self._added(size)
+
+    def _entry_files(self) -> Iterator[Tuple[Path, ...]]:
+        for stats_path in self.store.root.glob(f"*/*/{self.DIR_NAME}/*.json"):
+            yield stats_path, stats_path.with_name(stats_path.stem + ARTIFACT_SUFFIX)
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """只允许内置容器和标量的反序列化器，拒绝加载任何类或函数"""
+
+    def find_class(self, module: str, name: str):
+        raise pickle.UnpicklingError(f"解析缓存中不允许的对象: {module}.{name}")
+
+
+class ParseCache(DiskCache):
+    """解析结果缓存
+
+    以 (内容哈希, 解析指纹) 为键保存紧凑的文档结构（见 DocumentParser.dump_structure），
+    解析指纹包含解析器版本、分类模式和清洗规则指纹：
+
+        UPLOAD_FOLDER/objects/<hash[:2]>/<hash>/parsing/<fingerprint>.pickle
+
+    条目只包含内置容器和标量，以 pickle 格式保存，读取时内存映射文件并直接
+    反序列化，不加载任何类。更换抽取提示词后重新抽取时，未变化的文档无需再次解析。
+    缓存总大小超过上限（PARSE_CACHE_SIZE，0 表示不缓存）时按最近使用时间淘汰。
+    """
+
+    DIR_NAME = "parsing"
+    SUFFIX = ".pickle"
+
+    def __init__(self, store: DocumentStore, max_size: Optional[int] = None):
+        super().__init__(store, settings.PARSE_CACHE_SIZE if max_size is None else max_size)
+
+    def entry_path(self, content_hash: str, fingerprint: str) -> Path:
+        """获取缓存条目的路径"""
+        if not _HASH_PATTERN.match(fingerprint):
+            raise ValueError(f"无效的解析指纹: {fingerprint}")
+        return self.cache_dir(content_hash) / f"{fingerprint}{self.SUFFIX}"
+
+    def get(self, content_hash: str, fingerprint: str) -> Optional[Dict]:
+        """读取缓存的文档结构数据
+
+        Returns:
+            DocumentParser.dump_structure 的结果，未命中时返回 None
+        """
+        if not self.enabled:
+            return None
+        path = self.entry_path(content_hash, fingerprint)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                payload = _PlainUnpickler(data).load()
+            # 更新最近使用时间
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"解析缓存读取失败 {path}: {str(e)}")
+            return None
+        return payload
+
+    def put(self, content_hash: str, fingerprint: str, payload: Dict) -> None:
+        """保存文档结构数据，之后按需淘汰旧条目"""
+        if not self.enabled:
+            return
+        path = self.entry_path(content_hash, fingerprint)
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            self.store.write_atomic(path, data)
+        except OSError as e:
+            logger.warning(f"解析缓存写入失败 {path}: {str(e)}")
+            return
+        self._added(len(data))
+
+    def _entry_files(self) -> Iterator[Tuple[Path, ...]]:
+        for path in self.store.root.glob(f"*/*/{self.DIR_NAME}/*{self.SUFFIX}"):
+            yield (path,)
+
+
+class ImageStore:
+    """内容寻址的图片存储
+
+    以图片内容的 SHA-256 作为键，不同文档中的相同图片只保存一份：
+
+        UPLOAD_FOLDER/images/<hash[:2]>/<hash><扩展名>
+
+    解析时只记录图片在包内的路径（Image.path），图片内容在需要时才从原始文件中提取。
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def path_for(self, image_hash: str, suffix: str = "") -> Path:
+        """获取图片的存储路径"""
+        if not _HASH_PATTERN.match(image_hash):
+            raise ValueError(f"无效的图片哈希: {image_hash}")
+        if suffix and not _SUFFIX_PATTERN.match(suffix):
+            suffix = ""
+        return self.root / image_hash[:2] / f"{image_hash}{suffix.lower()}"
+
+    def put(self, data: bytes, suffix: str = "") -> str:
+        """保存图片，内容已存在时不重复写入
+
+        Args:
+            data: 图片内容
+            suffix: 扩展名，例如 .png
+
+        Returns:
+            图片的存储路径
+        """
+        path = self.path_for(hashlib.sha256(data).hexdigest(), suffix)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=".tmp_", delete=False) as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_file.name, path)
+        return str(path)
+
+    def extract(self, package: zipfile.ZipFile, target: str, part_name: str = DOCUMENT_PART) -> str:
+        """从文档包中提取图片并保存
+
+        Args:
+            package: 已打开的 OOXML 包
+            target: 图片的关系目标路径（Image.path），相对于 part_name 所在目录
+            part_name: 引用图片的部件名称
+
+        Returns:
+            图片的存储路径
+
+        Raises:
+            KeyError: 包中不存在该图片
+        """
+        name = resolve_part_name(part_name, target)
+        return self.put(package.read(name), posixpath.splitext(name)[1])
@@ -1,18 +1,34 @@
 import os
+import re
 import hashlib
 from pathlib import Path
-from typing import Tuple, Optional
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 from loguru import logger
 
-import tempfile
 from ...config import settings
-from ...models.document import Document, DocumentMetadata
+from ...models.document import Document, DocumentMetadata, DocumentStatus, UploadResult
+from ...models.document_structure import DocumentStructure, Image
 from .validator import DocumentValidator
 from .cleaner import DocumentCleaner
-from ...utils.error_handler import DocumentError
+from .parser import DocumentParser
+from .context import DocumentContext, DocumentSource
+from .store import DocumentStore
+from .artifact import CleanedDocument, is_artifact_path
+from .ooxml import open_package, parse_w3cdtf, read_document_properties
+from .registry import DocumentRegistry
+from ...utils.error_handler import (
+    DocumentError,
+    KnowledgeExtractionError,
+    Neo4jConnectionError,
+    KnowledgeValidationError
+)
 from ..knowledge_graph.extractor import KnowledgeExtractor
 from ..knowledge_graph.neo4j_manager import Neo4jManager
+from ...utils.profiling import PipelineProfiler, pipeline_metrics
+
+# 上传内容：内存中的字节、文件路径或二进制文件对象
+UploadSource = Union[bytes, bytearray, memoryview, str, Path, BinaryIO]
 
 class DocumentUploader:
     """文档上传处理器"""
@@ -20,74 +36,167 @@ class DocumentUploader:
     def __init__(self):
         self.validator = DocumentValidator()
         self.cleaner = DocumentCleaner()
-        self.knowledge_extractor = KnowledgeExtractor()
-        self.neo4j_manager = Neo4jManager()
+        self.parser = DocumentParser()
+        self.store = DocumentStore()
+        self._registry: Optional[DocumentRegistry] = None
+        self._knowledge_extractor: Optional[KnowledgeExtractor] = None
+        self._neo4j_manager: Optional[Neo4jManager] = None
+    
+    @property
+    def registry(self) -> DocumentRegistry:
+        """文档注册表（首次使用时打开）"""
+        if self._registry is None:
+            self._registry = DocumentRegistry()
+        return self._registry
+    
+    @registry.setter
+    def registry(self, value: DocumentRegistry) -> None:
+        self._registry = value
+    
+    @property
+    def knowledge_extractor(self) -> KnowledgeExtractor:
+        """知识抽取器（首次使用时创建）"""
+        if self._knowledge_extractor is None:
+            self._knowledge_extractor = KnowledgeExtractor()
+        return self._knowledge_extractor
+    
+    @property
+    def neo4j_manager(self) -> Neo4jManager:
+        """Neo4j 数据库管理器（首次使用时创建）"""
+        if self._neo4j_manager is None:
+            self._neo4j_manager = Neo4jManager()
+        return self._neo4j_manager
     
     def _generate_file_hash(self, file_content: bytes) -> str:
         """生成文件内容的哈希值"""
         return hashlib.sha256(file_content).hexdigest()
     
-    def _save_file(self, file_content: bytes, filename: str) -> Tuple[str, str]:
-        """保存文件到磁盘"""
-        # 生成唯一的文件ID
-        file_id = hashlib.md5(f"{filename}_{datetime.now()}".encode()).hexdigest()
+    def _receive_stream(self, source: UploadSource) -> Tuple[str, str]:
+        """把上传内容分块写入存储的临时文件
         
-        # 构建保存路径
-        save_dir = Path(settings.UPLOAD_FOLDER) / datetime.now().strftime("%Y%m")
-        save_dir.mkdir(parents=True, exist_ok=True)
+        复制过程中增量计算哈希，并在字节到达时检查大小限制，超限立即中止，
+        整个文件不会同时驻留在内存中。
         
-        file_path = save_dir / f"{file_id}_{filename}"
+        Args:
+            source: 文件路径或二进制文件对象
+            
+        Returns:
+            临时文件路径和内容哈希
+            
+        Raises:
+            DocumentError: 文件大小超过限制时
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        stream = open(source, "rb") if isinstance(source, (str, Path)) else source
+        try:
+            with self.store.incoming_file() as tmp_file:
+                try:
+                    for chunk in iter(lambda: stream.read(DocumentContext.CHUNK_SIZE), b""):
+                        size += len(chunk)
+                        self.validator.validate_file_size(size)
+                        hasher.update(chunk)
+                        tmp_file.write(chunk)
+                except BaseException:
+                    tmp_file.close()
+                    os.unlink(tmp_file.name)
+                    raise
+        finally:
+            if stream is not source:
+                stream.close()
+        return tmp_file.name, hasher.hexdigest()
+    
+    def _save_file(self, context: DocumentContext, move_source: bool = False) -> Tuple[str, str]:
+        """保存文件到内容寻址存储
         
-        # 保存文件
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        相同内容只保存一份，文件ID由内容哈希派生，同一内容始终对应同一ID
         
-        return str(file_path), file_id
+        Args:
+            context: 文档处理上下文
+            move_source: 上下文引用的是存储中的临时文件时直接移动，不再复制
+        """
+        content_hash = context.content_hash
+        if context.file_content is not None:
+            file_path = self.store.put(content_hash, context.file_content)
+        else:
+            # 移动前关闭 zip 句柄，之后从最终位置读取
+            context.close()
+            file_path = self.store.put_file(content_hash, context.source_path, move=move_source)
+            context.source_path = file_path
+        file_id = content_hash[:32]
+        return file_path, file_id
     
-    def _extract_metadata(self, file_path: str) -> DocumentMetadata:
-        """从文档中提取元数据"""
-        # TODO: 实现从docx文件中提取元数据的逻辑
+    def _extract_metadata(self, context: DocumentContext) -> DocumentMetadata:
+        """从文档中提取元数据
+        
+        直接读取 zip 包中的 docProps/core.xml 和 docProps/app.xml，
+        不加载文档正文；文档未设置标题时使用文件名
+        """
+        try:
+            properties = read_document_properties(context.package)
+        except Exception as e:
+            logger.warning(f"文档属性读取失败: {str(e)}")
+            properties = {}
+        
+        revision = properties.get("revision")
+        keywords = [k.strip() for k in re.split(r"[,;，；]", properties.get("keywords", "")) if k.strip()]
+        
         return DocumentMetadata(
-            title=Path(file_path).stem,
-            version="1.0",
-            created_date=datetime.now(),
-            last_modified=datetime.now()
+            title=properties.get("title") or Path(context.filename).stem,
+            version=properties.get("version") or "1.0",
+            revision=int(revision) if revision and revision.isdigit() else None,
+            author=properties.get("author"),
+            last_modified_by=properties.get("last_modified_by"),
+            department=properties.get("company"),
+            created_date=parse_w3cdtf(properties.get("created")),
+            last_modified=parse_w3cdtf(properties.get("modified")),
+            keywords=keywords
         )
         
-    def _extract_knowledge_graph(self, file_path: str, doc_id: str) -> None:
+    def _persist_document(self, document: Document) -> None:
+        """保存文档记录到内容寻址存储和文档注册表"""
+        self.store.save_document(document)
+        self.registry.register(document)
+        
+    def _extract_knowledge_graph(self, file_path: DocumentSource, doc_id: str,
+                                 profiler: Optional[PipelineProfiler] = None) -> None:
         """从文档中提取知识图谱
         
         Args:
-            file_path: 文档路径
+            file_path: 文档路径或文档处理上下文
             doc_id: 文档ID
+            profiler: 阶段计时器，记录 extract 和 neo4j 阶段的耗时
             
         Raises:
             KnowledgeExtractionError: 知识图谱提取失败
             Neo4jConnectionError: Neo4j数据库连接失败
             KnowledgeValidationError: 知识内容验证失败
         """
+        profiler = profiler or PipelineProfiler()
         try:
-            # 首先验证文档内容
-            if not self._validate_document_content(file_path):
-                raise KnowledgeValidationError("文档内容不符合知识图谱提取要求")
-            
-            # 从文档中抽取知识并生成 Cypher 语句
-            logger.info(f"从文档 {doc_id} 中抽取知识图谱")
-            try:
-                cypher_script = self.knowledge_extractor.extract_from_document(file_path, doc_id)
-            except Exception as e:
-                raise KnowledgeExtractionError(f"知识图谱提取失败: {str(e)}")
-            
-            # 验证生成的知识图谱
-            if not self._validate_knowledge_graph(cypher_script):
-                raise KnowledgeValidationError("生成的知识图谱不符合规范要求")
+            with profiler.stage("extract"):
+                # 首先验证文档内容
+                if not self._validate_document_content(file_path):
+                    raise KnowledgeValidationError("文档内容不符合知识图谱提取要求")
+                
+                # 从文档中抽取知识并生成 Cypher 语句
+                logger.info(f"从文档 {doc_id} 中抽取知识图谱")
+                try:
+                    cypher_script = self.knowledge_extractor.extract_from_document(file_path, doc_id)
+                except Exception as e:
+                    raise KnowledgeExtractionError(f"知识图谱提取失败: {str(e)}")
+                
+                # 验证生成的知识图谱
+                if not self._validate_knowledge_graph(cypher_script):
+                    raise KnowledgeValidationError("生成的知识图谱不符合规范要求")
             
             # 连接到 Neo4j 并执行 Cypher 语句
-            try:
-                self.neo4j_manager.execute_cypher_script(cypher_script)
-                logger.info(f"文档 {doc_id} 的知识图谱已存储到数据库")
-            except Exception as e:
-                raise Neo4jConnectionError(f"Neo4j数据库操作失败: {str(e)}")
+            with profiler.stage("neo4j"):
+                try:
+                    self.neo4j_manager.execute_cypher_script(cypher_script)
+                    logger.info(f"文档 {doc_id} 的知识图谱已存储到数据库")
+                except Exception as e:
+                    raise Neo4jConnectionError(f"Neo4j数据库操作失败: {str(e)}")
                 
         except (KnowledgeExtractionError, Neo4jConnectionError, KnowledgeValidationError) as e:
             logger.error(f"知识图谱处理失败: {str(e)}")
@@ -96,11 +205,11 @@ class DocumentUploader:
             logger.error(f"未预期的错误: {str(e)}")
             raise KnowledgeExtractionError(f"知识图谱提取过程中发生错误: {str(e)}")
             
-    def _validate_document_content(self, file_path: str) -> bool:
+    def _validate_document_content(self, file_path: DocumentSource) -> bool:
         """验证文档内容是否适合进行知识图谱提取
         
         Args:
-            file_path: 文档路径
+            file_path: 文档路径或文档处理上下文
             
         Returns:
             bool: 文档内容是否有效
@@ -141,12 +250,177 @@ class DocumentUploader:
             logger.warning(f"知识图谱验证失败: {str(e)}")
             return False
     
-    def upload(self, file_content: bytes, filename: str, extract_knowledge: bool = False) -> Document:
+    def _process_document(self, context: DocumentContext, move_source: bool = False,
+                          profiler: Optional[PipelineProfiler] = None) -> Document:
+        """执行上传流水线中不依赖外部服务的阶段：验证、保存、清洗、元数据提取
+        
+        Args:
+            context: 文档处理上下文
+            move_source: 是否把上下文引用的临时文件直接移动到存储中
+            profiler: 阶段计时器，未提供时新建
+            
+        Returns:
+            Document: 新建的文档记录（尚未持久化），timings 中包含已完成阶段的耗时
+        """
+        filename = context.filename
+        profiler = profiler or PipelineProfiler()
+        
+        # 验证文件
+        with profiler.stage("validate"):
+            self.validator.validate_file(filename, context.file_content, context)
+        
+        # 保存原始文件
+        with profiler.stage("save"):
+            file_path, file_id = self._save_file(context, move_source)
+        
+        # 清洗
+        cleaned_path, fingerprint, cleaning_stats = self._clean(context, profiler)
+        
+        # 提取元数据
+        with profiler.stage("metadata"):
+            metadata = self._extract_metadata(context)
+            metadata.keywords.append("cleaned")
+            metadata.keywords.extend(self._cleaning_keywords(cleaning_stats))
+        
+        # 创建文档记录
+        return Document(
+            id=file_id,
+            filename=filename,
+            file_path=cleaned_path,
+            file_size=context.file_size,
+            content_hash=context.content_hash,
+            cleaning_fingerprint=fingerprint,
+            metadata=metadata,
+            timings=profiler.timings
+        )
+    
+    def _clean(self, context: DocumentContext,
+               profiler: PipelineProfiler) -> Tuple[str, str, Dict[str, int]]:
+        """在 XML 层清洗并保存紧凑的清洗产物，不再写出清洗后的 .docx
+        
+        同一内容已按相同规则清洗过时直接使用缓存的结果
+        
+        Returns:
+            清洗产物路径、清洗规则指纹和清洗统计信息
+        """
+        with profiler.stage("clean"):
+            cleaned_path = str(self.store.path_for(context.content_hash, DocumentStore.ARTIFACT_NAME))
+            fingerprint = self.cleaner.fingerprint()
+            cache = self.store.cleaning_cache
+            cleaning_stats = cache.get(context.content_hash, fingerprint, cleaned_path)
+            if cleaning_stats is None:
+                cleaned, cleaning_stats = self.cleaner.clean_artifact(context)
+                self.store.write_atomic(Path(cleaned_path), cleaned.to_bytes())
+                cache.put(context.content_hash, fingerprint, cleaned_path, cleaning_stats)
+            else:
+                cleaned = CleanedDocument.load(cleaned_path)
+            context.use_cleaned(cleaned, cleaned_path, fingerprint)
+        return cleaned_path, fingerprint, cleaning_stats
+    
+    @staticmethod
+    def _cleaning_keywords(cleaning_stats: Dict[str, int]) -> List[str]:
+        """记录在文档关键词中的清洗统计信息"""
+        return [f"{name}:{cleaning_stats[name]}" for name in ("removed_paragraphs", "cleaned_paragraphs")]
+    
+    def _reclean_document(self, document: Document, context: DocumentContext,
+                          profiler: Optional[PipelineProfiler] = None) -> bool:
+        """按当前清洗规则更新重复上传的文档
+        
+        文档是按旧的清洗规则清洗的时，通过清洗缓存获取或重新生成当前规则的清洗产物，
+        并更新文档记录中的清洗规则指纹和清洗统计信息；原始文件已保存，无需再次验证。
+        
+        Args:
+            document: 已保存的文档记录
+            context: 重复上传内容的文档处理上下文
+            profiler: 阶段计时器，未提供时新建
+            
+        Returns:
+            文档记录是否被更新（尚未持久化）
+        """
+        if document.cleaning_fingerprint == self.cleaner.fingerprint():
+            return False
+        logger.info(f"清洗规则已变化，重新清洗文档 {document.filename}")
+        cleaned_path, fingerprint, cleaning_stats = self._clean(context, profiler or PipelineProfiler())
+        updated = {keyword.split(":", 1)[0]: keyword for keyword in self._cleaning_keywords(cleaning_stats)}
+        document.metadata.keywords = [
+            updated.get(keyword.split(":", 1)[0], keyword) for keyword in document.metadata.keywords
+        ]
+        document.file_path = cleaned_path
+        document.cleaning_fingerprint = fingerprint
+        return True
+    
+    def _load_structure(self, context: DocumentContext) -> DocumentStructure:
+        """获取上下文的文档结构，同一内容已按相同方式解析过时直接读取解析缓存
+        
+        清洗产物由原始内容和清洗规则唯一确定，解析缓存已按内容哈希区分，解析指纹
+        只需包含解析器配置和生成清洗产物的清洗规则指纹，清洗规则或解析器变化后
+        自动重新解析，计算指纹时无需读取清洗产物并计算哈希。没有记录清洗规则指纹的旧文档
+        改用清洗产物的哈希。结果同时保存到上下文中，供后续阶段使用。
+        """
+        if context._structure is not None:
+            return context._structure
+        source_fingerprint = ""
+        if context.cleaned is not None:
+            source_fingerprint = context.cleaning_fingerprint
+            if source_fingerprint is None:
+                source_fingerprint = hashlib.sha256(Path(context.file_path).read_bytes()).hexdigest()
+        fingerprint = self.parser.fingerprint(source_fingerprint)
+        cache = self.store.parse_cache
+        payload = cache.get(context.content_hash, fingerprint)
+        if payload is not None:
+            structure = self.parser.load_structure(payload)
+        else:
+            structure = self.parser.parse_document(context)
+            cache.put(context.content_hash, fingerprint, self.parser.dump_structure(structure))
+        context.structure = structure
+        return structure
+    
+    def _extraction_context(self, document: Document,
+                            structure: Optional[DocumentStructure] = None) -> DocumentContext:
+        """为已保存的文档创建知识抽取使用的上下文
+        
+        上下文引用原始文件和清洗产物；未提供文档结构时从解析缓存读取或重新解析。
+        调用方负责关闭上下文。
+        """
+        context = DocumentContext.from_path(
+            self.store.path_for(document.content_hash, DocumentStore.ORIGINAL_NAME),
+            document.filename, document.content_hash
+        )
+        if is_artifact_path(document.file_path):
+            context.use_cleaned(CleanedDocument.load(document.file_path), document.file_path,
+                                document.cleaning_fingerprint)
+        else:
+            context.file_path = document.file_path
+        if structure is not None:
+            context.structure = structure
+        else:
+            self._load_structure(context)
+        return context
+    
+    def _apply_knowledge_extraction(self, document: Document, source: DocumentSource,
+                                    profiler: Optional[PipelineProfiler] = None) -> None:
+        """提取知识图谱并把结果记录到文档中，失败时只记录错误不抛出异常"""
+        try:
+            self._extract_knowledge_graph(source, document.id, profiler)
+            document.metadata.keywords.append("knowledge_graph_extracted")
+            document.metadata.knowledge_graph_status = "success"
+            document.status = DocumentStatus.COMPLETED.value
+        except Exception as e:
+            logger.warning(f"知识图谱提取失败: {str(e)}")
+            document.metadata.keywords.append("knowledge_graph_failed")
+            document.metadata.knowledge_graph_status = "failed"
+            document.metadata.knowledge_graph_error = str(e)
+            document.status = DocumentStatus.ERROR.value
+    
+    def upload(self, file_content: UploadSource, filename: Optional[str] = None,
+               extract_knowledge: bool = False) -> Document:
         """处理文档上传
         
         Args:
-            file_content: 文件内容
-            filename: 文件名
+            file_content: 文件内容，可以是 bytes、文件路径或二进制文件对象。
+                路径和文件对象以流式方式分块复制到存储中，边复制边计算哈希、
+                检查大小，不会整体读入内存
+            filename: 文件名，未提供时从路径或文件对象的 name 属性获取
             extract_knowledge: 是否从文档中提取知识图谱
             
         Returns:
@@ -154,50 +428,46 @@ class DocumentUploader:
             
         Raises:
             DocumentError: 当文档验证失败或上传过程出错时
+            
+        Note:
+            内容相同的文件只处理一次，重复上传直接返回已有的文档记录，
+            不再进行验证和知识抽取；清洗规则变化后只按新规则重新清洗并更新记录。
+            新文档的各阶段耗时记录在 Document.timings 中，并汇总到 pipeline_metrics
         """
+        filename = filename or self._source_name(file_content)
+        incoming_path = None
+        context = None
+        profiler = PipelineProfiler()
         try:
-            # 验证文件
-            self.validator.validate_file(filename, file_content)
-            
-            # 保存原始文件
-            file_path, file_id = self._save_file(file_content, filename)
-            
-            # 清洗文档
-            cleaned_doc, cleaning_stats = self.cleaner.clean_document(file_path)
-            
-            # 保存清洗后的文档
-            cleaned_path = str(Path(file_path).parent / f"cleaned_{Path(file_path).name}")
-            cleaned_doc.save(cleaned_path)
-            
-            # 提取元数据
-            metadata = self._extract_metadata(cleaned_path)
-            metadata.keywords.extend([
-                "cleaned",
-                f"removed_paragraphs:{cleaning_stats['removed_paragraphs']}",
-                f"cleaned_paragraphs:{cleaning_stats['cleaned_paragraphs']}"
-            ])
-            
-            # 创建文档记录
-            document = Document(
-                id=file_id,
-                filename=filename,
-                file_path=cleaned_path,
-                file_size=len(file_content),
-                content_hash=self._generate_file_hash(file_content),
-                metadata=metadata
-            )
+            # 各阶段共享同一份文档树，整个流水线只解析一次
+            if isinstance(file_content, (bytes, bytearray, memoryview)):
+                context = DocumentContext(file_content, filename)
+            else:
+                with profiler.stage("receive"):
+                    incoming_path, content_hash = self._receive_stream(file_content)
+                context = DocumentContext.from_path(incoming_path, filename, content_hash)
+            
+            # 基于文件哈希检测重复文件，清洗规则变化后只更新清洗结果
+            existing = self.store.get_document(context.content_hash)
+            if existing is not None:
+                logger.info(f"检测到重复文件: {filename} 与已上传文档 {existing.filename} 内容相同")
+                if self._reclean_document(existing, context, profiler):
+                    self._persist_document(existing)
+                return existing
+            
+            document = self._process_document(context, incoming_path is not None, profiler)
             
             # 如果需要，提取知识图谱
             if extract_knowledge:
-                try:
-                    self._extract_knowledge_graph(cleaned_path, file_id)
-                    document.metadata.keywords.append("knowledge_graph_extracted")
-                    document.metadata.knowledge_graph_status = "success"
-                except Exception as e:
-                    logger.warning(f"知识图谱提取失败: {str(e)}")
-                    document.metadata.keywords.append("knowledge_graph_failed")
-                    document.metadata.knowledge_graph_status = "failed"
-                    document.metadata.knowledge_graph_error = str(e)
+                with profiler.stage("parse"):
+                    self._load_structure(context)
+                self._apply_knowledge_extraction(document, context, profiler)
+            
+            document.timings = profiler.finish()
+            pipeline_metrics.observe(document.timings)
+            
+            # 保存文档记录，供重复上传时直接返回
+            self._persist_document(document)
             
             logger.info(f"Document uploaded successfully: {filename}")
             return document
@@ -205,7 +475,142 @@ class DocumentUploader:
         except Exception as e:
             logger.error(f"Error uploading document {filename}: {str(e)}")
             raise DocumentError(f"Failed to upload document: {str(e)}")
+        finally:
+            if context is not None:
+                context.close()
+            # 未移动到存储中的临时文件（验证失败或重复文件）
+            if incoming_path and os.path.exists(incoming_path):
+                os.unlink(incoming_path)
+    
+    def _source_name(self, source: UploadSource) -> str:
+        """从路径或文件对象获取文件名"""
+        if isinstance(source, (str, Path)):
+            return Path(source).name
+        name = getattr(source, "name", None)
+        if isinstance(name, str) and name:
+            return Path(name).name
+        raise DocumentError("无法确定上传文件的文件名")
+    
+    def upload_many(self, paths: Iterable[Union[str, Path]], extract_knowledge: bool = False,
+                    max_workers: Optional[int] = None) -> Iterator[UploadResult]:
+        """批量上传文档
+        
+        验证、清洗和解析等 CPU 密集的阶段分发到进程池并行执行，知识图谱提取
+        （网络 I/O）在当前进程中按完成顺序进行。单个文档失败不影响其他文档。
+        
+        Args:
+            paths: 文档路径列表，目录会递归展开为其中的 .docx 文件
+            extract_knowledge: 是否从文档中提取知识图谱
+            max_workers: 进程数，默认使用 BATCH_MAX_WORKERS 配置或 CPU 核心数
+            
+        Yields:
+            UploadResult: 每个文档的处理结果，按完成顺序返回
+        """
+        files = self._expand_paths(paths)
+        if not files:
+            return
+        
+        max_workers = max_workers or settings.BATCH_MAX_WORKERS or None
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_upload_worker,
+            initargs=(str(self.store.root.parent), self.validator, self.cleaner, self.parser)
+        ) as executor:
+            futures = {
+                executor.submit(_upload_worker, str(path), extract_knowledge): path
+                for path in files
+            }
+            processed_hashes = set()
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    document, structure, duplicate, recleaned = future.result()
+                    if recleaned:
+                        self._persist_document(document)
+                    # 同一批次中内容相同的文件只保存和抽取一次
+                    duplicate = duplicate or document.content_hash in processed_hashes
+                    processed_hashes.add(document.content_hash)
+                    if not duplicate:
+                        # 在工作进程记录的阶段耗时基础上继续计时
+                        profiler = PipelineProfiler(timings=document.timings)
+                        if extract_knowledge:
+                            context = self._extraction_context(document, structure)
+                            try:
+                                self._apply_knowledge_extraction(document, context, profiler)
+                            finally:
+                                context.close()
+                        document.timings = profiler.finish()
+                        pipeline_metrics.observe(document.timings)
+                        self._persist_document(document)
+                    logger.info(f"Document uploaded successfully: {path}")
+                    yield UploadResult(path=str(path), document=document, duplicate=duplicate)
+                except Exception as e:
+                    logger.error(f"Error uploading document {path}: {str(e)}")
+                    yield UploadResult(
+                        path=str(path),
+                        error_type=type(e).__name__,
+                        error=str(e)
+                    )
+    
+    def _expand_paths(self, paths: Iterable[Union[str, Path]]) -> List[Path]:
+        """展开目录并去除重复路径"""
+        files = []
+        seen = set()
+        for path in map(Path, paths):
+            candidates = sorted(path.rglob("*.docx")) if path.is_dir() else [path]
+            for candidate in candidates:
+                if candidate not in seen:
+                    seen.add(candidate)
+                    files.append(candidate)
+        return files
+            
+    def render_cleaned_document(self, document: Document) -> str:
+        """生成清洗后的 .docx，用于预览或下载
+        
+        上传时只保存清洗产物，清洗后的 .docx 按当前清洗规则从原始文件按需生成，
+        未变化的部件按原来的压缩方式复制，无需重新序列化
+        
+        Args:
+            document: 文档对象
+            
+        Returns:
+            清洗后的 .docx 路径
+            
+        Raises:
+            DocumentError: 原始文件不存在
+        """
+        original = self.store.path_for(document.content_hash, DocumentStore.ORIGINAL_NAME)
+        if not original.exists():
+            raise DocumentError(f"文档文件不存在: {original}")
+        cleaned_path = self.store.path_for(document.content_hash, DocumentStore.CLEANED_NAME)
+        self.cleaner.clean_package(original, cleaned_path)
+        return str(cleaned_path)
+    
+    def extract_images(self, document: Document, images: Iterable[Image]) -> List[str]:
+        """把文档中的图片提取到内容寻址的图片存储
+        
+        解析时只记录图片在包内的路径，图片内容在预览或导出时按需提取；
+        不同文档中的相同图片只保存一份
+        
+        Args:
+            document: 文档对象
+            images: 该文档解析结果中的图片
+            
+        Returns:
+            各图片的存储路径，顺序与 images 一致
             
+        Raises:
+            DocumentError: 原始文件不存在或其中缺少图片
+        """
+        original = self.store.path_for(document.content_hash, DocumentStore.ORIGINAL_NAME)
+        if not original.exists():
+            raise DocumentError(f"文档文件不存在: {original}")
+        with open_package(original) as package:
+            try:
+                return [self.store.images.extract(package, image.path) for image in images]
+            except KeyError as e:
+                raise DocumentError(f"文档中缺少图片: {str(e)}")
+    
     def extract_knowledge_from_document(self, document: Document) -> None:
         """从已上传的文档中提取知识图谱
         
@@ -220,14 +625,20 @@ class DocumentUploader:
             if not os.path.exists(document.file_path):
                 raise DocumentError(f"文档文件不存在: {document.file_path}")
                 
-            # 提取知识图谱
-            self._extract_knowledge_graph(document.file_path, document.id)
+            # 提取知识图谱，内容未变化时直接使用缓存的解析结果
+            context = self._extraction_context(document)
+            try:
+                self._extract_knowledge_graph(context, document.id)
+            finally:
+                context.close()
             
             # 更新文档元数据
             document.metadata.keywords = [k for k in document.metadata.keywords if k != "knowledge_graph_failed"]
             document.metadata.keywords.append("knowledge_graph_extracted")
             document.metadata.knowledge_graph_status = "success"
             document.metadata.knowledge_graph_error = None
+            document.status = DocumentStatus.COMPLETED.value
+            self._persist_document(document)
             
             logger.info(f"Successfully extracted knowledge graph from document: {document.filename}")
             
@@ -238,4 +649,44 @@ class DocumentUploader:
             document.metadata.keywords.append("knowledge_graph_failed")
             document.metadata.knowledge_graph_status = "failed"
             document.metadata.knowledge_graph_error = str(e)
-            raise DocumentError(error_message)
\ No newline at end of file
+            document.status = DocumentStatus.ERROR.value
+            self._persist_document(document)
+            raise DocumentError(error_message)
+
+
+# 批量上传工作进程中的上传器实例
+_worker_uploader: Optional[DocumentUploader] = None
+
+def _init_upload_worker(store_root: str, validator: DocumentValidator,
+                        cleaner: DocumentCleaner, parser: DocumentParser) -> None:
+    """初始化批量上传工作进程，沿用主进程的存储位置和验证、清洗、解析配置"""
+    global _worker_uploader
+    _worker_uploader = DocumentUploader()
+    _worker_uploader.store = DocumentStore(store_root)
+    _worker_uploader.validator = validator
+    _worker_uploader.cleaner = cleaner
+    _worker_uploader.parser = parser
+
+def _upload_worker(path: str, parse: bool) -> Tuple[Document, Optional[DocumentStructure], bool, bool]:
+    """在工作进程中处理单个文档
+    
+    Returns:
+        文档记录、解析后的文档结构（仅当 parse 为 True 时）、是否为重复文件，
+        以及重复文件的记录是否已按当前清洗规则重新清洗（需由主进程保存）
+    """
+    context = DocumentContext.from_path(path)
+    try:
+        existing = _worker_uploader.store.get_document(context.content_hash)
+        if existing is not None:
+            return existing, None, True, _worker_uploader._reclean_document(existing, context)
+        
+        profiler = PipelineProfiler()
+        document = _worker_uploader._process_document(context, profiler=profiler)
+        structure = None
+        if parse:
+            with profiler.stage("parse"):
+                structure = _worker_uploader._load_structure(context)
+            document.timings = profiler.timings
+        return document, structure, False, False
+    finally:
+        context.close()
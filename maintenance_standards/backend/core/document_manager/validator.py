@@ -1,22 +1,41 @@
-import os
-import tempfile
+import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Union
 from loguru import logger
-from docx import Document as DocxDocument
+from docx.document import Document as _Document
+from lxml import etree
 
 from ...config import settings
 from ...utils.error_handler import DocumentError
+from .context import DocumentContext, DocumentSource, load_cleaned
+from .ooxml import (
+    CONTENT_TYPES_PART,
+    DOCUMENT_PART,
+    W_BODY,
+    W_DOCUMENT,
+    W_P,
+    WORD_MAIN_CONTENT_TYPES,
+    ZIP_MAGIC,
+    iter_body_paragraph_texts,
+    open_package,
+    read_content_types
+)
 
 class DocumentValidator:
     """文档验证器"""
     
-    def validate_file(self, filename: str, file_content: bytes) -> None:
+    # 知识图谱提取所需的内容部分
+    REQUIRED_SECTIONS = ["步骤", "工具", "安全", "注意"]
+    
+    def validate_file(self, filename: str, file_content: Optional[Union[bytes, memoryview]],
+                      context: Optional[DocumentContext] = None) -> None:
         """验证文件
         
         Args:
             filename: 文件名
-            file_content: 文件内容
+            file_content: 文件内容（bytes 或 memoryview）；提供上下文时可为 None，
+                此时从上下文引用的磁盘文件验证
+            context: 可选的文档处理上下文，提供时复用其中已解析的元素树
             
         Raises:
             DocumentError: 当验证失败时
@@ -24,14 +43,20 @@ class DocumentValidator:
         # 验证文件扩展名
         self._validate_extension(filename)
         
+        if context is None:
+            context = DocumentContext(file_content, filename)
+        
         # 验证文件大小
-        self._validate_file_size(file_content)
+        self.validate_file_size(context.file_size)
+        
+        # 预检 zip 包结构，在加载完整文档之前快速拒绝无效文件
+        self._preflight_check(context)
         
         # 验证文件格式
-        self._validate_file_format(file_content)
+        self._validate_file_format(context)
         
         # 验证文件内容
-        self._validate_content(file_content)
+        self._validate_content(context)
     
     def _validate_extension(self, filename: str) -> None:
         """验证文件扩展名"""
@@ -39,140 +64,179 @@ class DocumentValidator:
         if ext not in settings.ALLOWED_EXTENSIONS:
             raise DocumentError(f"不支持的文件类型: {ext}")
     
-    def _validate_file_size(self, file_content: bytes) -> None:
+    def validate_file_size(self, file_size: int) -> None:
         """验证文件大小"""
-        if len(file_content) > settings.MAX_FILE_SIZE:
-            size_mb = len(file_content) / (1024 * 1024)
+        if file_size > settings.MAX_FILE_SIZE:
+            size_mb = file_size / (1024 * 1024)
             max_size_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
             raise DocumentError(
                 f"文件大小超过限制: {size_mb:.1f}MB (最大允许 {max_size_mb:.1f}MB)"
             )
     
-    def _validate_file_format(self, file_content: bytes) -> None:
-        """验证文件格式"""
+    def _preflight_check(self, context: DocumentContext) -> None:
+        """预检 OOXML 包
+
+        只读取 zip 中央目录和 [Content_Types].xml，检查主文档部件是否存在、
+        声明的解压大小是否合理，用于快速拒绝改名的 .doc、截断的 zip、
+        其他 Office 格式以及 zip 炸弹
+        """
+        if context.head(len(ZIP_MAGIC)) != ZIP_MAGIC:
+            raise DocumentError("文件格式无效: 不是 docx (zip) 文件")
+        
+        try:
+            package = context.package
+        except (zipfile.BadZipFile, OSError) as e:
+            raise DocumentError(f"文件格式无效: zip 包已损坏 ({str(e)})")
+        
+        infos = package.infolist()
+        if len(infos) > settings.MAX_ZIP_ENTRIES:
+            raise DocumentError(f"文件格式无效: 包内部件过多 ({len(infos)})")
+        
+        total_size = 0
+        for info in infos:
+            total_size += info.file_size
+            # 对较大的部件检查压缩比，防止 zip 炸弹
+            if (info.file_size > 1024 * 1024 and
+                    info.file_size > settings.MAX_COMPRESSION_RATIO * max(info.compress_size, 1)):
+                raise DocumentError(f"文件格式无效: 部件 {info.filename} 压缩比异常")
+        if total_size > settings.MAX_UNCOMPRESSED_SIZE:
+            size_mb = total_size / (1024 * 1024)
+            raise DocumentError(f"文件格式无效: 解压后大小异常 ({size_mb:.1f}MB)")
+        
+        names = set(package.namelist())
+        if CONTENT_TYPES_PART not in names:
+            raise DocumentError("文件格式无效: 缺少 [Content_Types].xml")
+        if DOCUMENT_PART not in names:
+            raise DocumentError(f"文件格式无效: 缺少 {DOCUMENT_PART}")
+        
         try:
-            # 将文件内容写入临时文件
-            with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp_file:
-                tmp_file.write(file_content)
-                tmp_file.flush()
-                
-                # 尝试打开文档
-                _ = DocxDocument(tmp_file.name)
-                
+            content_types = read_content_types(package)
         except Exception as e:
+            raise DocumentError(f"文件格式无效: [Content_Types].xml 无法解析 ({str(e)})")
+        if content_types.get(DOCUMENT_PART) not in WORD_MAIN_CONTENT_TYPES:
+            raise DocumentError("文件格式无效: 不是 Word 文档")
+    
+    def _validate_file_format(self, context: DocumentContext) -> None:
+        """验证文件格式
+
+        用 lxml 解析 word/document.xml 并检查根元素和正文，不加载 python-docx 对象模型；
+        解析得到的元素树保存在上下文中，清洗阶段直接使用，不再重复解析
+        """
+        try:
+            root = context.document_tree.getroot()
+        except (etree.XMLSyntaxError, zipfile.BadZipFile, OSError, KeyError) as e:
             raise DocumentError(f"文件格式无效: {str(e)}")
-        finally:
-            if 'tmp_file' in locals():
-                os.unlink(tmp_file.name)
+        if root.tag != W_DOCUMENT or root.find(W_BODY) is None:
+            raise DocumentError(f"文件格式无效: {DOCUMENT_PART} 缺少正文")
     
-    def validate_content_for_extraction(self, file_path: str) -> bool:
+    def validate_content_for_extraction(self, file_path: DocumentSource) -> bool:
         """验证文档内容是否适合进行知识图谱提取
         
+        对文档路径和文档处理上下文，直接从 zip 包中流式扫描 word/document.xml，
+        不构建 python-docx 对象，已处理的元素立即释放；
+        已清洗的上下文和清洗产物直接使用产物中的段落文本。
+        
         Args:
-            file_path: 文档路径
+            file_path: 文档路径、清洗产物（或其路径）、文档对象或文档处理上下文
             
         Returns:
             bool: 文档内容是否有效
         """
         try:
-            doc = DocxDocument(file_path)
+            if isinstance(file_path, _Document):
+                return self._check_required_sections(p.text for p in file_path.paragraphs)
             
-            # 验证文档是否为空
-            if len(doc.paragraphs) == 0:
-                logger.warning("文档内容为空")
-                return False
-                
-            # 检查必需的内容段落
-            required_sections = ["步骤", "工具", "安全", "注意"]
-            found_sections = set()
+            cleaned = load_cleaned(file_path)
+            if cleaned is not None:
+                return self._check_required_sections(text for text, _ in cleaned.paragraphs())
             
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if not text:
-                    continue
-                    
-                # 检查段落是否包含必需的关键词
-                for section in required_sections:
-                    if section in text:
-                        found_sections.add(section)
-                        
-            # 检查是否找到所有必需的部分
-            missing_sections = set(required_sections) - found_sections
-            if missing_sections:
-                logger.warning(f"缺少必需的内容部分: {', '.join(missing_sections)}")
-                return False
-                
-            # 验证段落结构
-            current_section = None
-            section_content = {}
+            if isinstance(file_path, DocumentContext):
+                return self._check_required_sections(
+                    iter_body_paragraph_texts(file_path.package)
+                )
             
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if not text:
-                    continue
-                    
-                # 判断是否是新的段落标题
-                is_title = any(text.startswith(section) for section in required_sections)
-                
-                if is_title:
-                    current_section = next(s for s in required_sections if text.startswith(s))
-                    section_content[current_section] = []
-                elif current_section:
-                    section_content[current_section].append(text)
-                    
-            # 检查每个部分是否有内容
-            for section in required_sections:
-                if section not in section_content or not section_content[section]:
-                    logger.warning(f"部分 '{section}' 没有具体内容")
-                    return False
-                    
-            return True
+            with open_package(file_path) as package:
+                return self._check_required_sections(iter_body_paragraph_texts(package))
             
         except Exception as e:
             logger.error(f"文档内容验证失败: {str(e)}")
             return False
-        """验证文件格式"""
-        try:
-            # 创建临时文件进行格式验证
-            temp_path = Path(settings.UPLOAD_FOLDER) / ".temp.docx"
-            with open(temp_path, "wb") as f:
-                f.write(file_content)
+    
+    def _check_required_sections(self, texts: Iterable[str]) -> bool:
+        """检查段落序列中是否包含所有必需部分且每个部分都有内容
+        
+        以必需关键词开头的段落视为部分标题，其后的非空段落计为该部分的内容；
+        同一部分再次出现标题时重新计数。后面再次出现的标题可能使已有内容的部分
+        变为没有内容，因此总是扫描全部段落，不提前结束。
+        
+        Args:
+            texts: 按文档顺序排列的段落文本
+            
+        Returns:
+            bool: 是否所有必需部分都有内容
+        """
+        required_sections = self.REQUIRED_SECTIONS
+        found_sections = set()
+        sections_with_content = set()
+        current_section = None
+        num_paragraphs = 0
+        
+        for text in texts:
+            num_paragraphs += 1
+            text = text.strip()
+            if not text:
+                continue
             
-            # 尝试打开文档
-            DocxDocument(temp_path)
+            # 检查段落是否包含必需的关键词
+            for section in required_sections:
+                if section in text:
+                    found_sections.add(section)
             
-            # 删除临时文件
-            os.remove(temp_path)
-        except Exception as e:
-            logger.error(f"Invalid document format: {str(e)}")
-            raise DocumentError("文档格式无效或已损坏")
+            # 判断是否是新的段落标题
+            title = next((s for s in required_sections if text.startswith(s)), None)
+            if title:
+                current_section = title
+                sections_with_content.discard(title)
+            elif current_section:
+                sections_with_content.add(current_section)
+        
+        # 验证文档是否为空
+        if num_paragraphs == 0:
+            logger.warning("文档内容为空")
+            return False
+        
+        # 检查是否找到所有必需的部分
+        missing_sections = [s for s in required_sections if s not in found_sections]
+        if missing_sections:
+            logger.warning(f"缺少必需的内容部分: {', '.join(missing_sections)}")
+            return False
+        
+        # 检查每个部分是否有内容
+        for section in required_sections:
+            if section not in sections_with_content:
+                logger.warning(f"部分 '{section}' 没有具体内容")
+                return False
+        
+        return True
     
-    def _validate_content(self, file_content: bytes) -> None:
+    def _validate_content(self, context: DocumentContext) -> None:
         """验证文件内容"""
         try:
-            # 创建临时文件进行内容验证
-            temp_path = Path(settings.UPLOAD_FOLDER) / ".temp.docx"
-            with open(temp_path, "wb") as f:
-                f.write(file_content)
+            body = context.document_tree.getroot().find(W_BODY)
             
-            doc = DocxDocument(temp_path)
-            
-            # 验证文档是否为空
-            if len(doc.paragraphs) == 0:
+            # 验证文档是否为空（没有正文层级的段落，与 python-docx 的 Document.paragraphs 一致）
+            if next(body.iterchildren(W_P), None) is None:
                 raise DocumentError("文档内容为空")
             
             # 验证文档结构
-            self._validate_document_structure(doc)
-            
-            # 删除临时文件
-            os.remove(temp_path)
+            self._validate_document_structure(body)
         except DocumentError:
             raise
         except Exception as e:
             logger.error(f"Content validation error: {str(e)}")
             raise DocumentError("文档内容验证失败")
     
-    def _validate_document_structure(self, doc: DocxDocument) -> None:
+    def _validate_document_structure(self, body: etree._Element) -> None:
         """验证文档结构"""
         # TODO: 实现更详细的文档结构验证逻辑
         # 例如：验证标题层级、必要章节等
@@ -2,7 +2,7 @@
 知识图谱提取模块
 主要功能：从文档文本中提取知识并生成 Cypher 语句
 """
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 from loguru import logger
 import json
 import requests
@@ -341,11 +341,12 @@ CREATE (step1)-[:REQUIRES]->(tool1);
         
         return cypher
 
-    def extract_from_document(self, doc_path: str, doc_id: str) -> str:
+    def extract_from_document(self, doc_path, doc_id: str) -> str:
         """从文档中提取知识并生成 Cypher 语句
         
         Args:
-            doc_path: 文档路径
+            doc_path: 文档路径、文档对象或文档处理上下文。传入上下文时
+                复用上传流水线中已解析的文档结构
             doc_id: 文档ID
             
         Returns:
@@ -355,7 +356,9 @@ CREATE (step1)-[:REQUIRES]->(tool1);
         
         # 解析文档获取文本内容
         parser = DocumentParser()
-        doc_content = parser.parse(doc_path)
+        structure = parser.parse_document(doc_path)
+        # 图片段落没有文本，不加入提示词
+        doc_content = "\n".join(text for text in structure.paragraphs.texts if text)
         
         # 在提示词中添加文档信息
         doc_info = f"""
@@ -366,73 +369,32 @@ CREATE (step1)-[:REQUIRES]->(tool1);
         
         # 从文本中提取知识
         return self.extract_from_text(doc_info)
+
+    def extract_from_document_sections(self, doc_path, doc_id: str, level: int = 1) -> Iterator[str]:
+        """按章节分块从文档中提取知识，逐章节生成 Cypher 语句
         
-        # 处理所有实体
-        for entity_type, items in entities_data.items():
-            for item in items:
-                properties = {}
-                if entity_type == 'MaintenanceStep':
-                    name = f"步骤 {item['step_order']}: {item['description'][:30]}..."
-                    properties = {
-                        'order': item['step_order'],
-                        'description': item['description'],
-                        'tools': item.get('required_tools', []),
-                        'precautions': [item.get('notes', '')]
-                    }
-                elif entity_type == 'Tool':
-                    name = item['name']
-                    properties = {
-                        'purpose': item['purpose'],
-                        'specifications': item.get('specification')
-                    }
-                elif entity_type == 'Part':
-                    name = item['name']
-                    properties = {
-                        'function': item['function'],
-                        'location': item.get('location'),
-                        'specifications': item.get('specification')
-                    }
-                elif entity_type == 'MaintenanceTask':
-                    name = item['description'][:50]
-                    properties = {
-                        'description': item['description'],
-                        'difficulty': item.get('difficulty', ''),
-                        'estimated_time': item.get('estimated_time', ''),
-                        'required_skills': [item.get('required_skills')] if item.get('required_skills') else []
-                    }
-                elif entity_type == 'SafetyPrecaution':
-                    name = item['description'][:50]
-                    properties = {
-                        'category': item['category'],
-                        'severity': item['severity'],
-                        'description': item['description']
-                    }
-                else:
-                    logger.warning(f"未知的实体类型: {entity_type}")
-                    continue
-                    
-                entities.append({
-                    'id': item['id'],
-                    'type': entity_type,
-                    'name': name,
-                    'properties': properties
-                })
-                
-            else:
-                logger.warning(f"未知的实体类型: {entity_type}")
-                continue
-        # 创建关系
-        relationships = []
-        for rel in data.get('relationships', []):
-            relationship = Relationship(
-                source=rel['source'],
-                target=rel['target'],
-                type=rel['type'],
-                properties=rel.get('properties', {})
-            )
-            relationships.append(relationship)
+        使用流式解析逐个读取章节，每次只在内存中保留一个章节，适用于超大的手册。
+        
+        Args:
+            doc_path: 文档路径、清洗产物（或其路径）或文档处理上下文
+            doc_id: 文档ID
+            level: 切分章节的最大标题层级
             
-        return KnowledgeGraph(
-            entities=entities,
-            relationships=relationships
-        )
\ No newline at end of file
+        Yields:
+            每个章节的 Cypher 语句
+        """
+        from ...core.document_manager.parser import DocumentParser
+        
+        parser = DocumentParser()
+        for section in parser.iter_sections(doc_path, level):
+            paragraphs = ([section.title] if section.title else []) + list(section.paragraphs)
+            section_content = "\n".join(p.text for p in paragraphs if p.text)
+            if not section_content.strip():
+                continue
+            doc_info = f"""
+文档ID: {doc_id}
+章节: {section.title.text if section.title else "前言"}
+---
+{section_content}
+"""
+            yield self.extract_from_text(doc_info)
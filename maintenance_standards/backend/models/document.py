@@ -1,16 +1,35 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
+class DocumentStatus(str, Enum):
+    """文档处理状态枚举"""
+    PENDING = "pending"        # 未处理
+    PROCESSING = "processing"  # 处理中
+    COMPLETED = "completed"    # 已完成
+    ERROR = "error"            # 错误
+
 class DocumentMetadata(BaseModel):
     """文档元数据模型"""
     title: str = Field(..., description="文档标题")
     version: str = Field(..., description="文档版本")
+    revision: Optional[int] = Field(None, description="文档修订号")
     author: Optional[str] = Field(None, description="文档作者")
+    last_modified_by: Optional[str] = Field(None, description="最后修改人")
     department: Optional[str] = Field(None, description="所属部门")
     created_date: Optional[datetime] = Field(None, description="创建日期")
     last_modified: Optional[datetime] = Field(None, description="最后修改日期")
     keywords: List[str] = Field(default_factory=list, description="关键词")
+    knowledge_graph_status: Optional[str] = Field(None, description="知识图谱提取状态")
+    knowledge_graph_error: Optional[str] = Field(None, description="知识图谱提取错误信息")
+
+class StageTiming(BaseModel):
+    """文档处理阶段耗时记录"""
+    name: str = Field(..., description="阶段名称")
+    wall_time: float = Field(..., description="墙钟时间（秒）")
+    cpu_time: float = Field(..., description="CPU 时间（秒）")
+    peak_memory: Optional[int] = Field(None, description="Python 内存分配峰值（字节），未开启内存统计时为空")
 
 class Document(BaseModel):
     """文档模型"""
@@ -19,7 +38,23 @@ class Document(BaseModel):
     file_path: str = Field(..., description="文件路径")
     file_size: int = Field(..., description="文件大小（字节）")
     content_hash: str = Field(..., description="文件内容哈希值")
+    cleaning_fingerprint: Optional[str] = Field(None, description="生成清洗产物的清洗规则指纹")
     metadata: DocumentMetadata = Field(..., description="文档元数据")
     upload_time: datetime = Field(default_factory=datetime.now, description="上传时间")
     processed: bool = Field(default=False, description="是否已处理")
-    status: str = Field(default="pending", description="文档状态")
\ No newline at end of file
+    status: str = Field(default=DocumentStatus.PENDING.value, description="文档状态")
+    timings: List[StageTiming] = Field(default_factory=list, description="各处理阶段耗时")
+
+class UploadResult(BaseModel):
+    """批量上传中单个文档的处理结果"""
+    path: str = Field(..., description="文档路径")
+    document: Optional[Document] = Field(None, description="文档记录，处理失败时为空")
+    duplicate: bool = Field(default=False, description="是否为重复文件")
+    error_type: Optional[str] = Field(None, description="错误类型")
+    error: Optional[str] = Field(None, description="错误描述")
+    timestamp: datetime = Field(default_factory=datetime.now, description="处理完成时间")
+
+    @property
+    def success(self) -> bool:
+        """是否处理成功"""
+        return self.error is None
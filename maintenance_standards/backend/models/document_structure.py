@@ -1,6 +1,12 @@
-from typing import List, Dict, Optional
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
 from enum import Enum
-from pydantic import BaseModel, Field
+import numpy as np
+from pydantic import (
+    BaseModel, Field, PrivateAttr, computed_field, field_serializer,
+    model_serializer, model_validator
+)
 
 class ParagraphType(str, Enum):
     """段落类型枚举"""
@@ -22,11 +28,99 @@ class TableCell(BaseModel):
     colspan: int = Field(default=1, description="跨列数")
 
 class Table(BaseModel):
-    """表格"""
-    cells: List[TableCell] = Field(default_factory=list, description="单元格列表")
+    """表格
+    
+    单元格以列式数据保存：逻辑单元格列表 [行号, 列号, 文本, 跨行数, 跨列数] 和按需生成的
+    (行数, 列数) 文本网格。TableCell 对象只在访问 cells（或序列化）时才创建，
+    大表格通过 to_dataframe / iter_records 读取时无需创建逐个单元格的模型对象。
+    """
     num_rows: int = Field(..., description="行数")
     num_cols: int = Field(..., description="列数")
     caption: Optional[str] = Field(None, description="表格标题")
+    
+    # 逻辑单元格 [行号, 列号, 文本, 跨行数, 跨列数]；私有属性不使用 default_factory，
+    # pydantic 为每个实例初始化 default_factory 时都要检查工厂函数的签名，开销很大
+    _spans: Optional[List[List]] = PrivateAttr(default=None)
+    # 文本网格，合并区域的每个位置都是合并单元格的文本，未覆盖的位置为 None
+    _grid: Optional[np.ndarray] = PrivateAttr(default=None)
+    _cells: Optional[List[TableCell]] = PrivateAttr(default=None)
+    
+    @model_validator(mode="wrap")
+    @classmethod
+    def _validate_cells(cls, data: Any, handler) -> "Table":
+        """兼容以 cells（TableCell 列表）构造和反序列化"""
+        cells = None
+        if isinstance(data, dict) and "cells" in data:
+            data = dict(data)
+            cells = data.pop("cells")
+        table = handler(data)
+        if cells is not None:
+            table.cells = cells
+        return table
+    
+    @classmethod
+    def from_spans(cls, spans: List[List], num_rows: int, num_cols: int,
+                   caption: Optional[str] = None) -> "Table":
+        """由逻辑单元格 [行号, 列号, 文本, 跨行数, 跨列数] 构建表格，不创建 TableCell"""
+        table = cls(num_rows=num_rows, num_cols=num_cols, caption=caption)
+        table._spans = spans
+        return table
+    
+    @computed_field(description="单元格列表")
+    @property
+    def cells(self) -> List[TableCell]:
+        """单元格列表，首次访问时由逻辑单元格生成，第一行视为表头"""
+        if self._cells is None:
+            self._cells = [
+                TableCell(text=text, row=row, col=col, is_header=(row == 0),
+                          rowspan=rowspan, colspan=colspan)
+                for row, col, text, rowspan, colspan in self.spans
+            ]
+        return self._cells
+    
+    @cells.setter
+    def cells(self, cells: Sequence) -> None:
+        self._cells = [TableCell.model_validate(cell) for cell in cells]
+        self._spans = [[c.row, c.col, c.text, c.rowspan, c.colspan] for c in self._cells]
+        self._grid = None
+    
+    @property
+    def spans(self) -> List[List]:
+        """逻辑单元格 [行号, 列号, 文本, 跨行数, 跨列数]，每个合并单元格只出现一次"""
+        if self._spans is None:
+            self._spans = []
+        return self._spans
+    
+    def grid(self) -> np.ndarray:
+        """(行数, 列数) 的文本网格（object 数组），合并单元格的文本填满其合并区域"""
+        if self._grid is None:
+            grid = np.full((self.num_rows, self.num_cols), None, dtype=object)
+            for row, col, text, rowspan, colspan in self.spans:
+                grid[row:row + rowspan, col:col + colspan] = text
+            self._grid = grid
+        return self._grid
+    
+    def header(self) -> List[Optional[str]]:
+        """表头（第一行各列的文本）"""
+        grid = self.grid()
+        return list(grid[0]) if len(grid) else []
+    
+    def to_dataframe(self):
+        """转换为 pandas DataFrame，第一行作为列名，数据直接引用文本网格而不复制"""
+        import pandas as pd
+        return pd.DataFrame(self.grid()[1:], columns=self.header(), dtype=object, copy=False)
+    
+    def iter_records(self) -> Iterator[Dict[Optional[str], Optional[str]]]:
+        """逐行产生 {表头: 单元格文本} 字典（不含表头行），表头重复时后面的列覆盖前面的"""
+        header = self.header()
+        for row in self.grid()[1:]:
+            yield dict(zip(header, row))
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Table):
+            return NotImplemented
+        return (self.num_rows, self.num_cols, self.caption, self.spans) == (
+            other.num_rows, other.num_cols, other.caption, other.spans)
 
 class Image(BaseModel):
     """图片"""
@@ -40,25 +134,269 @@ class Paragraph(BaseModel):
     text: str = Field(..., description="段落文本")
     type: ParagraphType = Field(..., description="段落类型")
     level: int = Field(default=0, description="标题层级（仅对标题类型有效）")
-    index: int = Field(..., description="段落在文档中的索引")
+    index: int = Field(..., description="段落在文档中的索引；表格类型为表格在文档中的序号，"
+                                        "图片类型为图片所在段落的索引")
     style: Optional[str] = Field(None, description="段落样式名称")
     table: Optional[Table] = Field(None, description="表格数据（仅对表格类型有效）")
     image: Optional[Image] = Field(None, description="图片数据（仅对图片类型有效）")
 
+class _StoredParagraph(Paragraph):
+    """从 ParagraphStore 读取的段落
+    
+    每次访问都会重新创建，修改字段时同时写回段落序列中的对应位置，
+    与直接保存 Paragraph 列表时一样，之后再次访问可以得到修改后的内容。
+    """
+    _store: Optional["ParagraphStore"] = PrivateAttr(default=None)
+    _position: int = PrivateAttr(default=0)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._store is not None and name in Paragraph.model_fields:
+            self._store.set_field(self._position, name, value)
+        super().__setattr__(name, value)
+
+class ParagraphRecord(NamedTuple):
+    """解析器内部使用的轻量段落记录
+    
+    解析器产生的数据是可信的，内部只传递记录并直接写入 ParagraphStore，
+    只在对外提供段落时（iter_events、访问 DocumentStructure.paragraphs）才转换为 Paragraph。
+    """
+    text: str
+    type: ParagraphType
+    level: int
+    index: int
+    style: Optional[str] = None
+    table: Optional[Table] = None
+    image: Optional[Image] = None
+    
+    def to_paragraph(self) -> Paragraph:
+        # pydantic v2 的校验在 pydantic-core 中完成，比 model_construct 的 Python
+        # 实现更快（见 benchmarks/bench_model_construction.py），因此直接构造
+        return Paragraph(text=self.text, type=self.type, level=self.level, index=self.index,
+                         style=self.style, table=self.table, image=self.image)
+
+
+class ParagraphStore:
+    """按列保存的段落序列
+    
+    每个段落只保存文本、类型编码、层级、索引和样式名称（驻留字符串，同名样式
+    共用一个对象），表格和图片按位置稀疏保存，不为每个段落保留 pydantic 模型对象。
+    按位置访问时才创建 Paragraph，同一位置每次访问得到相等但不同的对象，
+    修改其字段会写回对应的列；不支持按位置替换段落。
+    """
+    
+    __slots__ = ("texts", "types", "levels", "indices", "styles", "tables", "images")
+    
+    def __init__(self, paragraphs: Iterable[Paragraph] = ()):
+        self.texts: List[str] = []
+        self.types = array("B")
+        self.levels = array("i")
+        self.indices = array("i")
+        self.styles: List[Optional[str]] = []
+        self.tables: Dict[int, Table] = {}
+        self.images: Dict[int, Image] = {}
+        self.extend(paragraphs)
+    
+    def append(self, paragraph: Paragraph) -> None:
+        self.append_record(ParagraphRecord(paragraph.text, paragraph.type, paragraph.level,
+                                           paragraph.index, paragraph.style, paragraph.table,
+                                           paragraph.image))
+    
+    def append_record(self, record: ParagraphRecord) -> None:
+        """追加解析器产生的段落记录，不创建 Paragraph"""
+        position = len(self.texts)
+        text, para_type, level, index, style, table, image = record
+        self.texts.append(text)
+        self.types.append(_PARAGRAPH_TYPE_CODES[para_type])
+        self.levels.append(level)
+        self.indices.append(index)
+        self.styles.append(sys.intern(style) if style is not None else None)
+        if table is not None:
+            self.tables[position] = table
+        if image is not None:
+            self.images[position] = image
+    
+    def extend(self, paragraphs: Iterable[Paragraph]) -> None:
+        for paragraph in paragraphs:
+            self.append(paragraph)
+    
+    def set_field(self, position: int, name: str, value: Any) -> None:
+        """修改指定位置段落的一个字段"""
+        if name == "text":
+            self.texts[position] = value
+        elif name == "type":
+            self.types[position] = _PARAGRAPH_TYPE_CODES[ParagraphType(value)]
+        elif name == "level":
+            self.levels[position] = value
+        elif name == "index":
+            self.indices[position] = value
+        elif name == "style":
+            self.styles[position] = sys.intern(value) if value is not None else None
+        else:
+            column = self.tables if name == "table" else self.images
+            if value is None:
+                column.pop(position, None)
+            else:
+                column[position] = value
+    
+    def type_at(self, position: int) -> ParagraphType:
+        """按位置获取段落类型，不创建 Paragraph"""
+        return _PARAGRAPH_TYPES[self.types[position]]
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __getitem__(self, position: Union[int, slice]) -> Union[Paragraph, Tuple[Paragraph, ...]]:
+        if isinstance(position, slice):
+            return tuple(self[i] for i in range(*position.indices(len(self))))
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("段落位置超出范围")
+        paragraph = _StoredParagraph(
+            text=self.texts[position],
+            type=_PARAGRAPH_TYPES[self.types[position]],
+            level=self.levels[position],
+            index=self.indices[position],
+            style=self.styles[position],
+            table=self.tables.get(position),
+            image=self.images.get(position)
+        )
+        paragraph._position = position
+        paragraph._store = self
+        return paragraph
+    
+    def __iter__(self) -> Iterator[Paragraph]:
+        for position in range(len(self)):
+            yield self[position]
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ParagraphStore):
+            return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"ParagraphStore({len(self)} paragraphs)"
+
+
+_PARAGRAPH_TYPES = list(ParagraphType)
+_PARAGRAPH_TYPE_CODES = {para_type: code for code, para_type in enumerate(_PARAGRAPH_TYPES)}
+
+
 class Section(BaseModel):
-    """文档章节"""
+    """文档章节
+    
+    解析得到的章节通过索引范围引用文档的段落序列，不单独保存段落：章节段落为
+    标题之后、第一个子章节（没有子章节时为 end_index）之前的段落，不含 Title
+    样式的文档标题。序列化时也只保存索引范围，paragraphs 为元组，不能增删段落，
+    修改其中段落的字段会写回文档的段落序列。单独构造的章节（例如
+    DocumentParser.iter_sections 产生的）在 paragraphs 中保存自己的段落列表，可以修改。
+    """
     title: Optional[Paragraph] = Field(None, description="章节标题")
     level: int = Field(..., description="章节层级")
-    paragraphs: List[Paragraph] = Field(default_factory=list, description="章节段落")
     subsections: List["Section"] = Field(default_factory=list, description="子章节")
     start_index: int = Field(..., description="章节开始索引")
     end_index: int = Field(..., description="章节结束索引")
+    
+    _store: Optional[ParagraphStore] = PrivateAttr(default=None)
+    _paragraphs: Optional[List[Paragraph]] = PrivateAttr(default=None)
+    
+    @model_validator(mode="wrap")
+    @classmethod
+    def _validate_paragraphs(cls, data: Any, handler) -> "Section":
+        """兼容以 paragraphs 构造和反序列化"""
+        paragraphs = None
+        if isinstance(data, dict) and "paragraphs" in data:
+            data = dict(data)
+            paragraphs = data.pop("paragraphs")
+        section = handler(data)
+        if paragraphs is not None:
+            section.paragraphs = paragraphs
+        return section
+    
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler) -> Dict[str, Any]:
+        data = handler(self)
+        # 引用文档段落序列的章节只序列化索引范围
+        if self._store is not None:
+            data.pop("paragraphs", None)
+        return data
+    
+    @computed_field(description="章节段落")
+    @property
+    def paragraphs(self) -> Sequence[Paragraph]:
+        if self._store is None:
+            if self._paragraphs is None:
+                self._paragraphs = []
+            return self._paragraphs
+        end = self.subsections[0].start_index if self.subsections else self.end_index + 1
+        store = self._store
+        return tuple(
+            store[position] for position in range(self.start_index + 1, end)
+            if not (store.type_at(position) == ParagraphType.TITLE and store.styles[position] == 'Title')
+        )
+    
+    @paragraphs.setter
+    def paragraphs(self, paragraphs: Iterable) -> None:
+        self._paragraphs = [Paragraph.model_validate(paragraph) for paragraph in paragraphs]
+        self._store = None
+    
+    def link(self, store: ParagraphStore) -> None:
+        """让章节及其子章节通过索引范围引用文档的段落序列"""
+        if self._paragraphs is None:
+            self._store = store
+        for subsection in self.subsections:
+            subsection.link(store)
 
 class DocumentStructure(BaseModel):
-    """文档结构"""
+    """文档结构
+    
+    段落以按列保存的 ParagraphStore 保存，章节通过索引范围引用其中的段落。
+    """
     title: Optional[str] = Field(None, description="文档标题")
     sections: List[Section] = Field(default_factory=list, description="文档章节")
-    paragraphs: List[Paragraph] = Field(default_factory=list, description="所有段落")
     tables: List[Table] = Field(default_factory=list, description="所有表格")
     images: List[Image] = Field(default_factory=list, description="所有图片")
-    metadata: Dict = Field(default_factory=dict, description="文档元数据")
\ No newline at end of file
+    metadata: Dict = Field(default_factory=dict, description="文档元数据")
+    
+    _paragraphs: Optional[ParagraphStore] = PrivateAttr(default=None)
+    
+    @model_validator(mode="wrap")
+    @classmethod
+    def _validate_paragraphs(cls, data: Any, handler) -> "DocumentStructure":
+        """兼容以 paragraphs 构造和反序列化，之后把章节关联到段落序列"""
+        paragraphs = None
+        if isinstance(data, dict) and "paragraphs" in data:
+            data = dict(data)
+            paragraphs = data.pop("paragraphs")
+        structure = handler(data)
+        if paragraphs is not None:
+            structure.paragraphs = paragraphs
+        structure.link_sections()
+        return structure
+    
+    @computed_field(description="所有段落")
+    @property
+    def paragraphs(self) -> Sequence[Paragraph]:
+        """全部段落（ParagraphStore），按位置访问时才创建 Paragraph"""
+        if self._paragraphs is None:
+            self._paragraphs = ParagraphStore()
+        return self._paragraphs
+    
+    @field_serializer("paragraphs")
+    def _serialize_paragraphs(self, paragraphs: ParagraphStore) -> List[Paragraph]:
+        return list(paragraphs)
+    
+    @paragraphs.setter
+    def paragraphs(self, paragraphs: Iterable) -> None:
+        self._paragraphs = ParagraphStore(
+            paragraph if isinstance(paragraph, Paragraph) else Paragraph.model_validate(paragraph)
+            for paragraph in paragraphs
+        )
+        self.link_sections()
+    
+    def link_sections(self) -> None:
+        """让全部章节通过索引范围引用段落序列"""
+        for section in self.sections:
+            section.link(self.paragraphs)
@@ -0,0 +1,171 @@
+"""
+流水线性能统计模块
+主要功能：记录文档处理各阶段的墙钟时间、CPU 时间和内存峰值，并按阶段汇总为直方图
+"""
+import bisect
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from loguru import logger
+
+from ..config import settings
+from ..models.document import StageTiming
+
+class PipelineProfiler:
+    """单个文档的阶段计时器
+
+    用法：
+        profiler = PipelineProfiler()
+        with profiler.stage("validate"):
+            ...
+        timings = profiler.finish()
+
+    墙钟时间和 CPU 时间总是记录；内存峰值需要开启内存统计（PROFILE_MEMORY，默认关闭），
+    开启后使用 tracemalloc 记录每个阶段的 Python 内存分配峰值。内存统计默认关闭是因为
+    tracemalloc 会跟踪每一次内存分配，使整个流水线明显变慢；而且它是进程级的，
+    并发处理多个文档时各阶段的峰值会相互叠加，只适合在排查内存问题时临时开启。
+    """
+
+    def __init__(self, track_memory: Optional[bool] = None,
+                 timings: Optional[Iterable[StageTiming]] = None):
+        self.track_memory = settings.PROFILE_MEMORY if track_memory is None else track_memory
+        self.timings: List[StageTiming] = list(timings or [])
+        self._inherited_wall = sum(t.wall_time for t in self.timings)
+        self._inherited_cpu = sum(t.cpu_time for t in self.timings)
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """记录一个阶段的耗时，阶段抛出异常时同样记录"""
+        started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base_memory = tracemalloc.get_traced_memory()[0]
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            peak_memory = None
+            if self.track_memory:
+                peak_memory = max(tracemalloc.get_traced_memory()[1] - base_memory, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.timings.append(StageTiming(
+                name=name,
+                wall_time=time.perf_counter() - start_wall,
+                cpu_time=time.process_time() - start_cpu,
+                peak_memory=peak_memory
+            ))
+
+    def finish(self) -> List[StageTiming]:
+        """追加整个文档的总耗时记录并返回全部阶段记录
+
+        总耗时包括构造时传入的、在其他进程中已记录的阶段耗时
+        """
+        self.timings.append(StageTiming(
+            name="total",
+            wall_time=self._inherited_wall + time.perf_counter() - self._start_wall,
+            cpu_time=self._inherited_cpu + time.process_time() - self._start_cpu
+        ))
+        return self.timings
+
+
+class StageHistogram:
+    """单个阶段某项指标的直方图"""
+
+    # 耗时的桶上界（秒），最后一个桶收集所有更慢的记录
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, float("inf"))
+    # 内存峰值的桶上界（字节）
+    MEMORY_BUCKETS = tuple(2 ** shift for shift in range(20, 34, 2)) + (float("inf"),)
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估算分位数"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class PipelineMetrics:
+    """按阶段汇总所有文档的墙钟时间、CPU 时间和内存峰值直方图（线程安全）
+
+    内存峰值只汇总开启了内存统计的记录，没有记录时快照中不包含该指标。
+    """
+
+    # 汇总的指标及其直方图桶
+    METRICS = {
+        "wall_time": StageHistogram.BUCKETS,
+        "cpu_time": StageHistogram.BUCKETS,
+        "peak_memory": StageHistogram.MEMORY_BUCKETS,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[str, StageHistogram]] = {}
+
+    def observe(self, timings: Iterable[StageTiming]) -> None:
+        """记录一个文档的全部阶段耗时和内存峰值"""
+        with self._lock:
+            for timing in timings:
+                histograms = self._histograms.setdefault(timing.name, {})
+                for metric, buckets in self.METRICS.items():
+                    value = getattr(timing, metric)
+                    if value is not None:
+                        histograms.setdefault(metric, StageHistogram(buckets)).observe(value)
+                if timing.name == "total" and timing.wall_time > settings.DOCUMENT_TIME_BUDGET:
+                    logger.warning(
+                        f"文档处理耗时 {timing.wall_time:.1f}s 超过目标 {settings.DOCUMENT_TIME_BUDGET}s"
+                    )
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """获取各阶段直方图的当前快照：{阶段: {指标: 直方图}}"""
+        with self._lock:
+            return {
+                name: {metric: histogram.snapshot() for metric, histogram in histograms.items()}
+                for name, histograms in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+# 全局流水线统计实例
+pipeline_metrics = PipelineMetrics()
@@ -0,0 +1,59 @@
+"""
+知识提取内容检查性能基准
+对比 python-docx 遍历与 iterparse 流式扫描的耗时和内存峰值
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_content_scan [段落数]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from docx import Document as DocxDocument
+
+from backend.core.document_manager.validator import DocumentValidator
+
+def build_document(path: Path, num_paragraphs: int) -> None:
+    """生成必需部分位于文档开头、随后是大量正文的测试文档"""
+    doc = DocxDocument()
+    for title, line in [("步骤", "拆下放油螺栓"), ("工具", "17mm扳手"),
+                        ("安全", "佩戴防护手套"), ("注意", "热机油可能导致烫伤")]:
+        doc.add_paragraph(title)
+        doc.add_paragraph(line)
+    for i in range(num_paragraphs):
+        doc.add_paragraph(f"第{i}条：检查紧固件扭矩，记录检查结果。")
+    doc.save(path)
+
+def measure(func):
+    """返回耗时（毫秒）和 Python 内存分配峰值（MB）"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result
+    return elapsed, peak / (1024 * 1024)
+
+def main():
+    num_paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    validator = DocumentValidator()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "bench.docx"
+        build_document(path, num_paragraphs)
+
+        docx_ms, docx_mb = measure(
+            lambda: validator.validate_content_for_extraction(DocxDocument(str(path)))
+        )
+        stream_ms, stream_mb = measure(
+            lambda: validator.validate_content_for_extraction(str(path))
+        )
+
+    print(f"段落数: {num_paragraphs}")
+    print(f"python-docx 遍历: {docx_ms:.1f} ms, 内存峰值 {docx_mb:.1f}MB")
+    print(f"流式扫描:         {stream_ms:.1f} ms, 内存峰值 {stream_mb:.1f}MB")
+
+if __name__ == "__main__":
+    main()
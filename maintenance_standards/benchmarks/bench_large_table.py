@@ -0,0 +1,47 @@
+"""
+大表格解析性能基准
+测量带有纵向合并单元格的长表格（检查周期表）的解析耗时，行数加倍时耗时应大致加倍
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_large_table [行数]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from docx import Document as DocxDocument
+from docx.oxml.ns import qn
+from docx.oxml.parser import OxmlElement
+from docx.table import _Cell
+
+from backend.core.document_manager.parser import DocumentParser
+
+def build_document(path: Path, num_rows: int) -> None:
+    """第一列每 10 行纵向合并一次，其余各列为普通单元格"""
+    doc = DocxDocument()
+    table = doc.add_table(rows=num_rows, cols=5)
+    for i, row in enumerate(table.rows):
+        tcs = row._tr.tc_lst
+        v_merge = OxmlElement("w:vMerge")
+        if i % 10 == 0:
+            v_merge.set(qn("w:val"), "restart")
+            _Cell(tcs[0], table).text = f"系统{i // 10}"
+        tcs[0].get_or_add_tcPr().append(v_merge)
+        for j, tc in enumerate(tcs[1:], 1):
+            _Cell(tc, table).text = f"项目{i}-{j}"
+    doc.save(str(path))
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    parser = DocumentParser()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in (num_rows, num_rows * 2):
+            path = Path(tmp_dir) / f"table_{rows}.docx"
+            build_document(path, rows)
+            start = time.perf_counter()
+            table = parser.parse_document(str(path)).tables[0]
+            seconds = time.perf_counter() - start
+            print(f"行数: {table.num_rows}, 单元格数: {len(table.spans)}, 解析耗时: {seconds:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+文档结构模型构造性能基准
+比较完整校验构造、model_construct 和解析器内部使用的 ParagraphRecord 的单个段落构造耗时，
+以及整篇文档构建文档结构时平均每个段落的耗时（取多次运行的最小值）
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_model_construction [章节数]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from backend.core.document_manager.parser import DocumentParser
+from backend.models.document_structure import Paragraph, ParagraphRecord, ParagraphType, TableCell
+from benchmarks.bench_parsing import build_document
+
+def per_call(func, count: int = 100000) -> float:
+    """单次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count * 1e6
+
+def main():
+    num_chapters = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    paragraph = dict(text="检查紧固件扭矩，记录检查结果。", type=ParagraphType.CONTENT,
+                     level=0, index=1, style="Normal")
+    cell = dict(text="45N·m", row=1, col=2, is_header=False, rowspan=1, colspan=1)
+    print(f"Paragraph 校验构造: {per_call(lambda: Paragraph(**paragraph)):.2f} us, "
+          f"model_construct: {per_call(lambda: Paragraph.model_construct(**paragraph)):.2f} us")
+    print(f"ParagraphRecord: {per_call(lambda: ParagraphRecord(**paragraph)):.2f} us")
+    print(f"TableCell 校验构造: {per_call(lambda: TableCell(**cell)):.2f} us, "
+          f"model_construct: {per_call(lambda: TableCell.model_construct(**cell)):.2f} us")
+
+    parser = DocumentParser()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "manual.docx"
+        build_document(path, num_chapters)
+        # 正文块预先读取，只统计由正文块构建文档结构的耗时
+        content = parser._load_content(str(path))
+
+    seconds = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        structure = parser.parse_document(content)
+        cells = sum(len(table.cells) for table in structure.tables)
+        seconds = min(seconds, time.perf_counter() - start)
+    print(f"段落数: {len(structure.paragraphs)}, 单元格数: {cells}, "
+          f"构建文档结构（含单元格）: {seconds:.2f} s, "
+          f"平均每段落 {seconds / len(structure.paragraphs) * 1e6:.1f} us")
+
+if __name__ == "__main__":
+    main()
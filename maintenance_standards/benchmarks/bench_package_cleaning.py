@@ -0,0 +1,66 @@
+"""
+文档清洗与保存性能基准
+对比 python-docx 清洗后整体保存与 XML 层清洗（其余部件原样复制）的耗时，
+测试文档包含大量图片
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_package_cleaning [图片数] [段落数]
+"""
+import io
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from docx import Document as DocxDocument
+
+from backend.core.document_manager.cleaner import DocumentCleaner
+
+def png_image(size: int) -> bytes:
+    """生成带有随机数据块、约 size 字节的 PNG 图片（只需文件头可被识别）"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", 640, 480, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", os.urandom(size)) + chunk(b"IEND", b""))
+
+def build_document(path: Path, num_images: int, num_paragraphs: int) -> None:
+    """生成段落之间均匀插入图片的测试文档"""
+    doc = DocxDocument()
+    interval = max(num_paragraphs // max(num_images, 1), 1)
+    images = 0
+    for i in range(num_paragraphs):
+        doc.add_paragraph(f"第{i}条：检查紧固件扭矩，，记录检查结果。")
+        if i % interval == 0 and images < num_images:
+            doc.add_picture(io.BytesIO(png_image(512 * 1024)))
+            images += 1
+    doc.save(str(path))
+
+def main():
+    num_images = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    num_paragraphs = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    cleaner = DocumentCleaner()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir) / "manual.docx"
+        build_document(source, num_images, num_paragraphs)
+
+        start = time.perf_counter()
+        doc, _ = cleaner.clean_document(str(source))
+        doc.save(str(Path(tmp_dir) / "cleaned_docx.docx"))
+        docx_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaner.clean_package(source, Path(tmp_dir) / "cleaned_xml.docx")
+        xml_seconds = time.perf_counter() - start
+
+        size_mb = source.stat().st_size / (1024 * 1024)
+
+    print(f"图片数: {num_images}, 段落数: {num_paragraphs}, 文件大小: {size_mb:.1f}MB")
+    print(f"python-docx 清洗并保存: {docx_seconds:.2f} s")
+    print(f"XML 层清洗:             {xml_seconds:.2f} s ({docx_seconds / xml_seconds:.1f}x)")
+
+if __name__ == "__main__":
+    main()
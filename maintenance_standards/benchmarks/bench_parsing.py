@@ -0,0 +1,64 @@
+"""
+文档解析性能基准
+测量大型维修手册（大量段落、表格和图片）的解析耗时
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_parsing [章节数]
+"""
+import io
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from docx import Document as DocxDocument
+
+from backend.core.document_manager.parser import DocumentParser
+
+def tiny_png() -> bytes:
+    """生成 1x1 像素的 PNG 图片"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"\x00\xff\x00\x00")) + chunk(b"IEND", b""))
+
+def build_document(path: Path, num_chapters: int) -> None:
+    """每章包含标题、小节、正文、列表、带标题的表格和图片"""
+    doc = DocxDocument()
+    image = tiny_png()
+    for chapter in range(1, num_chapters + 1):
+        doc.add_heading(f"第{chapter}章 系统检修", 1)
+        for section in range(1, 4):
+            doc.add_heading(f"{chapter}.{section} 检查项目", 2)
+            for i in range(10):
+                doc.add_paragraph(f"第{i}条：检查紧固件扭矩，记录检查结果。")
+            doc.add_paragraph("● 佩戴防护手套")
+            doc.add_paragraph(f"表{chapter}-{section} 扭矩要求", style="Caption")
+            table = doc.add_table(rows=6, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = "45N·m"
+        doc.add_picture(io.BytesIO(image))
+        doc.add_paragraph(f"图{chapter}-1 结构示意图", style="Caption")
+    doc.save(str(path))
+
+def main():
+    num_chapters = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    parser = DocumentParser()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "manual.docx"
+        build_document(path, num_chapters)
+        doc = DocxDocument(str(path))
+
+        start = time.perf_counter()
+        structure = parser.parse_document(doc)
+        seconds = time.perf_counter() - start
+
+    print(f"章节数: {num_chapters}, 段落数: {len(structure.paragraphs)}, "
+          f"表格数: {len(structure.tables)}, 图片数: {len(structure.images)}")
+    print(f"解析耗时: {seconds:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+文档注册表查询性能基准
+写入指定数量的文档记录后，测量列表、筛选、搜索和统计查询的耗时
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_registry [文档数]
+"""
+import hashlib
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from backend.core.document_manager.registry import DocumentRegistry
+from backend.models.document import Document, DocumentMetadata, DocumentStatus
+
+SYSTEMS = ["发动机", "液压系统", "冷却系统", "电气系统", "传动系统", "制动系统"]
+ACTIONS = ["维修标准", "检修规程", "保养手册", "故障排查指南"]
+
+def build_rows(num_documents: int):
+    """生成文档注册表行数据"""
+    rng = random.Random(0)
+    statuses = [s.value for s in DocumentStatus]
+    start = datetime(2020, 1, 1)
+    for i in range(num_documents):
+        title = f"{rng.choice(SYSTEMS)}{rng.choice(ACTIONS)}-{i:06d}"
+        content_hash = hashlib.sha256(str(i).encode()).hexdigest()
+        document = Document(
+            id=content_hash[:32],
+            filename=f"{title}.docx",
+            file_path=f"objects/{content_hash[:2]}/{content_hash}/cleaned.json.gz",
+            file_size=rng.randint(10_000, 10_000_000),
+            content_hash=content_hash,
+            metadata=DocumentMetadata(title=title, version="1.0"),
+            upload_time=start + timedelta(minutes=i),
+            status=rng.choice(statuses)
+        )
+        yield document
+
+def measure(name: str, func, repeat: int = 20) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) * 1000 / repeat
+    print(f"{name:<24} {elapsed:8.2f} ms  ({len(result) if hasattr(result, '__len__') else result})")
+
+def main():
+    num_documents = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        registry = DocumentRegistry(Path(tmp_dir) / "registry.db")
+
+        start = time.perf_counter()
+        with sqlite3.connect(registry.db_path) as conn:
+            conn.executemany(
+                """
+                INSERT INTO documents (id, filename, title, file_path, file_size, content_hash,
+                                       status, upload_time, updated_time, data,
+                                       author, version, revision, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (registry._to_row(document) for document in build_rows(num_documents))
+            )
+        print(f"写入 {num_documents} 条记录: {time.perf_counter() - start:.1f} s")
+
+        measure("列表（最新 50 条）", lambda: registry.list_documents())
+        measure("状态筛选", lambda: registry.list_documents(status="error"))
+        measure("翻页（offset 5000）", lambda: registry.list_documents(offset=5000))
+        measure("全文搜索", lambda: registry.search("液压系统检修"))
+        measure("短关键词搜索", lambda: registry.search("发动"))
+        measure("按哈希查找", lambda: [registry.get_by_hash(hashlib.sha256(b"4242").hexdigest())])
+        measure("统计", lambda: registry.statistics()["by_status"])
+
+if __name__ == "__main__":
+    main()
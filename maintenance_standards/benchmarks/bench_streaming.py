@@ -0,0 +1,45 @@
+"""
+流式解析内存基准
+比较 parse_document（完整文档树和文档结构）与 iter_sections（iterparse 流式解析、
+逐章节处理）的耗时和 Python 内存分配峰值
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_streaming [章节数]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from backend.core.document_manager.parser import DocumentParser
+from benchmarks.bench_parsing import build_document
+
+def measure(func):
+    """返回 (结果, 耗时秒数, 内存峰值字节数)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+def main():
+    num_chapters = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parser = DocumentParser()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "manual.docx"
+        build_document(path, num_chapters)
+
+        structure, full_seconds, full_peak = measure(lambda: parser.parse_document(str(path)))
+        # 逐章节处理，只统计事件数，不保留章节
+        count, stream_seconds, stream_peak = measure(
+            lambda: sum(len(s.paragraphs) + 1 for s in parser.iter_sections(str(path))))
+
+    print(f"章节数: {num_chapters}, 段落数: {len(structure.paragraphs)} / {count}")
+    print(f"parse_document: {full_seconds:.2f} s, 内存峰值 {full_peak / 2**20:.1f} MiB")
+    print(f"iter_sections:  {stream_seconds:.2f} s, 内存峰值 {stream_peak / 2**20:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
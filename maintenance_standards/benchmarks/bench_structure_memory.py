@@ -0,0 +1,38 @@
+"""
+文档结构内存基准
+使用 tracemalloc 测量解析结果（DocumentStructure）常驻的 Python 内存及其 JSON 序列化大小
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_structure_memory [章节数]
+"""
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from backend.core.document_manager.parser import DocumentParser
+from benchmarks.bench_parsing import build_document
+
+def main():
+    num_chapters = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parser = DocumentParser()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "manual.docx"
+        build_document(path, num_chapters)
+        # 正文块预先读取，只统计文档结构本身
+        content = parser._load_content(str(path))
+
+    gc.collect()
+    tracemalloc.start()
+    structure = parser.parse_document(content)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"章节数: {num_chapters}, 段落数: {len(structure.paragraphs)}")
+    print(f"常驻内存: {retained / 2**20:.1f} MiB, 峰值: {peak / 2**20:.1f} MiB")
+    print(f"JSON 大小: {len(structure.model_dump_json()) / 2**20:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+文本清洗性能基准
+对比逐条执行规则的旧实现与编译后的单次规范化（clean_text / clean_texts）的耗时，
+以及大量自定义正则规则合并执行与逐条执行的耗时
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_text_cleaning [段落数] [自定义规则数]
+"""
+import random
+import re
+import sys
+import time
+
+from backend.core.document_manager.cleaner import DocumentCleaner
+from backend.core.document_manager.cleaning_rules import PUNCTUATION_MAP, CleaningRule
+
+SAMPLES = [
+    "拆下放油螺栓，放出机油。。注意：热机油可能导致烫伤！！",
+    "  检查  紧固件扭矩（见表3）；记录检查结果  ",
+    "使用17mm扳手,按对角顺序拧紧;扭矩:45N·m",
+    "【警告】操作前必须断开电源，并悬挂“禁止合闸”标识牌？",
+    "第3.2节 液压系统检修规程《GB/T 3766》",
+]
+
+def legacy_clean_text(text: str) -> str:
+    """旧实现：每次调用重新查找正则，标点映射逐个替换"""
+    if not text:
+        return text
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    for old, new in PUNCTUATION_MAP.items():
+        text = text.replace(old, new)
+    text = re.sub(r'([,.!?;])\1+', r'\1', text)
+    text = re.sub(r'([,.!?;:])([^\s])', r'\1 \2', text)
+    return text
+
+def build_corpus(num_paragraphs: int) -> list:
+    """按样例段落生成带编号的测试语料"""
+    rng = random.Random(0)
+    return [f"{rng.choice(SAMPLES)}（{i}）" for i in range(num_paragraphs)]
+
+def measure(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def abbreviation_rules(num_rules: int) -> list:
+    """生成缩写展开规则，模拟厂内自定义的缩写表"""
+    return [CleaningRule.regex(f"abbr_{i}", f"ABR{i:03d}", f"缩写{i}") for i in range(num_rules)]
+
+def main():
+    num_paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_rules = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    corpus = build_corpus(num_paragraphs)
+    cleaner = DocumentCleaner()
+
+    assert cleaner.clean_texts(corpus[:1000]) == [legacy_clean_text(t) for t in corpus[:1000]]
+
+    legacy = measure(lambda: [legacy_clean_text(t) for t in corpus])
+    single = measure(lambda: [cleaner.clean_text(t) for t in corpus])
+    batch = measure(lambda: cleaner.clean_texts(corpus))
+
+    print(f"段落数: {num_paragraphs}")
+    print(f"逐条规则:           {legacy:.2f} s")
+    print(f"clean_text 逐段:    {single:.2f} s ({legacy / single:.1f}x)")
+    print(f"clean_texts 批量:   {batch:.2f} s ({legacy / batch:.1f}x)")
+
+    rules = abbreviation_rules(num_rules)
+    for rule in rules:
+        cleaner.register_rule(rule)
+    patterns = [(re.compile(rule.pattern), rule.replacement) for rule in rules]
+
+    def sequential_rules():
+        texts = cleaner.clean_texts(corpus)
+        for pattern, replacement in patterns:
+            texts = [pattern.sub(replacement, text) for text in texts]
+        return texts
+
+    sequential = measure(sequential_rules)
+    fused = measure(lambda: cleaner.clean_texts(corpus))
+    print(f"自定义规则数: {num_rules}")
+    print(f"逐条执行:           {sequential:.2f} s")
+    print(f"合并执行:           {fused:.2f} s ({sequential / fused:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+文档验证性能基准
+对比旧的临时文件验证方式与基于内存缓冲区的验证方式
+
+用法（在 maintenance_standards 目录下）：
+    python -m benchmarks.bench_validation [段落数] [重复次数]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from docx import Document as DocxDocument
+
+from backend.core.document_manager.validator import DocumentValidator
+
+def build_document(num_paragraphs: int) -> bytes:
+    """生成指定段落数的测试文档"""
+    doc = DocxDocument()
+    for i in range(num_paragraphs):
+        doc.add_paragraph(f"第{i}步：使用17mm扳手拆下放油螺栓，注意安全。")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def legacy_validate(file_content: bytes) -> None:
+    """旧实现：格式验证和内容验证各写一次临时文件并重新加载"""
+    for _ in range(2):
+        with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp_file:
+            tmp_file.write(file_content)
+            tmp_file.flush()
+            doc = DocxDocument(tmp_file.name)
+        os.unlink(tmp_file.name)
+        _ = len(doc.paragraphs)
+
+def measure(func, repeat: int) -> float:
+    """返回平均每次调用耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+def main():
+    num_paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    content = build_document(num_paragraphs)
+    validator = DocumentValidator()
+
+    legacy_ms = measure(lambda: legacy_validate(content), repeat)
+    memory_ms = measure(lambda: validator.validate_file("bench.docx", content), repeat)
+
+    print(f"文档大小: {len(content) / 1024:.1f}KB, 段落数: {num_paragraphs}")
+    print(f"临时文件验证: {legacy_ms:.2f} ms/次")
+    print(f"内存验证:     {memory_ms:.2f} ms/次 ({legacy_ms / memory_ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -25,11 +25,11 @@ def handle_document_upload(file):
         if file is None:
             return "请选择要上传的文件"
             
-        filename = file.name
-        content = file.read()
+        # 直接传入文件路径，由上传器分块复制，不把整个文件读入内存
+        file_path = Path(getattr(file, "name", file))
         
         uploader = DocumentUploader()
-        document = uploader.upload(content, filename)
+        document = uploader.upload(file_path, file_path.name)
         
         return f"文档上传成功！\n保存路径：{document.file_path}\n文档ID：{document.id}"
         
@@ -0,0 +1,77 @@
+"""
+测试共用的夹具
+"""
+import io
+import struct
+import zlib
+from pathlib import Path
+import pytest
+from docx import Document
+
+from backend.core.document_manager.registry import DocumentRegistry
+from backend.core.document_manager.store import DocumentStore
+from backend.core.document_manager.uploader import DocumentUploader
+from tests.test_document_parsing import create_test_doc_with_structure
+from tests.test_document_parsing_cases import create_doc_with_complex_tables
+
+def tiny_png() -> bytes:
+    """生成 1x1 像素的 PNG 图片"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"\x00\xff\x00\x00")) + chunk(b"IEND", b""))
+
+def create_doc_with_images(path: str):
+    """创建包含图片及图片标题的测试文档"""
+    doc = Document()
+    doc.add_heading("第一章 结构", 1)
+    doc.add_paragraph("图1-1 总体布局")
+    doc.add_picture(io.BytesIO(tiny_png()))
+    doc.add_picture(io.BytesIO(tiny_png()))
+    doc.save(path)
+
+def create_maintenance_doc_bytes() -> bytes:
+    """创建包含维修步骤、工具和安全事项的测试文档"""
+    doc = Document()
+    doc.add_heading("发动机机油更换", 1)
+    doc.add_paragraph("步骤")
+    doc.add_paragraph("拆下放油螺栓，，放出机油。")
+    doc.add_paragraph("")
+    doc.add_paragraph("工具")
+    doc.add_paragraph("17mm扳手")
+    doc.add_paragraph("安全")
+    doc.add_paragraph("佩戴防护手套")
+    doc.add_paragraph("注意")
+    doc.add_paragraph("热机油可能导致烫伤")
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+@pytest.fixture
+def uploader(tmp_path) -> DocumentUploader:
+    """使用临时目录中的存储和文档注册表的上传器"""
+    uploader = DocumentUploader()
+    uploader.store = DocumentStore(tmp_path / "store")
+    uploader.registry = DocumentRegistry(tmp_path / "registry.db")
+    return uploader
+
+@pytest.fixture
+def png_bytes() -> bytes:
+    """1x1 像素的 PNG 图片"""
+    return tiny_png()
+
+@pytest.fixture
+def maintenance_doc_bytes() -> bytes:
+    """包含维修步骤、工具和安全事项的测试文档"""
+    return create_maintenance_doc_bytes()
+
+@pytest.fixture(params=[
+    create_test_doc_with_structure, create_doc_with_complex_tables, create_doc_with_images
+], ids=["structure", "complex_tables", "images"])
+def sample_docx(request, tmp_path) -> Path:
+    """依次包含结构化内容、复杂表格和图片的测试文档"""
+    path = tmp_path / "manual.docx"
+    request.param(str(path))
+    return path
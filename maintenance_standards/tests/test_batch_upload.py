@@ -0,0 +1,33 @@
+import pytest
+from docx import Document
+
+def write_doc(path, text: str) -> None:
+    """写入只包含一个段落的测试文档"""
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(str(path))
+
+def test_upload_many_isolates_failures(tmp_path, uploader):
+    """测试批量上传时单个文档失败不影响其他文档"""
+    folder = tmp_path / "manuals"
+    (folder / "sub").mkdir(parents=True)
+    write_doc(folder / "a.docx", "发动机维修标准")
+    write_doc(folder / "sub" / "b.docx", "液压系统检修规程")
+    (folder / "broken.docx").write_bytes(b"not a docx file")
+    (folder / "copy.docx").write_bytes((folder / "a.docx").read_bytes())
+
+    results = list(uploader.upload_many([folder], max_workers=2))
+
+    assert len(results) == 4
+    by_name = {r.path.rsplit("/", 1)[-1]: r for r in results}
+    assert not by_name["broken.docx"].success
+    assert "文件格式无效" in by_name["broken.docx"].error
+    assert by_name["b.docx"].success
+    assert sum(r.duplicate for r in results) == 1
+
+    stored = uploader.registry.list_documents()
+    assert {d.filename for d in stored} <= {"a.docx", "copy.docx", "b.docx"}
+    assert len(stored) == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
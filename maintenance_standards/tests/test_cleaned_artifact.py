@@ -0,0 +1,55 @@
+import gzip
+import json
+import pytest
+
+from backend.core.document_manager.artifact import CleanedDocument
+from backend.core.document_manager.cleaner import DocumentCleaner
+from backend.core.document_manager.parser import DocumentParser
+from backend.core.document_manager.store import DocumentStore
+from backend.core.document_manager.validator import DocumentValidator
+from backend.utils.error_handler import DocumentError
+
+def test_artifact_parses_like_cleaned_docx(tmp_path, sample_docx):
+    """测试从清洗产物解析的结构与从清洗后的 .docx 解析的一致"""
+    source = sample_docx
+    cleaner = DocumentCleaner()
+
+    cleaned_docx = tmp_path / "cleaned.docx"
+    docx_stats = cleaner.clean_package(source, cleaned_docx)
+    cleaned, stats = cleaner.clean_artifact(source)
+    assert stats == docx_stats
+
+    parser = DocumentParser()
+    expected = parser.parse_document(str(cleaned_docx))
+    restored = CleanedDocument.from_bytes(cleaned.to_bytes())
+    assert parser.parse_document(restored).model_dump() == expected.model_dump()
+    assert expected.tables or expected.images
+
+def test_artifact_rejects_other_versions():
+    """测试格式版本不一致的清洗产物无法读取"""
+    data = gzip.compress(json.dumps({"version": 0, "blocks": []}).encode("utf-8"))
+    with pytest.raises(DocumentError, match="版本"):
+        CleanedDocument.from_bytes(data)
+    with pytest.raises(DocumentError):
+        CleanedDocument.from_bytes(b"not gzip")
+
+def test_upload_stores_artifact_and_renders_docx_on_demand(uploader, maintenance_doc_bytes):
+    """测试上传只保存清洗产物，清洗后的 .docx 按需生成"""
+    document = uploader.upload(maintenance_doc_bytes, "manual.docx")
+
+    assert document.file_path.endswith(DocumentStore.ARTIFACT_NAME)
+    cleaned_docx = uploader.store.path_for(document.content_hash, DocumentStore.CLEANED_NAME)
+    assert not cleaned_docx.exists()
+
+    # 知识抽取前的内容检查和解析直接读取清洗产物
+    assert DocumentValidator().validate_content_for_extraction(document.file_path)
+    structure = DocumentParser().parse_document(document.file_path)
+    assert DocumentCleaner().clean_text("拆下放油螺栓，，放出机油。") in [p.text for p in structure.paragraphs]
+
+    path = uploader.render_cleaned_document(document)
+    assert path == str(cleaned_docx)
+    rendered = DocumentParser().parse_document(path)
+    assert rendered.model_dump() == structure.model_dump()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,116 @@
+import os
+import pytest
+
+from backend.core.document_manager.cleaner import DocumentCleaner
+from backend.core.document_manager.cleaning_rules import CleaningRule
+from backend.core.document_manager.store import CleaningCache, DocumentStore
+
+def test_cleaner_fingerprint_follows_rules():
+    """测试规则开关、自定义规则及其版本变化时指纹随之变化"""
+    cleaner = DocumentCleaner()
+    base = cleaner.fingerprint()
+    assert DocumentCleaner().fingerprint() == base
+
+    cleaner.rules["normalize_punctuation"] = False
+    assert cleaner.fingerprint() != base
+    cleaner.rules["normalize_punctuation"] = True
+
+    cleaner.register_rule(CleaningRule.regex("torque", r"N\s*·\s*m", "N·m"))
+    with_rule = cleaner.fingerprint()
+    assert with_rule != base
+    cleaner.register_rule(CleaningRule.regex("torque", r"N\s*·\s*m", "N·m", version="2"),
+                          replace=True)
+    assert cleaner.fingerprint() != with_rule
+    cleaner.plugins.disable("torque")
+    assert cleaner.fingerprint() == base
+
+def test_reupload_recleans_only_after_rule_change(uploader, maintenance_doc_bytes, monkeypatch):
+    """测试重复上传时规则未变化不再清洗，规则变化后按新规则清洗并更新文档记录，
+    改回原规则时使用缓存的清洗结果"""
+    content = maintenance_doc_bytes
+    first = uploader.upload(content, "manual.docx")
+    cleaned = open(first.file_path, "rb").read()
+
+    calls = []
+    clean_artifact = uploader.cleaner.clean_artifact
+    monkeypatch.setattr(uploader.cleaner, "clean_artifact",
+                        lambda *args: calls.append(args) or clean_artifact(*args))
+
+    assert uploader.upload(content, "manual.docx").cleaning_fingerprint == first.cleaning_fingerprint
+    assert not calls
+
+    uploader.cleaner.rules["normalize_punctuation"] = False
+    second = uploader.upload(content, "manual.docx")
+    assert len(calls) == 1
+    assert second.id == first.id
+    assert second.cleaning_fingerprint == uploader.cleaner.fingerprint() != first.cleaning_fingerprint
+    assert open(second.file_path, "rb").read() != cleaned
+    # 更新后的记录已保存，文档注册表中的记录同步更新
+    assert uploader.store.get_document(first.content_hash).cleaning_fingerprint == second.cleaning_fingerprint
+    assert uploader.registry.get(first.id).cleaning_fingerprint == second.cleaning_fingerprint
+    cache_dir = uploader.store.object_dir(first.content_hash) / CleaningCache.DIR_NAME
+    assert len(list(cache_dir.glob("*.json"))) == 2
+
+    uploader.cleaner.rules["normalize_punctuation"] = True
+    third = uploader.upload(content, "manual.docx")
+    assert len(calls) == 1
+    assert third.cleaning_fingerprint == first.cleaning_fingerprint
+    assert third.metadata.keywords == first.metadata.keywords
+    assert open(third.file_path, "rb").read() == cleaned
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """测试超过大小上限时淘汰最久未使用的条目"""
+    store = DocumentStore(tmp_path)
+    cleaned = tmp_path / "cleaned.docx"
+    cleaned.write_bytes(b"x" * 100)
+    # 产物与 cleaned.docx 共用，只有 25 字节的统计信息计入大小；
+    # 淘汰到上限的 80% 以下后仍可保留两个条目
+    cache = CleaningCache(store, max_size=70)
+    hashes = [str(i) * 64 for i in range(3)]
+    fingerprint = "f" * 64
+
+    cache.put(hashes[0], fingerprint, cleaned, {"cleaned_paragraphs": 0})
+    cache.put(hashes[1], fingerprint, cleaned, {"cleaned_paragraphs": 1})
+    # 第一个条目比第二个更早写入，但随后被读取过
+    for content_hash, mtime in ((hashes[0], 1000), (hashes[1], 500)):
+        os.utime(cache.entry_paths(content_hash, fingerprint)[1], (mtime, mtime))
+    assert cache.get(hashes[0], fingerprint, tmp_path / "out.docx") == {"cleaned_paragraphs": 0}
+
+    cache.put(hashes[2], fingerprint, cleaned, {"cleaned_paragraphs": 2})
+    assert cache.get(hashes[1], fingerprint, tmp_path / "out.docx") is None
+    assert cache.get(hashes[0], fingerprint, tmp_path / "out.docx") is not None
+    assert cache.get(hashes[2], fingerprint, tmp_path / "out.docx") is not None
+    assert (tmp_path / "out.docx").read_bytes() == cleaned.read_bytes()
+
+def test_cache_size_excludes_shared_artifacts(tmp_path, monkeypatch):
+    """测试与文档共用的产物不计入缓存大小，淘汰后留有余量，不会每次写入都淘汰"""
+    store = DocumentStore(tmp_path)
+    fingerprint = "f" * 64
+    hashes = [str(i) * 64 for i in range(10)]
+    artifacts = [tmp_path / f"cleaned{i}.json.gz" for i in range(10)]
+    for artifact in artifacts:
+        artifact.write_bytes(b"x" * 100)
+    # 每个条目 100 字节产物 + 25 字节统计信息
+    cache = CleaningCache(store, max_size=1000)
+
+    for i in range(8):
+        cache.put(hashes[i], fingerprint, artifacts[i], {"cleaned_paragraphs": i})
+        os.utime(cache.entry_paths(hashes[i], fingerprint)[1], (i, i))
+    # 产物仍被文档使用，只有统计信息计入大小
+    assert sum(entry[1] for entry in cache._entries()) == 8 * 25
+
+    # 文档不再使用的产物计入大小，超过上限后淘汰到上限的 80% 以下
+    for artifact in artifacts[:8]:
+        os.unlink(artifact)
+    cache.put(hashes[8], fingerprint, artifacts[8], {"cleaned_paragraphs": 8})
+    assert cache._size == 6 * 125 + 25
+    assert [cache.entry_paths(h, fingerprint)[1].exists() for h in hashes[:3]] == [False, False, True]
+
+    # 之后的写入不再需要淘汰
+    evictions = []
+    monkeypatch.setattr(cache, "_evict", lambda: evictions.append(1))
+    cache.put(hashes[9], fingerprint, artifacts[9], {"cleaned_paragraphs": 9})
+    assert not evictions
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,59 @@
+import pickle
+import re
+import pytest
+
+from backend.core.document_manager.cleaner import DocumentCleaner
+from backend.core.document_manager.cleaning_rules import CleaningRule, CleaningRuleRegistry
+
+def expand_abbreviations(text: str) -> str:
+    return text.replace("P/N", "零件号")
+
+@pytest.fixture
+def cleaner():
+    cleaner = DocumentCleaner()
+    cleaner.register_rule(CleaningRule.char_map("enumeration_comma", {"、": ","}))
+    cleaner.register_rule(CleaningRule.regex("hpu", r"HPU", "液压动力单元"))
+    cleaner.register_rule(CleaningRule.regex("torque_unit", r"(\d+)\s*牛米", r"\1N·m"))
+    cleaner.register_rule(CleaningRule.regex("millimeter", r"(\d+)MM\b", r"\1mm", flags=re.IGNORECASE))
+    cleaner.register_rule(CleaningRule.regex("repeated_word", r"(检查)\1", r"\1"))
+    cleaner.register_rule(CleaningRule.callable("part_number", expand_abbreviations))
+    return cleaner
+
+def test_custom_rules(cleaner):
+    """测试自定义字符映射、正则和函数规则"""
+    assert cleaner.clean_text("检查HPU、油泵，扭矩45 牛米") == "检查液压动力单元, 油泵, 扭矩45N·m"
+    assert cleaner.clean_texts(["检查检查 17mm扳手", "P/N：A-1"]) == ["检查 17mm扳手", "零件号: A-1"]
+
+def test_regex_rules_fused_into_one_pattern(cleaner):
+    """测试可合并的正则规则编译为一个正则，含反向引用的规则单独执行"""
+    normalizer = cleaner._normalizer()
+    assert normalizer._fused_pattern.pattern.count("|") == 2
+    assert len(normalizer._separate_patterns) == 1
+
+def test_rules_can_be_disabled_and_replaced(cleaner):
+    """测试规则的停用和替换会使执行计划重新编译"""
+    cleaner.plugins.disable("hpu")
+    assert cleaner.clean_text("HPU") == "HPU"
+    cleaner.plugins.enable("hpu")
+    cleaner.register_rule(CleaningRule.regex("hpu", r"HPU", "动力单元"), replace=True)
+    assert cleaner.clean_text("HPU") == "动力单元"
+    with pytest.raises(ValueError):
+        cleaner.register_rule(CleaningRule.regex("hpu", r"HPU", "动力单元"))
+
+def test_cleaner_with_rules_is_picklable(cleaner):
+    """测试带自定义规则的清洗器可以传给批量上传的工作进程"""
+    cleaner.clean_text("预热编译结果")
+    restored = pickle.loads(pickle.dumps(cleaner))
+    assert restored.clean_text("HPU、P/N") == "液压动力单元, 零件号"
+
+def test_registry_keeps_registration_order():
+    registry = CleaningRuleRegistry([
+        CleaningRule.callable("b", str.strip),
+        CleaningRule.callable("a", str.lower),
+    ])
+    assert [rule.name for rule in registry] == ["b", "a"]
+    with pytest.raises(ValueError):
+        CleaningRule.char_map("invalid", {"ab": "c"})
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,48 @@
+import io
+from datetime import datetime
+import pytest
+from docx import Document
+
+from backend.core.document_manager.context import DocumentContext
+from backend.core.document_manager.uploader import DocumentUploader
+
+def create_doc_with_properties(revision: int, modified: datetime) -> bytes:
+    """创建设置了文档属性的测试文档"""
+    doc = Document()
+    doc.add_paragraph(f"第{revision}版正文")
+    props = doc.core_properties
+    props.title = "发动机维修标准"
+    props.author = "设备部"
+    props.version = "V2.1"
+    props.revision = revision
+    props.keywords = "发动机，机油; 保养"
+    props.created = datetime(2023, 1, 1, 8, 0)
+    props.modified = modified
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def test_extract_metadata_without_loading_body():
+    """测试从 docProps 读取元数据且不加载文档正文"""
+    context = DocumentContext(create_doc_with_properties(3, datetime(2024, 5, 1)), "std.docx")
+    metadata = DocumentUploader()._extract_metadata(context)
+
+    assert metadata.title == "发动机维修标准"
+    assert metadata.author == "设备部"
+    assert metadata.version == "V2.1"
+    assert metadata.revision == 3
+    assert metadata.keywords == ["发动机", "机油", "保养"]
+    assert metadata.created_date.replace(tzinfo=None) == datetime(2023, 1, 1, 8, 0)
+    assert metadata.last_modified.replace(tzinfo=None) == datetime(2024, 5, 1)
+    assert context._docx is None
+
+def test_registry_finds_revisions(uploader):
+    """测试按标题查找同一标准的不同修订版本"""
+    uploader.upload(create_doc_with_properties(1, datetime(2023, 6, 1)), "v1.docx")
+    uploader.upload(create_doc_with_properties(2, datetime(2024, 6, 1)), "v2.docx")
+
+    revisions = uploader.registry.find_revisions("发动机维修标准")
+    assert [d.metadata.revision for d in revisions] == [2, 1]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
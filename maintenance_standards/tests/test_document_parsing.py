@@ -1,9 +1,11 @@
+import io
 import os
+import re
 import pytest
 from docx import Document
 from docx.enum.style import WD_STYLE_TYPE
 from backend.core.document_manager.parser import DocumentParser
-from backend.models.document_structure import ParagraphType
+from backend.models.document_structure import DocumentStructure, ParagraphType, Section
 
 def create_test_doc_with_structure(path: str):
     """创建包含结构化内容的测试文档"""
@@ -120,5 +122,196 @@ def test_document_parser():
         if os.path.exists(test_doc_path):
             os.remove(test_doc_path)
 
+def test_blocks_parsed_in_document_order(png_bytes):
+    """测试段落、表格和图片按文档顺序解析，表格标题可以位于表格之前或之后"""
+    doc = Document()
+    doc.add_heading("第二章 液压系统", 1)
+    doc.add_paragraph("表2-1 检查周期", style="Caption")
+    doc.add_table(rows=1, cols=2).rows[0].cells[0].text = "油位"
+    doc.add_paragraph("检查液压油位。")
+    doc.add_table(rows=1, cols=1).rows[0].cells[0].text = "45N·m"
+    doc.add_paragraph("表2-2 扭矩要求", style="Caption")
+    doc.add_paragraph("图2-1 油箱位置")
+    doc.add_picture(io.BytesIO(png_bytes))
+    doc.add_picture(io.BytesIO(png_bytes))
+
+    structure = DocumentParser().parse_document(doc)
+
+    assert [p.type for p in structure.paragraphs] == [
+        ParagraphType.TITLE, ParagraphType.CONTENT, ParagraphType.TABLE, ParagraphType.CONTENT,
+        ParagraphType.TABLE, ParagraphType.CONTENT, ParagraphType.CONTENT,
+        ParagraphType.IMAGE, ParagraphType.IMAGE,
+    ]
+    assert [t.caption for t in structure.tables] == ["表2-1 检查周期", "表2-2 扭矩要求"]
+    # 表格按表格序号编号，不与正文段落的索引冲突
+    assert [p.index for p in structure.paragraphs] == [0, 1, 0, 2, 1, 3, 4, 5, 6]
+    assert structure.paragraphs[2].table is structure.tables[0]
+    assert "油位" in structure.paragraphs[2].text
+    assert [i.caption for i in structure.images] == ["图2-1 油箱位置", "图2-2"]
+    assert structure.images[0].path.startswith("media/")
+    # 表格和图片归入所在章节
+    assert ParagraphType.TABLE in [p.type for p in structure.sections[0].paragraphs]
+
+def test_streaming_events_match_parse_document(tmp_path, png_bytes):
+    """测试流式解析的事件与 parse_document 的段落一致，按章节切分时覆盖全部事件"""
+    doc = Document()
+    doc.add_paragraph("前言：本手册适用于全部机型。")
+    doc.add_heading("第一章 液压系统", 1)
+    doc.add_paragraph("1.1 油位检查")
+    doc.add_table(rows=1, cols=1).rows[0].cells[0].text = "45N·m"
+    doc.add_paragraph("表1-1 扭矩要求", style="Caption")
+    doc.add_paragraph("检查液压油位。")
+    doc.add_heading("第二章 电气系统", 1)
+    doc.add_picture(io.BytesIO(png_bytes))
+    doc.add_table(rows=1, cols=1)
+    path = tmp_path / "manual.docx"
+    doc.save(str(path))
+
+    parser = DocumentParser()
+    structure = parser.parse_document(str(path))
+    events = list(parser.iter_events(str(path)))
+    assert [e.model_dump() for e in events] == [p.model_dump() for p in structure.paragraphs]
+    assert events[3].table.caption == "表1-1 扭矩要求"
+
+    sections = list(parser.iter_sections(str(path)))
+    assert [s.title.text if s.title else None for s in sections] == [
+        None, "第一章 液压系统", "第二章 电气系统"]
+    assert sections[0].level == 0
+    # 更深层的标题留在所在章节中
+    assert sections[1].paragraphs[0].level == 2
+    flattened = []
+    for section in sections:
+        flattened += ([section.title] if section.title else []) + section.paragraphs
+    assert [e.model_dump() for e in flattened] == [e.model_dump() for e in events]
+    assert sections[-1].end_index == len(events) - 1
+
+def reference_section_paragraphs(structure):
+    """逐个追加段落的参考实现：非标题段落属于当前最深的章节，返回 {标题索引: 段落列表}"""
+    result = {}
+    current = []  # [(level, 标题索引), ...]
+    for para in structure.paragraphs:
+        if para.type != ParagraphType.TITLE:
+            if current:
+                result[current[-1][1]].append(para)
+            continue
+        if para.style == 'Title':
+            continue
+        while current and current[-1][0] >= para.level:
+            current.pop()
+        current.append((para.level, para.index))
+        result[para.index] = []
+    return result
+
+def test_sections_reference_paragraph_ranges():
+    """测试章节通过索引范围引用段落，内容与逐个追加的结果一致，序列化不重复段落"""
+    doc = Document()
+    doc.add_paragraph("维修标准", style="Title")
+    doc.add_paragraph("前言内容")
+    doc.add_heading("第一章 总则", 1)
+    doc.add_paragraph("总则内容")
+    doc.add_heading("1.1 范围", 2)
+    doc.add_paragraph("范围内容")
+    doc.add_paragraph("附录", style="Title")
+    doc.add_heading("1.1.1 细则", 3)
+    doc.add_heading("1.2 术语", 2)
+    doc.add_table(rows=1, cols=1).rows[0].cells[0].text = "扭矩"
+    doc.add_heading("第二章 检查", 1)
+    doc.add_paragraph("检查内容")
+
+    structure = DocumentParser().parse_document(doc)
+    expected = reference_section_paragraphs(structure)
+    sections = []
+    pending = list(structure.sections)
+    while pending:
+        section = pending.pop()
+        sections.append(section)
+        pending.extend(section.subsections)
+    assert len(sections) == len(expected) == 5
+    for section in sections:
+        assert list(section.paragraphs) == expected[section.title.index]
+    assert structure.sections[-1].end_index == len(structure.paragraphs) - 1
+
+    # 同名样式共用一个字符串对象
+    styles = [s for s in structure.paragraphs.styles if s == "Normal"]
+    assert len(styles) > 1 and all(s is styles[0] for s in styles)
+
+    data = structure.model_dump()
+    assert "paragraphs" not in data["sections"][0]
+    restored = DocumentStructure.model_validate_json(structure.model_dump_json())
+    assert restored.model_dump() == data
+    assert restored.sections[0].subsections[0].paragraphs == structure.sections[0].subsections[0].paragraphs
+
+def test_stored_paragraph_changes_write_back():
+    """测试修改从段落序列和章节读取的段落时写回段落序列，不会丢失"""
+    doc = Document()
+    doc.add_heading("第一章 总则", 1)
+    doc.add_paragraph("总则内容")
+    structure = DocumentParser().parse_document(doc)
+    section = structure.sections[0]
+
+    paragraph = structure.paragraphs[1]
+    paragraph.text = "修改后的内容"
+    paragraph.style = "Body Text"
+    assert paragraph.text == "修改后的内容"
+    assert structure.paragraphs[1].text == "修改后的内容"
+    assert structure.paragraphs[1].style == "Body Text"
+    section.paragraphs[0].type = ParagraphType.REFERENCE
+    assert structure.paragraphs[1].type == ParagraphType.REFERENCE
+    section.title.level = 2
+    assert structure.paragraphs[0].level == 2
+    assert structure.model_dump()["paragraphs"][1]["text"] == "修改后的内容"
+
+    with pytest.raises(TypeError):
+        structure.paragraphs[1] = structure.paragraphs[0]
+    with pytest.raises(TypeError):
+        section.paragraphs[0] = structure.paragraphs[0]
+    with pytest.raises(AttributeError):
+        section.paragraphs.append(structure.paragraphs[0])
+    assert [p.text for p in section.paragraphs] == ["修改后的内容"]
+    assert structure.paragraphs.texts == ["第一章 总则", "修改后的内容"]
+
+    # 单独构造的章节保存自己的段落，仍然可以修改
+    standalone = Section(level=1, start_index=0, end_index=0, paragraphs=[structure.paragraphs[1]])
+    standalone.paragraphs.append(structure.paragraphs[0])
+    assert len(standalone.paragraphs) == 2
+
+def reference_classify(parser, text, style_name):
+    """逐个匹配模式的参考实现"""
+    text = text.strip()
+    if style_name == 'Title':
+        return ParagraphType.TITLE, 0
+    if style_name and style_name.startswith('Heading'):
+        try:
+            return ParagraphType.TITLE, int(style_name.replace('Heading ', ''))
+        except ValueError:
+            level = next((lv for p, lv in parser.title_patterns.items() if re.match(p, text)), 0)
+            return ParagraphType.TITLE, level
+    if style_name == 'Caption':
+        return ParagraphType.CONTENT, 0
+    for pattern, level in parser.title_patterns.items():
+        if re.match(pattern, text):
+            return ParagraphType.TITLE, level
+    if any(re.match(pattern, text) for pattern in parser.list_patterns):
+        return ParagraphType.LIST_ITEM, 0
+    if text.startswith('"') and text.endswith('"'):
+        return ParagraphType.REFERENCE, 0
+    return ParagraphType.CONTENT, 0
+
+@pytest.mark.parametrize("style_name", [None, "Normal", "Title", "Heading 2", "Heading", "Caption"])
+def test_classifier_matches_sequential_patterns(style_name):
+    """测试合并编译的分类正则与逐个匹配模式的结果一致"""
+    parser = DocumentParser()
+    texts = ["第三章：液压系统", "1. 概述", "1.2 范围", "1.2.3 细则", "12.3", "● 手套", "(a) 工具",
+             "1、检查", "- 扳手", "— 注意", '"安全第一"', "普通正文", "", "  2.1  前后空格  ",
+             "第十章", "a.b", "1.2.3.4 深层"]
+    for text in texts:
+        style_rule = parser._style_rule(style_name)
+        assert parser._classify_text(text, style_rule) == reference_classify(parser, text, style_name)
+
+    # 修改模式后重新编译
+    parser.title_patterns[r"^附录\s*(.*)$"] = 1
+    style_rule = parser._style_rule(style_name)
+    assert parser._classify_text("附录 A", style_rule) == reference_classify(parser, "附录 A", style_name)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,10 +1,11 @@
 import os
+import numpy as np
 import pytest
 from docx import Document
 from docx.enum.style import WD_STYLE_TYPE
 from docx.shared import Inches
 from backend.core.document_manager.parser import DocumentParser
-from backend.models.document_structure import ParagraphType
+from backend.models.document_structure import ParagraphType, Table
 
 def create_doc_with_complex_tables(path: str):
     """创建包含复杂表格的测试文档"""
@@ -99,6 +100,60 @@ def test_complex_tables():
         if os.path.exists(test_doc_path):
             os.remove(test_doc_path)
 
+def test_merged_cells_have_spans(tmp_path):
+    """测试合并单元格只出现一次，并记录跨行数和跨列数"""
+    doc = Document()
+    table = doc.add_table(rows=4, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 2)).text = "检查周期表"
+    table.cell(1, 0).merge(table.cell(3, 0)).text = "液压系统"
+    table.cell(1, 1).merge(table.cell(2, 2)).text = "每月检查"
+    table.cell(3, 1).text = "油位"
+    path = tmp_path / "merged.docx"
+    doc.save(str(path))
+
+    table = DocumentParser().parse_document(str(path)).tables[0]
+    spans = {cell.text: (cell.row, cell.col, cell.rowspan, cell.colspan) for cell in table.cells}
+    assert spans == {
+        "检查周期表": (0, 0, 1, 3),
+        "液压系统": (1, 0, 3, 1),
+        "每月检查": (1, 1, 2, 2),
+        "油位": (3, 1, 1, 1),
+        "": (3, 2, 1, 1),
+    }
+    assert len(table.cells) == 5
+    assert [cell.is_header for cell in table.cells] == [True, False, False, False, False]
+
+def test_table_columnar_accessors(tmp_path):
+    """测试表格的列式访问：DataFrame 直接引用文本网格，TableCell 按需创建"""
+    doc = Document()
+    table = doc.add_table(rows=3, cols=3)
+    for j, text in enumerate(["部件", "周期", "扭矩"]):
+        table.cell(0, j).text = text
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "液压泵"
+    table.cell(1, 1).text = "每月"
+    table.cell(1, 2).text = "45N·m"
+    table.cell(2, 1).text = "每年"
+    path = tmp_path / "columnar.docx"
+    doc.save(str(path))
+
+    table = DocumentParser().parse_document(str(path)).tables[0]
+    assert table._cells is None
+
+    df = table.to_dataframe()
+    assert list(df.columns) == ["部件", "周期", "扭矩"]
+    assert df["部件"].tolist() == ["液压泵", "液压泵"]
+    assert np.shares_memory(df.to_numpy(copy=False), table.grid())
+    assert list(table.iter_records()) == [
+        {"部件": "液压泵", "周期": "每月", "扭矩": "45N·m"},
+        {"部件": "液压泵", "周期": "每年", "扭矩": ""},
+    ]
+    assert table._cells is None
+
+    # 序列化后再读取，单元格和列式数据保持一致
+    restored = Table.model_validate_json(table.model_dump_json())
+    assert restored == table
+    assert [cell.text for cell in restored.cells] == [cell.text for cell in table.cells]
+
 def test_complex_lists():
     """测试复杂列表解析"""
     test_doc_path = "test_complex_lists.docx"
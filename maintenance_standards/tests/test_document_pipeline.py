@@ -0,0 +1,84 @@
+import pytest
+from lxml import etree
+
+from backend.core.document_manager import context as context_module
+from backend.core.document_manager.context import DocumentContext
+from backend.core.document_manager.validator import DocumentValidator
+from backend.core.document_manager.cleaner import DocumentCleaner
+from backend.core.document_manager.ooxml import DOCUMENT_PART
+from backend.core.document_manager.parser import DocumentParser
+from backend.models.document_structure import ParagraphType
+
+def test_pipeline_parses_document_once(maintenance_doc_bytes, monkeypatch):
+    """测试上传流水线各阶段共享同一份文档树"""
+    loads = []
+    original = context_module.DocxDocument
+
+    def counting_loader(*args, **kwargs):
+        loads.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(context_module, "DocxDocument", counting_loader)
+
+    content = maintenance_doc_bytes
+    context = DocumentContext(content, "manual.docx")
+
+    DocumentValidator().validate_file("manual.docx", content, context)
+    # 验证阶段不加载 python-docx 对象模型
+    assert not loads
+    cleaned_doc, stats = DocumentCleaner().clean_document(context)
+    assert cleaned_doc is context.docx
+    assert stats["removed_paragraphs"] == 1
+
+    assert DocumentValidator().validate_content_for_extraction(context)
+
+    structure = DocumentParser().parse_document(context)
+    assert DocumentParser().parse_document(context) is structure
+    assert context.structure is structure
+
+    # 清洗后的文本进入解析结果
+    assert any(p.text == "拆下放油螺栓, 放出机油." for p in structure.paragraphs)
+    assert any(p.type == ParagraphType.TITLE for p in structure.paragraphs)
+
+    assert len(loads) == 1
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_upload_parses_document_xml_once(tmp_path, uploader, maintenance_doc_bytes, monkeypatch,
+                                         streamed):
+    """测试上传时验证和清洗共用同一棵 word/document.xml 元素树，不加载 python-docx；
+    从路径流式上传时移动文件后同样沿用验证阶段解析的元素树"""
+    def fail_loader(*args, **kwargs):
+        raise AssertionError("上传流水线不应加载 python-docx 文档树")
+
+    parsed = []
+    parse = etree.parse
+
+    def counting_parse(source, *args, **kwargs):
+        parsed.append(getattr(source, "name", source))
+        return parse(source, *args, **kwargs)
+
+    monkeypatch.setattr(context_module, "DocxDocument", fail_loader)
+    monkeypatch.setattr(etree, "parse", counting_parse)
+
+    source = maintenance_doc_bytes
+    if streamed:
+        source = tmp_path / "manual.docx"
+        source.write_bytes(maintenance_doc_bytes)
+    document = uploader.upload(source, "manual.docx")
+
+    assert "cleaned_paragraphs:1" in document.metadata.keywords
+    assert parsed.count(DOCUMENT_PART) == 1
+
+def test_context_hash_and_from_path(tmp_path, maintenance_doc_bytes):
+    """测试上下文的内容哈希和从文件创建"""
+    content = maintenance_doc_bytes
+    path = tmp_path / "manual.docx"
+    path.write_bytes(content)
+
+    context = DocumentContext.from_path(path)
+    assert context.filename == "manual.docx"
+    assert context.content_hash == DocumentContext(content, "x.docx").content_hash
+    assert str(context) == str(path)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
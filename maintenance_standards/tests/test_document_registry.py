@@ -0,0 +1,91 @@
+import hashlib
+from datetime import datetime, timedelta
+import pytest
+
+from backend.core.document_manager import registry as registry_module
+from backend.core.document_manager.registry import DocumentRegistry
+from backend.models.document import Document, DocumentMetadata, DocumentStatus
+
+def make_document(index: int, title: str, status: str = DocumentStatus.PENDING.value) -> Document:
+    """构造测试用文档记录"""
+    content_hash = hashlib.sha256(str(index).encode()).hexdigest()
+    return Document(
+        id=content_hash[:32],
+        filename=f"{title}.docx",
+        file_path=f"/tmp/{content_hash}.docx",
+        file_size=1024 * index,
+        content_hash=content_hash,
+        metadata=DocumentMetadata(title=title, version="1.0"),
+        upload_time=datetime(2024, 1, 1) + timedelta(minutes=index),
+        status=status
+    )
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = DocumentRegistry(tmp_path / "registry.db")
+    registry.register(make_document(1, "发动机维修标准"))
+    registry.register(make_document(2, "液压系统检修规程", DocumentStatus.COMPLETED.value))
+    registry.register(make_document(3, "发动机冷却系统保养", DocumentStatus.ERROR.value))
+    return registry
+
+def test_list_and_filter(registry):
+    """测试文档列表和状态筛选"""
+    documents = registry.list_documents()
+    assert [d.metadata.title for d in documents] == [
+        "发动机冷却系统保养", "液压系统检修规程", "发动机维修标准"
+    ]
+
+    completed = registry.list_documents(status=DocumentStatus.COMPLETED.value)
+    assert [d.metadata.title for d in completed] == ["液压系统检修规程"]
+
+    first = documents[-1]
+    assert registry.get(first.id) == first
+    assert registry.get_by_hash(first.content_hash) == first
+
+def test_search(registry):
+    """测试标题全文搜索"""
+    assert {d.metadata.title for d in registry.search("发动机")} == {
+        "发动机维修标准", "发动机冷却系统保养"
+    }
+    # 少于 3 个字符的查询
+    assert [d.metadata.title for d in registry.search("液压")] == ["液压系统检修规程"]
+    assert [d.metadata.title for d in registry.search("发动机", status="error")] == [
+        "发动机冷却系统保养"
+    ]
+    assert registry.search('"注入') == []
+
+def test_update_delete_and_statistics(registry):
+    """测试状态更新、删除和统计"""
+    document = registry.list_documents(status=DocumentStatus.PENDING.value)[0]
+    registry.update_status(document.id, DocumentStatus.PROCESSING.value)
+    assert registry.get(document.id).status == DocumentStatus.PROCESSING.value
+
+    stats = registry.statistics(recent=2)
+    assert stats["total"] == 3
+    assert stats["by_status"] == {"processing": 1, "completed": 1, "error": 1}
+    assert len(stats["recent"]) == 2
+
+    assert registry.delete(document.id)
+    assert registry.get(document.id) is None
+    assert registry.search("维修标准") == []
+
+def test_search_without_trigram_tokenizer(tmp_path, monkeypatch):
+    """测试 SQLite 不支持 trigram 分词器时改用 LIKE 搜索，支持后重建全文索引"""
+    db_path = tmp_path / "registry.db"
+    DocumentRegistry(db_path).register(make_document(1, "发动机维修标准"))
+
+    monkeypatch.setattr(registry_module, "_trigram_supported", lambda: False)
+    registry = DocumentRegistry(db_path)
+    assert not registry.full_text_search
+    registry.register(make_document(2, "发动机冷却系统保养"))
+    assert {d.metadata.title for d in registry.search("发动机")} == {
+        "发动机维修标准", "发动机冷却系统保养"
+    }
+
+    monkeypatch.undo()
+    registry = DocumentRegistry(db_path)
+    assert registry.full_text_search
+    assert [d.metadata.title for d in registry.search("冷却系统")] == ["发动机冷却系统保养"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
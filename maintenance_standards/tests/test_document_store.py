@@ -0,0 +1,96 @@
+import hashlib
+import io
+import pytest
+from docx import Document
+
+from backend.config import settings
+from backend.core.document_manager.context import DocumentContext
+from backend.core.document_manager.parser import DocumentParser
+from backend.core.document_manager.store import DocumentStore
+from backend.utils.error_handler import DocumentError
+
+def test_store_keeps_one_copy_per_content(tmp_path):
+    """测试相同内容只保存一份"""
+    store = DocumentStore(tmp_path)
+    content = b"same bytes"
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    first = store.put(content_hash, content)
+    second = store.put(content_hash, content)
+
+    assert first == second
+    assert store.contains(content_hash)
+    assert len(list(store.root.rglob("original.docx"))) == 1
+
+    with pytest.raises(ValueError):
+        store.object_dir("../../etc")
+
+def test_images_resolved_by_embed_id_and_stored_once(uploader, png_bytes):
+    """测试每个图片只按其引用的关系解析一次，不同文档中的相同图片只保存一份"""
+    stored = []
+    for title in ("发动机手册", "变速箱手册"):
+        doc = Document()
+        doc.add_heading(title, 1)
+        doc.add_paragraph("检查液压油位。")
+        doc.add_picture(io.BytesIO(png_bytes))
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        document = uploader.upload(buffer.getvalue(), f"{title}.docx")
+
+        images = DocumentParser().parse_document(document.file_path).images
+        assert [image.path for image in images] == ["media/image1.png"]
+        # 图片在需要时才提取
+        assert len(list(uploader.store.images.root.rglob("*.png"))) == len(stored)
+        stored += uploader.extract_images(document, images)
+
+    assert stored[0] == stored[1]
+    with open(stored[0], "rb") as f:
+        assert f.read() == png_bytes
+    assert len(list(uploader.store.images.root.rglob("*.png"))) == 1
+
+def test_duplicate_upload_returns_existing_document(uploader, maintenance_doc_bytes, monkeypatch):
+    """测试重复上传直接返回已有文档，不再清洗"""
+    content = maintenance_doc_bytes
+
+    document = uploader.upload(content, "manual.docx")
+    assert document.id == document.content_hash[:32]
+
+    def fail_clean(*args, **kwargs):
+        raise AssertionError("重复文件不应再次清洗")
+
+    monkeypatch.setattr(uploader.cleaner, "clean_artifact", fail_clean)
+    duplicate = uploader.upload(content, "manual_copy.docx")
+
+    assert duplicate.id == document.id
+    assert duplicate.filename == "manual.docx"
+    assert len(list(uploader.store.root.rglob("original.docx"))) == 1
+
+def test_streaming_upload_from_path_and_file_object(tmp_path, uploader, maintenance_doc_bytes,
+                                                   monkeypatch):
+    """测试从路径和文件对象流式上传，超出大小限制时中止"""
+    content = maintenance_doc_bytes
+    source = tmp_path / "manual.docx"
+    source.write_bytes(content)
+
+    document = uploader.upload(source)
+    assert document.filename == "manual.docx"
+    assert document.content_hash == hashlib.sha256(content).hexdigest()
+    assert document.file_size == len(content)
+    stored = uploader.store.path_for(document.content_hash, DocumentStore.ORIGINAL_NAME)
+    assert stored.read_bytes() == content
+
+    with open(source, "rb") as f:
+        assert uploader.upload(f).id == document.id
+
+    monkeypatch.setattr(DocumentContext, "CHUNK_SIZE", 1024)
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 4096)
+    other = tmp_path / "other.docx"
+    other.write_bytes(content + b"\0" * 10)
+    with pytest.raises(DocumentError, match="文件大小超过限制"):
+        uploader.upload(other)
+
+    # 临时文件全部被移动或删除
+    assert list((uploader.store.root / ".incoming").iterdir()) == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
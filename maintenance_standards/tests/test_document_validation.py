@@ -0,0 +1,152 @@
+import io
+import os
+import zipfile
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from docx import Document
+
+from backend.config import settings
+from backend.core.document_manager.context import DocumentContext
+from backend.core.document_manager.validator import DocumentValidator
+from backend.utils.error_handler import DocumentError
+
+def create_doc_bytes(text: str) -> bytes:
+    """创建只包含一个段落的测试文档"""
+    doc = Document()
+    doc.add_paragraph(text)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def test_validate_from_memory():
+    """测试直接从内存缓冲区验证文档"""
+    content = create_doc_bytes("维修标准")
+    validator = DocumentValidator()
+
+    validator.validate_file("manual.docx", content)
+    validator.validate_file("manual.docx", memoryview(content))
+
+    with pytest.raises(DocumentError):
+        validator.validate_file("manual.docx", b"not a docx file")
+
+def test_concurrent_validation_writes_no_temp_files():
+    """测试并发验证互不干扰且不写入临时文件"""
+    before = set(os.listdir(settings.UPLOAD_FOLDER))
+    validator = DocumentValidator()
+    contents = [create_doc_bytes(f"文档 {i}") for i in range(8)]
+
+    def validate(content: bytes) -> bool:
+        validator.validate_file("manual.docx", content)
+        return True
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(validate, contents * 4))
+
+    assert all(results)
+    assert set(os.listdir(settings.UPLOAD_FOLDER)) == before
+
+def build_zip(parts: dict) -> bytes:
+    """用给定部件构建 zip 包"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        for name, data in parts.items():
+            package.writestr(name, data)
+    return buffer.getvalue()
+
+def test_preflight_rejects_junk():
+    """测试预检阶段拒绝非 docx 文件"""
+    validator = DocumentValidator()
+    content = create_doc_bytes("维修标准")
+    spreadsheet_types = (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/></Types>'
+    )
+
+    junk = {
+        "renamed_doc": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 512,
+        "truncated": content[: len(content) // 2],
+        "spreadsheet": build_zip({
+            "[Content_Types].xml": spreadsheet_types,
+            "xl/workbook.xml": "<workbook/>",
+        }),
+        "no_main_part": build_zip({"[Content_Types].xml": "<Types/>"}),
+    }
+    for name, data in junk.items():
+        with pytest.raises(DocumentError, match="文件格式无效"):
+            validator.validate_file(f"{name}.docx", data)
+
+def test_rejects_malformed_or_empty_document_part():
+    """测试 word/document.xml 无法解析、缺少正文或没有段落时拒绝文件"""
+    with zipfile.ZipFile(io.BytesIO(create_doc_bytes("维修标准"))) as package:
+        parts = {name: package.read(name) for name in package.namelist()}
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    validator = DocumentValidator()
+
+    for document_xml in (b"<w:document", f"<w:document {w}/>".encode()):
+        with pytest.raises(DocumentError, match="文件格式无效"):
+            validator.validate_file("manual.docx", build_zip({**parts, "word/document.xml": document_xml}))
+    empty = f"<w:document {w}><w:body><w:sectPr/></w:body></w:document>".encode()
+    with pytest.raises(DocumentError, match="文档内容为空"):
+        validator.validate_file("manual.docx", build_zip({**parts, "word/document.xml": empty}))
+
+def test_preflight_rejects_zip_bomb():
+    """测试预检阶段拒绝压缩比异常的文件"""
+    with zipfile.ZipFile(io.BytesIO(create_doc_bytes("维修标准"))) as package:
+        parts = {name: package.read(name) for name in package.namelist()}
+    parts["word/media/bomb.bin"] = b"\x00" * (8 * 1024 * 1024)
+
+    with pytest.raises(DocumentError, match="压缩比异常"):
+        DocumentValidator().validate_file("bomb.docx", build_zip(parts))
+
+def create_sections_doc(sections, table_text: str = None) -> bytes:
+    """创建按部分组织的测试文档"""
+    doc = Document()
+    # 需要重复出现同一部分标题时传入 [(标题, 内容), ...]
+    for title, lines in (sections.items() if isinstance(sections, dict) else sections):
+        doc.add_paragraph(title)
+        for line in lines:
+            doc.add_paragraph(line)
+    if table_text:
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = table_text
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def test_streaming_content_scan_matches_docx_walk(tmp_path):
+    """测试流式内容扫描与 python-docx 遍历结果一致"""
+    validator = DocumentValidator()
+    cases = {
+        "complete": (create_sections_doc({
+            "步骤": ["拆下螺栓"], "工具": ["扳手"], "安全": ["断电"], "注意": ["防烫"],
+        }), True),
+        "empty_section": (create_sections_doc({
+            "步骤": ["拆下螺栓"], "工具": [], "安全": ["断电"], "注意": ["防烫"],
+        }), False),
+        # 同一部分的标题再次出现且之后没有内容时，该部分视为没有内容
+        "repeated_empty_heading": (create_sections_doc([
+            ("步骤", ["拆下螺栓"]), ("工具", ["扳手"]), ("安全", ["断电"]), ("注意", ["防烫"]),
+            ("步骤：补充", []),
+        ]), False),
+        "repeated_heading_with_content": (create_sections_doc([
+            ("步骤", ["拆下螺栓"]), ("工具", ["扳手"]), ("安全", ["断电"]), ("注意", ["防烫"]),
+            ("步骤：补充", ["装回螺栓"]),
+        ]), True),
+        # 表格中的段落不属于正文段落
+        "keyword_in_table": (create_sections_doc({
+            "步骤": ["拆下螺栓"], "工具": ["扳手"], "安全": ["断电"],
+        }, table_text="注意"), False),
+    }
+
+    for name, (content, expected) in cases.items():
+        path = tmp_path / f"{name}.docx"
+        path.write_bytes(content)
+        docx_result = validator.validate_content_for_extraction(Document(io.BytesIO(content)))
+        assert docx_result is expected, name
+        assert validator.validate_content_for_extraction(str(path)) is expected, name
+        assert validator.validate_content_for_extraction(
+            DocumentContext(content, path.name)
+        ) is expected, name
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,6 +1,8 @@
+import io
 import pytest
 import os
 from pathlib import Path
+from docx import Document
 from backend.core.document_manager.uploader import DocumentUploader
 from backend.core.knowledge_graph.extractor import KnowledgeExtractor
 from backend.core.knowledge_graph.neo4j_manager import Neo4jManager
@@ -144,5 +146,48 @@ def test_cypher_generation():
     except Exception as e:
         pytest.fail(f"测试失败: {str(e)}")
 
+def test_extract_from_document_sections(tmp_path, monkeypatch):
+    """测试按章节抽取逐章节调用大模型，生成器可以完整读取"""
+    doc = Document()
+    doc.add_paragraph("前言：本手册适用于全部机型。")
+    doc.add_heading("第一章 液压系统", 1)
+    doc.add_paragraph("检查液压油位。")
+    doc.add_heading("第二章 电气系统", 1)
+    doc.add_heading("第三章 制动系统", 1)
+    doc.add_paragraph("检查制动液。")
+    path = tmp_path / "manual.docx"
+    doc.save(str(path))
+
+    prompts = []
+    extractor = KnowledgeExtractor()
+    monkeypatch.setattr(extractor, "extract_from_text",
+                        lambda text: prompts.append(text) or f"CREATE (:Section {{n: {len(prompts)}}})")
+
+    results = list(extractor.extract_from_document_sections(str(path), "doc-1"))
+
+    assert results == [f"CREATE (:Section {{n: {i}}})" for i in (1, 2, 3, 4)]
+    assert all("文档ID: doc-1" in prompt for prompt in prompts)
+    assert "章节: 前言" in prompts[0]
+    assert "章节: 第一章 液压系统" in prompts[1] and "检查液压油位。" in prompts[1]
+    # 没有正文的章节只发送标题
+    assert "章节: 第二章 电气系统" in prompts[2]
+    assert "检查制动液。" in prompts[3] and "检查液压油位。" not in prompts[3]
+
+def test_extract_from_document_skips_image_paragraphs(tmp_path, monkeypatch, png_bytes):
+    """测试整篇抽取时图片段落的空文本不进入提示词"""
+    doc = Document()
+    doc.add_heading("第一章 液压系统", 1)
+    doc.add_picture(io.BytesIO(png_bytes))
+    doc.add_paragraph("检查液压油位。")
+    path = tmp_path / "manual.docx"
+    doc.save(str(path))
+
+    prompts = []
+    extractor = KnowledgeExtractor()
+    monkeypatch.setattr(extractor, "extract_from_text", lambda text: prompts.append(text) or "")
+    extractor.extract_from_document(str(path), "doc-1")
+
+    assert prompts[0].endswith("---\n第一章 液压系统\n检查液压油位。\n")
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,146 @@
+import io
+import zipfile
+import pytest
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+from backend.core.document_manager.cleaner import DocumentCleaner
+from backend.core.document_manager.context import DocumentContext
+from backend.core.document_manager import ooxml
+from backend.core.document_manager.ooxml import DOCUMENT_PART
+
+@pytest.fixture
+def manual_bytes(png_bytes) -> bytes:
+    doc = Document()
+    doc.add_heading("液压系统检修", 1)
+    para = doc.add_paragraph()
+    para.add_run("检查油位，，").bold = True
+    para.add_run("  补充液压油。")
+    doc.add_paragraph("")
+    doc.add_picture(io.BytesIO(png_bytes))
+    doc.add_paragraph("无需清洗的段落")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def test_clean_package_matches_python_docx_cleaner(tmp_path, manual_bytes):
+    """测试 XML 层清洗与 python-docx 清洗的文本结果一致"""
+    cleaner = DocumentCleaner()
+    output = tmp_path / "cleaned.docx"
+    stats = cleaner.clean_package(manual_bytes, output)
+
+    expected_doc, expected_stats = cleaner.clean_document(Document(io.BytesIO(manual_bytes)))
+    cleaned = Document(str(output))
+    assert stats == expected_stats
+    assert [p.text for p in cleaned.paragraphs] == [p.text for p in expected_doc.paragraphs]
+    # 修改文本的段落保留第一个 run 的格式
+    assert cleaned.paragraphs[1].runs[0].bold
+    # 只包含图片的段落不作为空段落删除
+    assert len(cleaned.inline_shapes) == 1
+
+def test_clean_package_copies_other_parts_unchanged(tmp_path, manual_bytes):
+    """测试 document.xml 以外的部件原样复制"""
+    output = tmp_path / "cleaned.docx"
+    context = DocumentContext(manual_bytes, "manual.docx")
+    DocumentCleaner().clean_package(context, output)
+
+    with zipfile.ZipFile(io.BytesIO(manual_bytes)) as original, zipfile.ZipFile(output) as cleaned:
+        assert cleaned.testzip() is None
+        assert cleaned.namelist() == original.namelist()
+        for info in original.infolist():
+            if info.filename != DOCUMENT_PART:
+                copied = cleaned.getinfo(info.filename)
+                assert (copied.CRC, copied.compress_size) == (info.CRC, info.compress_size)
+        assert any(name.startswith("word/media/") for name in cleaned.namelist())
+
+    # 源包未被修改，可以继续读取
+    assert context.package.read(DOCUMENT_PART)
+
+def test_copy_part_keeps_compression_type(tmp_path):
+    """测试复制部件时保留原来的压缩方式，只通过 ZipFile 的公开接口读写"""
+    source_path = tmp_path / "source.zip"
+    with zipfile.ZipFile(source_path, "w") as source:
+        source.writestr("word/media/image1.png", b"\x89PNG" * 1000, compress_type=zipfile.ZIP_STORED)
+        source.writestr("word/styles.xml", b"<w:styles/>" * 1000, compress_type=zipfile.ZIP_DEFLATED)
+
+    target_path = tmp_path / "target.zip"
+    with zipfile.ZipFile(source_path) as source, zipfile.ZipFile(target_path, "w") as target:
+        for info in source.infolist():
+            ooxml.copy_part(source, target, info)
+
+    with zipfile.ZipFile(source_path) as source, zipfile.ZipFile(target_path) as target:
+        assert target.testzip() is None
+        for info in source.infolist():
+            copied = target.getinfo(info.filename)
+            assert (copied.compress_type, copied.date_time) == (info.compress_type, info.date_time)
+            assert target.read(copied) == source.read(info)
+
+def test_clean_package_without_changes_copies_document(tmp_path):
+    """测试没有需要清洗的内容时 document.xml 同样原样复制"""
+    doc = Document()
+    doc.add_paragraph("无需清洗的段落")
+    source = tmp_path / "manual.docx"
+    doc.save(str(source))
+
+    output = tmp_path / "cleaned.docx"
+    stats = DocumentCleaner().clean_package(source, output)
+    assert stats["cleaned_paragraphs"] == stats["removed_paragraphs"] == 0
+    assert output.read_bytes() == source.read_bytes()
+
+def build_containers_doc() -> Document:
+    doc = Document()
+    doc.add_paragraph("正文：检查油位，，补充液压油。")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "扭矩"
+    table.cell(0, 1).text = "45N · m，，"
+    table.cell(1, 0).text = "周期"
+    section = doc.sections[0]
+    section.header.paragraphs[0].text = "维修手册 ， 第3版"
+    section.footer.paragraphs[0].text = "内部资料  ！"
+    return doc
+
+def test_clean_package_cleans_tables_headers_and_footers(tmp_path):
+    """测试表格单元格、页眉页脚与正文在同一遍遍历中清洗，两种清洗方式结果一致"""
+    buffer = io.BytesIO()
+    build_containers_doc().save(buffer)
+    output = tmp_path / "cleaned.docx"
+    cleaner = DocumentCleaner()
+    stats = cleaner.clean_package(buffer.getvalue(), output)
+
+    expected_doc, expected_stats = cleaner.clean_document(build_containers_doc())
+    assert stats == expected_stats
+    assert stats["table_paragraphs"] == 4
+    assert stats["header_footer_paragraphs"] == 2
+
+    cleaned = Document(str(output))
+    for doc in (cleaned, expected_doc):
+        table = doc.tables[0]
+        assert table.cell(0, 1).text == cleaner.clean_text("45N · m，，")
+        # 单元格中的空段落不删除
+        assert table.cell(1, 1).text == ""
+        assert len(table.cell(1, 1).paragraphs) == 1
+        section = doc.sections[0]
+        assert section.header.paragraphs[0].text == cleaner.clean_text("维修手册 ， 第3版")
+        assert section.footer.paragraphs[0].text == cleaner.clean_text("内部资料  ！")
+
+def test_clean_document_cleans_text_boxes():
+    """测试文本框中的段落同样清洗，宿主段落中的文本框保持不变"""
+    doc = Document()
+    host = doc.add_paragraph("见右侧说明")
+    pict = OxmlElement("w:pict")
+    text_box = OxmlElement("w:txbxContent")
+    text_box.append(OxmlElement("w:p"))
+    pict.append(text_box)
+    host.runs[0]._r.append(pict)
+    Paragraph(text_box[0], host).text = "注意 ， ， 高温"
+
+    cleaner = DocumentCleaner()
+    _, stats = cleaner.clean_document(doc)
+    assert stats["text_box_paragraphs"] == 1
+    assert Paragraph(text_box[0], host).text == cleaner.clean_text("注意 ， ， 高温")
+    assert host.runs[0]._r.find(qn("w:pict")) is not None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
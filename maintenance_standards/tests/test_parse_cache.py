@@ -0,0 +1,122 @@
+import os
+import pickle
+import pytest
+from pydantic import ValidationError
+
+from backend.core.document_manager.parser import DocumentParser
+from backend.core.document_manager.store import DocumentStore, ParseCache
+
+def test_dumped_structure_round_trips(sample_docx):
+    """测试紧凑数据还原的文档结构与直接解析的一致"""
+    parser = DocumentParser()
+    structure = parser.parse_document(str(sample_docx))
+
+    payload = pickle.loads(pickle.dumps(parser.dump_structure(structure)))
+    restored = parser.load_structure(payload)
+    assert restored.model_dump() == structure.model_dump()
+    # 表格和图片列表与段落引用同一对象，不重复保存
+    tables = [p.table for p in restored.paragraphs if p.table is not None]
+    assert len(tables) == len(restored.tables)
+    assert all(a is b for a, b in zip(tables, restored.tables))
+
+def test_loaded_structure_is_validated(tmp_path, maintenance_doc_bytes):
+    """测试解析器内部不经校验构建的结构从缓存读取时经过校验"""
+    path = tmp_path / "manual.docx"
+    path.write_bytes(maintenance_doc_bytes)
+    parser = DocumentParser()
+    payload = parser.dump_structure(parser.parse_document(str(path)))
+    text, _, level, index, style, table, image = payload["paragraphs"][0]
+    payload["paragraphs"][0] = (text, "no-such-type", level, index, style, table, image)
+    with pytest.raises(ValueError):
+        parser.load_structure(payload)
+    payload["paragraphs"][0] = (text, "title", "一级", index, style, table, image)
+    with pytest.raises(ValidationError):
+        parser.load_structure(payload)
+
+def test_parser_fingerprint_follows_patterns():
+    parser = DocumentParser()
+    base = parser.fingerprint("a" * 64)
+    assert DocumentParser().fingerprint("a" * 64) == base
+    assert parser.fingerprint("b" * 64) != base
+    parser.list_patterns.append(r"^※.*$")
+    assert parser.fingerprint("a" * 64) != base
+
+def test_reextraction_skips_parsing(uploader, maintenance_doc_bytes, monkeypatch):
+    """测试重新抽取时内容未变化的文档直接使用缓存的解析结果"""
+    document = uploader.upload(maintenance_doc_bytes, "manual.docx")
+
+    context = uploader._extraction_context(document)
+    expected = context.structure.model_dump()
+    context.close()
+    # 解析指纹由文档记录中的清洗规则指纹得到，无需读取清洗产物计算哈希
+    assert document.cleaning_fingerprint == uploader.cleaner.fingerprint()
+    fingerprint = uploader.parser.fingerprint(document.cleaning_fingerprint)
+    assert uploader.store.parse_cache.entry_path(document.content_hash, fingerprint).exists()
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("内容未变化时不应再次解析")
+
+    monkeypatch.setattr(uploader.parser, "parse_document", fail_parse)
+    context = uploader._extraction_context(document)
+    try:
+        assert context.structure.model_dump() == expected
+        # 清洗产物同样可供内容检查使用
+        assert context.cleaned is not None
+    finally:
+        context.close()
+
+    # 解析配置变化后重新解析
+    uploader.parser.list_patterns.append(r"^※.*$")
+    with pytest.raises(AssertionError):
+        uploader._extraction_context(document)
+
+def test_legacy_document_without_cleaning_fingerprint(uploader, maintenance_doc_bytes):
+    """测试没有记录清洗规则指纹的旧文档按清洗产物的哈希使用解析缓存"""
+    document = uploader.upload(maintenance_doc_bytes, "manual.docx")
+    legacy = document.model_copy(update={"cleaning_fingerprint": None})
+
+    contexts = [uploader._extraction_context(legacy), uploader._extraction_context(document)]
+    try:
+        assert contexts[0].structure.model_dump() == contexts[1].structure.model_dump()
+    finally:
+        for context in contexts:
+            context.close()
+    assert len(list(uploader.store.parse_cache.cache_dir(document.content_hash).iterdir())) == 2
+
+def test_cache_rejects_non_plain_payload(tmp_path):
+    """测试缓存文件中的类和函数引用不会被加载"""
+    cache = ParseCache(DocumentStore(tmp_path), max_size=1024)
+    path = cache.entry_path("a" * 64, "f" * 64)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(pickle.dumps(os.getcwd))
+    assert cache.get("a" * 64, "f" * 64) is None
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """测试超过大小上限时淘汰最久未使用的条目"""
+    payload = {"paragraphs": ["x" * 100]}
+    size = len(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    # 淘汰到上限的 80% 以下后仍可保留两个条目
+    cache = ParseCache(DocumentStore(tmp_path), max_size=size * 5 // 2)
+    hashes = [str(i) * 64 for i in range(3)]
+    fingerprint = "f" * 64
+
+    cache.put(hashes[0], fingerprint, payload)
+    cache.put(hashes[1], fingerprint, payload)
+    for content_hash, mtime in ((hashes[0], 1000), (hashes[1], 500)):
+        os.utime(cache.entry_path(content_hash, fingerprint), (mtime, mtime))
+    assert cache.get(hashes[0], fingerprint) == payload
+
+    cache.put(hashes[2], fingerprint, payload)
+    assert cache.get(hashes[1], fingerprint) is None
+    assert cache.get(hashes[0], fingerprint) == payload
+    assert cache.get(hashes[2], fingerprint) == payload
+
+def test_cache_disabled_when_size_is_zero(tmp_path):
+    store = DocumentStore(tmp_path)
+    cache = ParseCache(store, max_size=0)
+    cache.put("a" * 64, "f" * 64, {"paragraphs": []})
+    assert cache.get("a" * 64, "f" * 64) is None
+    assert not store.root.exists()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
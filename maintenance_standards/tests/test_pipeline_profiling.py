@@ -0,0 +1,77 @@
+import io
+import pytest
+from docx import Document
+
+from backend.config import settings
+from backend.models.document import StageTiming
+from backend.utils.profiling import PipelineMetrics, PipelineProfiler, pipeline_metrics
+
+def test_upload_records_stage_timings(tmp_path, uploader):
+    """测试上传后文档记录包含各阶段耗时并汇总到直方图"""
+    path = tmp_path / "manual.docx"
+    doc = Document()
+    doc.add_paragraph("发动机维修标准")
+    doc.save(str(path))
+    pipeline_metrics.reset()
+
+    document = uploader.upload(path)
+
+    names = [t.name for t in document.timings]
+    assert names == ["receive", "validate", "save", "clean", "metadata", "total"]
+    total = document.timings[-1]
+    assert total.wall_time >= sum(t.wall_time for t in document.timings[:-1])
+    assert uploader.store.get_document(document.content_hash).timings == document.timings
+
+    snapshot = pipeline_metrics.snapshot()
+    assert snapshot["clean"]["wall_time"]["count"] == 1
+    assert snapshot["clean"]["cpu_time"]["count"] == 1
+    assert snapshot["total"]["wall_time"]["p95"] <= snapshot["total"]["wall_time"]["max"]
+    # 默认不统计内存峰值
+    assert "peak_memory" not in snapshot["clean"]
+
+def test_profiler_records_failed_stage_and_memory():
+    """测试阶段抛出异常时仍记录耗时，并统计内存峰值"""
+    profiler = PipelineProfiler(track_memory=True)
+    with pytest.raises(ValueError):
+        with profiler.stage("validate"):
+            data = bytearray(1024 * 1024)
+            raise ValueError(len(data))
+
+    timing = profiler.timings[0]
+    assert timing.name == "validate"
+    assert timing.peak_memory >= 1024 * 1024
+
+def test_metrics_aggregate_cpu_time_and_peak_memory():
+    """测试按阶段汇总 CPU 时间和内存峰值，未统计内存的记录不计入内存直方图"""
+    metrics = PipelineMetrics()
+    metrics.observe([StageTiming(name="clean", wall_time=0.2, cpu_time=0.15, peak_memory=3 * 2 ** 20)])
+    metrics.observe([StageTiming(name="clean", wall_time=0.4, cpu_time=0.3, peak_memory=40 * 2 ** 20)])
+    metrics.observe([StageTiming(name="clean", wall_time=0.3, cpu_time=0.2)])
+
+    clean = metrics.snapshot()["clean"]
+    assert clean["cpu_time"]["count"] == 3
+    assert clean["cpu_time"]["total"] == pytest.approx(0.65)
+    assert clean["cpu_time"]["max"] == 0.3
+    assert clean["peak_memory"]["count"] == 2
+    assert clean["peak_memory"]["max"] == 40 * 2 ** 20
+    assert clean["peak_memory"]["buckets"][str(4 * 2 ** 20)] == 1
+    assert clean["peak_memory"]["p50"] == 4 * 2 ** 20
+
+def test_upload_aggregates_peak_memory_when_enabled(uploader, monkeypatch):
+    """测试开启内存统计后上传的各阶段内存峰值汇总到直方图"""
+    monkeypatch.setattr(settings, "PROFILE_MEMORY", True)
+    doc = Document()
+    doc.add_paragraph("发动机维修标准")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    pipeline_metrics.reset()
+
+    document = uploader.upload(buffer.getvalue(), "manual.docx")
+
+    assert all(t.peak_memory is not None for t in document.timings if t.name != "total")
+    snapshot = pipeline_metrics.snapshot()
+    assert snapshot["clean"]["peak_memory"]["count"] == 1
+    assert snapshot["clean"]["peak_memory"]["max"] > 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,44 @@
+import random
+import re
+import pytest
+
+from backend.core.document_manager.cleaner import DocumentCleaner
+from backend.core.document_manager.cleaning_rules import PUNCTUATION_MAP
+
+def sequential_clean(text: str, remove_extra_spaces: bool = True) -> str:
+    """逐条执行清洗规则的参考实现"""
+    if remove_extra_spaces:
+        text = re.sub(r'\s+', ' ', text).strip()
+    for old, new in PUNCTUATION_MAP.items():
+        text = text.replace(old, new)
+    text = re.sub(r'([,.!?;])\1+', r'\1', text)
+    return re.sub(r'([,.!?;:])([^\s])', r'\1 \2', text)
+
+@pytest.mark.parametrize("text, expected", [
+    ("拆下放油螺栓，放出机油。", "拆下放油螺栓, 放出机油."),
+    ("  检查\t\n扭矩！！！  ", "检查 扭矩!"),
+    ("扭矩：45N·m；间隔：500h", "扭矩: 45N·m; 间隔: 500h"),
+    ("悬挂“禁止合闸”标识牌", '悬挂"禁止合闸"标识牌'),
+    ("等。，x", "等. ,x"),
+    ("::x", ": :x"),
+    ("", ""),
+])
+def test_clean_text(text, expected):
+    """测试文本清洗结果"""
+    assert DocumentCleaner().clean_text(text) == expected
+
+@pytest.mark.parametrize("remove_extra_spaces", [True, False])
+def test_clean_texts_matches_sequential_rules(remove_extra_spaces):
+    """测试批量清洗与逐条执行规则的结果一致"""
+    rng = random.Random(0)
+    alphabet = list(",.!?;: \t\n，。：；！？（）“”ab中　")
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(20000)]
+    cleaner = DocumentCleaner()
+    cleaner.rules["remove_extra_spaces"] = remove_extra_spaces
+
+    assert cleaner.clean_texts(texts) == [sequential_clean(t, remove_extra_spaces) for t in texts]
+    # 含有批处理保留字符的文本逐段处理
+    assert cleaner.clean_texts(["a\x00，b", "c\x01。d"]) == ["a\x00, b", "c\x01. d"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])